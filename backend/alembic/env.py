@@ -22,6 +22,12 @@ from backend.database import Base
 from backend.models.user import User
 from backend.models.problem import Problem, TestCase
 from backend.models.submission import Submission
+from backend.models.runtime_histogram import RuntimeHistogram
+from backend.models.concept import Concept
+from backend.models.user_stats import UserStats
+from backend.models.blob import Blob
+from backend.models.contest import Contest, ContestEntry
+from backend.models.judged_case_set import JudgedCaseSet
 target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
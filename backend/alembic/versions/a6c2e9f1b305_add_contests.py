@@ -0,0 +1,64 @@
+"""Add contests, contest problems and contest entries
+
+Revision ID: a6c2e9f1b305
+Revises: f5a7c3d9e812
+Create Date: 2026-10-19 15:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c2e9f1b305'
+down_revision: Union[str, Sequence[str], None] = 'f5a7c3d9e812'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('contests',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('slug', sa.String(), nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('start_time', sa.DateTime(), nullable=False),
+    sa.Column('end_time', sa.DateTime(), nullable=False),
+    sa.Column('penalty_minutes', sa.Integer(), nullable=False, server_default='20'),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_contests_id'), 'contests', ['id'], unique=False)
+    op.create_index(op.f('ix_contests_slug'), 'contests', ['slug'], unique=True)
+    op.create_table('contest_problems',
+    sa.Column('contest_id', sa.Integer(), nullable=False),
+    sa.Column('problem_id', sa.Integer(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False, server_default='0'),
+    sa.ForeignKeyConstraint(['contest_id'], ['contests.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['problem_id'], ['problems.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('contest_id', 'problem_id')
+    )
+    op.create_table('contest_entries',
+    sa.Column('contest_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('solved', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('penalty', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('last_solved_at', sa.Integer(), nullable=True),
+    sa.Column('problem_state', sa.Text(), nullable=False, server_default='{}'),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['contest_id'], ['contests.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('contest_id', 'user_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('contest_entries')
+    op.drop_table('contest_problems')
+    op.drop_index(op.f('ix_contests_slug'), table_name='contests')
+    op.drop_index(op.f('ix_contests_id'), table_name='contests')
+    op.drop_table('contests')
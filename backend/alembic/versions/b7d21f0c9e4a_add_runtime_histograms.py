@@ -0,0 +1,40 @@
+"""Add submission runtime/memory and runtime histograms
+
+Revision ID: b7d21f0c9e4a
+Revises: add_concepts_col
+Create Date: 2026-10-19 10:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d21f0c9e4a'
+down_revision: Union[str, Sequence[str], None] = 'add_concepts_col'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('submissions', sa.Column('runtime_ms', sa.Float(), nullable=True))
+    op.add_column('submissions', sa.Column('memory_kb', sa.Float(), nullable=True))
+    op.create_table('runtime_histograms',
+    sa.Column('problem_id', sa.Integer(), nullable=False),
+    sa.Column('language', sa.String(), nullable=False),
+    sa.Column('metric', sa.String(), nullable=False),
+    sa.Column('bucket', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['problem_id'], ['problems.id'], ),
+    sa.PrimaryKeyConstraint('problem_id', 'language', 'metric', 'bucket')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('runtime_histograms')
+    op.drop_column('submissions', 'memory_kb')
+    op.drop_column('submissions', 'runtime_ms')
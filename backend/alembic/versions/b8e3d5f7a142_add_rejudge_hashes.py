@@ -0,0 +1,73 @@
+"""Add test case content hashes and judged case sets for incremental rejudging
+
+Revision ID: b8e3d5f7a142
+Revises: a6c2e9f1b305
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e3d5f7a142'
+down_revision: Union[str, Sequence[str], None] = 'a6c2e9f1b305'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    from backend.models.problem import testcase_hash
+    from backend.models.judged_case_set import case_set
+
+    op.add_column('test_cases', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_table('judged_case_sets',
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.Column('problem_id', sa.Integer(), nullable=False),
+    sa.Column('case_hashes', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['problem_id'], ['problems.id'], ),
+    sa.PrimaryKeyConstraint('hash')
+    )
+    op.create_index(op.f('ix_judged_case_sets_problem_id'), 'judged_case_sets', ['problem_id'], unique=False)
+    op.add_column('submissions', sa.Column('judged_set_hash', sa.String(length=64), nullable=True))
+
+    # Hash existing test cases, in batches
+    bind = op.get_bind()
+    last_id = 0
+    cases_by_problem = {}
+    while True:
+        rows = bind.execute(sa.text(
+            "SELECT id, problem_id, input_data, expected_output FROM test_cases WHERE id > :last ORDER BY id LIMIT :n"
+        ), {"last": last_id, "n": BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        for case_id, problem_id, input_data, expected_output in rows:
+            digest = testcase_hash(input_data, expected_output)
+            cases_by_problem.setdefault(problem_id, []).append(digest)
+            bind.execute(sa.text("UPDATE test_cases SET content_hash = :h WHERE id = :id"), {"h": digest, "id": case_id})
+        last_id = rows[-1][0]
+
+    # Baseline: what each problem's Accepted submissions were judged against isn't known, so take
+    # today's cases. Only changes made from here on are rejudged.
+    for problem_id, hashes in cases_by_problem.items():
+        set_hash, listed = case_set(problem_id, hashes)
+        bind.execute(sa.text(
+            "INSERT INTO judged_case_sets (hash, problem_id, case_hashes, created_at) VALUES (:h, :p, :c, CURRENT_TIMESTAMP)"
+        ), {"h": set_hash, "p": problem_id, "c": listed})
+        bind.execute(sa.text(
+            "UPDATE submissions SET judged_set_hash = :h WHERE problem_id = :p AND status = 'Accepted'"
+        ), {"h": set_hash, "p": problem_id})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('submissions', 'judged_set_hash')
+    op.drop_index(op.f('ix_judged_case_sets_problem_id'), table_name='judged_case_sets')
+    op.drop_table('judged_case_sets')
+    op.drop_column('test_cases', 'content_hash')
@@ -0,0 +1,85 @@
+"""Add concept tags and problem search index
+
+Revision ID: c3e8a41d5f20
+Revises: b7d21f0c9e4a
+Create Date: 2026-10-19 11:20:00.000000
+
+"""
+from typing import Sequence, Union
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e8a41d5f20'
+down_revision: Union[str, Sequence[str], None] = 'b7d21f0c9e4a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match backend.search.SEARCH_VECTOR_SQL exactly for the planner to use the index
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(problems.title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(problems.concepts, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(problems.description, '')), 'C')"
+)
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    concepts = op.create_table('concepts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('slug', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_concepts_id'), 'concepts', ['id'], unique=False)
+    op.create_index(op.f('ix_concepts_slug'), 'concepts', ['slug'], unique=True)
+    problem_concepts = op.create_table('problem_concepts',
+    sa.Column('problem_id', sa.Integer(), nullable=False),
+    sa.Column('concept_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['problem_id'], ['problems.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['concept_id'], ['concepts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('problem_id', 'concept_id')
+    )
+    op.create_index(op.f('ix_problem_concepts_concept_id'), 'problem_concepts', ['concept_id'], unique=False)
+
+    # Backfill from the comma-separated problems.concepts column (which is kept as the display copy)
+    bind = op.get_bind()
+    rows = bind.execute(sa.text("SELECT id, concepts FROM problems WHERE concepts IS NOT NULL")).fetchall()
+    names = {}
+    links = set()
+    for problem_id, raw in rows:
+        for part in raw.split(","):
+            name = part.strip()
+            if not name:
+                continue
+            slug = _slug(name)
+            names.setdefault(slug, name)
+            links.add((problem_id, slug))
+
+    if names:
+        op.bulk_insert(concepts, [{"name": name, "slug": slug} for slug, name in names.items()])
+        ids = dict(bind.execute(sa.text("SELECT slug, id FROM concepts")).fetchall())
+        op.bulk_insert(problem_concepts, [
+            {"problem_id": problem_id, "concept_id": ids[slug]} for problem_id, slug in sorted(links)
+        ])
+
+    if bind.dialect.name == 'postgresql':
+        op.execute(f"CREATE INDEX ix_problems_search ON problems USING GIN (({SEARCH_VECTOR_SQL}))")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_problems_search")
+    op.drop_index(op.f('ix_problem_concepts_concept_id'), table_name='problem_concepts')
+    op.drop_table('problem_concepts')
+    op.drop_index(op.f('ix_concepts_slug'), table_name='concepts')
+    op.drop_index(op.f('ix_concepts_id'), table_name='concepts')
+    op.drop_table('concepts')
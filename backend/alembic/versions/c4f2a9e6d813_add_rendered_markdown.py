@@ -0,0 +1,34 @@
+"""Add pre-rendered description/editorial HTML to problems
+
+Revision ID: c4f2a9e6d813
+Revises: b8e3d5f7a142
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f2a9e6d813'
+down_revision: Union[str, Sequence[str], None] = 'b8e3d5f7a142'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing problems are rendered by `python -m backend.markdown_render`; until then they're
+    # served without HTML and the frontend renders the markdown itself
+    op.add_column('problems', sa.Column('description_html', sa.Text(), nullable=True))
+    op.add_column('problems', sa.Column('editorial_html', sa.Text(), nullable=True))
+    op.add_column('problems', sa.Column('render_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('problems', 'render_hash')
+    op.drop_column('problems', 'editorial_html')
+    op.drop_column('problems', 'description_html')
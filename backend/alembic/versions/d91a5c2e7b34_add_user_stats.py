@@ -0,0 +1,46 @@
+"""Add user_stats and submissions lookup index
+
+Revision ID: d91a5c2e7b34
+Revises: c3e8a41d5f20
+Create Date: 2026-10-19 12:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd91a5c2e7b34'
+down_revision: Union[str, Sequence[str], None] = 'c3e8a41d5f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('solved_easy', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('solved_medium', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('solved_hard', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('solved_total', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('accepted', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('concept_counts', sa.Text(), nullable=False, server_default='{}'),
+    sa.Column('current_streak', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('longest_streak', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('last_solved_date', sa.Date(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # "Has this user already solved this problem?" is asked on every judged submission
+    op.create_index('ix_submissions_user_problem_status', 'submissions', ['user_id', 'problem_id', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_submissions_user_problem_status', table_name='submissions')
+    op.drop_table('user_stats')
@@ -0,0 +1,68 @@
+"""Store submission code/output as compressed, deduplicated blobs
+
+Revision ID: e4f0b6a8c219
+Revises: d91a5c2e7b34
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4f0b6a8c219'
+down_revision: Union[str, Sequence[str], None] = 'd91a5c2e7b34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('blobs',
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.Column('codec', sa.String(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('hash')
+    )
+    with op.batch_alter_table('submissions') as batch_op:
+        batch_op.add_column(sa.Column('code_hash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('output_hash', sa.String(length=64), nullable=True))
+        batch_op.create_foreign_key('fk_submissions_code_hash', 'blobs', ['code_hash'], ['hash'])
+        batch_op.create_foreign_key('fk_submissions_output_hash', 'blobs', ['output_hash'], ['hash'])
+        # Existing rows keep their inline text until `python -m backend.migrate_submission_blobs` moves it
+        batch_op.alter_column('code', existing_type=sa.Text(), nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Inline the text back before dropping the references
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT s.id, c.codec, c.data, o.codec, o.data FROM submissions s "
+        "LEFT JOIN blobs c ON c.hash = s.code_hash LEFT JOIN blobs o ON o.hash = s.output_hash "
+        "WHERE s.code_hash IS NOT NULL OR s.output_hash IS NOT NULL"
+    )).fetchall()
+    if rows:
+        from backend.blobs import decompress
+        for sid, code_codec, code_data, out_codec, out_data in rows:
+            values = {"id": sid}
+            sets = []
+            if code_data is not None:
+                values["code"] = decompress(code_codec, code_data)
+                sets.append("code = :code")
+            if out_data is not None:
+                values["output"] = decompress(out_codec, out_data)
+                sets.append("output = :output")
+            bind.execute(sa.text(f"UPDATE submissions SET {', '.join(sets)} WHERE id = :id"), values)
+
+    with op.batch_alter_table('submissions') as batch_op:
+        batch_op.drop_constraint('fk_submissions_output_hash', type_='foreignkey')
+        batch_op.drop_constraint('fk_submissions_code_hash', type_='foreignkey')
+        batch_op.drop_column('output_hash')
+        batch_op.drop_column('code_hash')
+        batch_op.alter_column('code', existing_type=sa.Text(), nullable=False)
+    op.drop_table('blobs')
@@ -0,0 +1,116 @@
+"""Partition submissions by month and index timestamp
+
+Revision ID: f5a7c3d9e812
+Revises: e4f0b6a8c219
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5a7c3d9e812'
+down_revision: Union[str, Sequence[str], None] = 'e4f0b6a8c219'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 2
+
+COLUMNS = "id, problem_id, user_id, code, code_hash, language, status, output, output_hash, timestamp, runtime_ms, memory_kb"
+
+TABLE_BODY = """
+    id INTEGER NOT NULL DEFAULT nextval('submissions_id_seq'),
+    problem_id INTEGER NOT NULL REFERENCES problems (id),
+    user_id INTEGER REFERENCES users (id),
+    code TEXT,
+    code_hash VARCHAR(64) REFERENCES blobs (hash),
+    language VARCHAR NOT NULL,
+    status VARCHAR,
+    output TEXT,
+    output_hash VARCHAR(64) REFERENCES blobs (hash),
+    timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT (now() AT TIME ZONE 'utc'),
+    runtime_ms FLOAT,
+    memory_kb FLOAT
+"""
+
+
+def _add_months(d: date, months: int) -> date:
+    index = d.year * 12 + (d.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_indexes() -> None:
+    op.create_index('ix_submissions_id', 'submissions', ['id'], unique=False)
+    op.create_index('ix_submissions_user_problem_status', 'submissions', ['user_id', 'problem_id', 'status'], unique=False)
+    op.create_index('ix_submissions_timestamp', 'submissions', ['timestamp'], unique=False)
+    # Recent history per problem: WHERE problem_id = ? ORDER BY timestamp DESC
+    op.create_index('ix_submissions_problem_timestamp', 'submissions', ['problem_id', 'timestamp'], unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        # No declarative partitioning elsewhere (SQLite dev/bench DBs): just the indexes
+        op.create_index('ix_submissions_timestamp', 'submissions', ['timestamp'], unique=False)
+        op.create_index('ix_submissions_problem_timestamp', 'submissions', ['problem_id', 'timestamp'], unique=False)
+        return
+
+    # 1. Move the old table aside (index names are schema-global, so rename those too)
+    op.execute("UPDATE submissions SET timestamp = now() AT TIME ZONE 'utc' WHERE timestamp IS NULL")
+    op.execute("ALTER TABLE submissions RENAME TO submissions_legacy")
+    op.execute("ALTER TABLE submissions_legacy RENAME CONSTRAINT submissions_pkey TO submissions_legacy_pkey")
+    op.execute("ALTER INDEX ix_submissions_id RENAME TO ix_submissions_legacy_id")
+    op.execute("ALTER INDEX ix_submissions_user_problem_status RENAME TO ix_submissions_legacy_user_problem_status")
+    op.execute("ALTER SEQUENCE submissions_id_seq OWNED BY NONE")
+
+    # 2. Partitioned parent; the partition key must be part of the primary key
+    op.execute(f"CREATE TABLE submissions ({TABLE_BODY}, PRIMARY KEY (id, timestamp)) PARTITION BY RANGE (timestamp)")
+    op.execute("ALTER SEQUENCE submissions_id_seq OWNED BY submissions.id")
+    op.execute("CREATE TABLE submissions_default PARTITION OF submissions DEFAULT")
+
+    # 3. One partition per month from the oldest row up to a couple of months ahead
+    oldest = bind.execute(sa.text("SELECT min(timestamp) FROM submissions_legacy")).scalar()
+    now = datetime.utcnow()
+    start = date((oldest or now).year, (oldest or now).month, 1)
+    last = _add_months(date(now.year, now.month, 1), MONTHS_AHEAD)
+    while start <= last:
+        end = _add_months(start, 1)
+        op.execute(
+            f"CREATE TABLE submissions_y{start.year}m{start.month:02d} PARTITION OF submissions "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        start = end
+
+    # 4. Copy, index and drop the old table
+    op.execute(f"INSERT INTO submissions ({COLUMNS}) SELECT {COLUMNS} FROM submissions_legacy")
+    _create_indexes()
+    op.execute("DROP TABLE submissions_legacy")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        op.drop_index('ix_submissions_problem_timestamp', table_name='submissions')
+        op.drop_index('ix_submissions_timestamp', table_name='submissions')
+        return
+
+    op.execute("ALTER TABLE submissions RENAME TO submissions_partitioned")
+    op.execute("ALTER TABLE submissions_partitioned RENAME CONSTRAINT submissions_pkey TO submissions_partitioned_pkey")
+    for name in ('ix_submissions_id', 'ix_submissions_user_problem_status', 'ix_submissions_timestamp', 'ix_submissions_problem_timestamp'):
+        op.execute(f"ALTER INDEX {name} RENAME TO {name}_partitioned")
+    op.execute("ALTER SEQUENCE submissions_id_seq OWNED BY NONE")
+
+    op.execute(f"CREATE TABLE submissions ({TABLE_BODY.replace('NOT NULL DEFAULT (now()', 'DEFAULT (now()')}, PRIMARY KEY (id))")
+    op.execute("ALTER SEQUENCE submissions_id_seq OWNED BY submissions.id")
+    op.execute(f"INSERT INTO submissions ({COLUMNS}) SELECT {COLUMNS} FROM submissions_partitioned")
+    op.create_index('ix_submissions_id', 'submissions', ['id'], unique=False)
+    op.create_index('ix_submissions_user_problem_status', 'submissions', ['user_id', 'problem_id', 'status'], unique=False)
+
+    # Dropping the parent drops every partition with it
+    op.execute("DROP TABLE submissions_partitioned")
@@ -0,0 +1,102 @@
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import delete, or_, and_
+from sqlalchemy.future import select
+from backend.database import SessionLocal, engine
+from backend.models.submission import Submission
+from backend import partitions
+
+# Retention job: archives non-Accepted submissions older than --retention-days to
+# gzip NDJSON files (one per month, archive/submissions-YYYY-MM.ndjson.gz) and deletes them.
+#
+# Each batch is written and fsynced before its rows are deleted, one transaction per batch,
+# so an interrupted run loses nothing and can simply be re-run. Appending to an existing
+# file adds a new gzip member, which `zcat` / gzip.open read back as one stream.
+# Accepted submissions are kept: solutions, percentiles and user_stats are built from them.
+# (A later rebuild_user_stats won't count archived attempts.)
+#
+#   python -m backend.archive_submissions --retention-days 180 --dry-run
+
+def to_record(s: Submission) -> dict:
+    return {
+        "id": s.id,
+        "problem_id": s.problem_id,
+        "user_id": s.user_id,
+        "language": s.language,
+        "status": s.status,
+        "code": s.code,
+        "output": s.output,
+        "timestamp": s.timestamp.isoformat(),
+        "runtime_ms": s.runtime_ms,
+        "memory_kb": s.memory_kb,
+    }
+
+
+def write_batch(archive_dir: str, records: list):
+    by_month = defaultdict(list)
+    for record in records:
+        by_month[record["timestamp"][:7]].append(record)
+    for month, rows in by_month.items():
+        path = os.path.join(archive_dir, f"submissions-{month}.ndjson.gz")
+        with open(path, "ab") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="ab") as f:
+                for row in rows:
+                    f.write((json.dumps(row) + "\n").encode())
+            raw.flush()
+            os.fsync(raw.fileno())
+
+
+async def archive(retention_days: int, archive_dir: str, batch_size: int, dry_run: bool):
+    created = await partitions.ensure_partitions(engine)
+    if created:
+        print(f"Partitions ready: {', '.join(created)}")
+
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    os.makedirs(archive_dir, exist_ok=True)
+    last = None  # (timestamp, id) keyset
+    archived = 0
+    start = time.perf_counter()
+    while True:
+        async with SessionLocal() as session:
+            query = select(Submission).where(Submission.timestamp < cutoff, Submission.status != "Accepted")
+            if last:
+                query = query.where(or_(
+                    Submission.timestamp > last[0],
+                    and_(Submission.timestamp == last[0], Submission.id > last[1]),
+                ))
+            result = await session.execute(query.order_by(Submission.timestamp, Submission.id).limit(batch_size))
+            rows = list(result.scalars().all())
+            if not rows:
+                break
+            last = (rows[-1].timestamp, rows[-1].id)
+
+            if not dry_run:
+                write_batch(archive_dir, [to_record(s) for s in rows])
+                # Bounded by timestamp too, so only the old partitions are touched
+                await session.execute(
+                    delete(Submission)
+                    .where(Submission.id.in_([s.id for s in rows]), Submission.timestamp < cutoff)
+                    .execution_options(synchronize_session=False)
+                )
+                await session.commit()
+
+        archived += len(rows)
+        print(f"{'Would archive' if dry_run else 'Archived'} {archived} submissions "
+              f"(up to {last[0].isoformat()}), {archived / (time.perf_counter() - start):.0f} rows/s")
+    verb = "would be archived" if dry_run else "archived"
+    print(f"Done. {archived} submissions older than {cutoff.date()} {verb}.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive old non-accepted submissions to gzip NDJSON and delete them.")
+    parser.add_argument("--retention-days", type=int, default=int(os.getenv("SUBMISSION_RETENTION_DAYS", "180")))
+    parser.add_argument("--archive-dir", default=os.getenv("SUBMISSION_ARCHIVE_DIR", "archive"))
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="Only count what would be archived")
+    args = parser.parse_args()
+    asyncio.run(archive(args.retention_days, args.archive_dir, args.batch_size, args.dry_run))
@@ -0,0 +1,158 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
+
+from backend.database import SessionLocal
+
+# Batched, resumable backfills for reshaping live data.
+#
+# run_backfill() walks a query by keyset on an ordered, unique key column (usually the primary key):
+#
+#     SELECT ... WHERE <filters> AND key > :last ORDER BY key LIMIT :batch_size
+#
+# and hands each chunk to `process(session, rows)`, which modifies rows and returns how many it
+# changed. Every chunk is its own transaction, so locks are short and memory stays flat. After each
+# commit the last key is written to BACKFILL_CHECKPOINT_DIR/<name>.json, and a re-run resumes from
+# there (--restart ignores it). --dry-run rolls every chunk back and writes no checkpoint.
+# --max-rows-per-sec throttles to spare the primary; throughput is printed per chunk.
+#
+#   def add_arguments(parser) / options_from_args(args) give every backfill script the same flags.
+
+CHECKPOINT_DIR = os.getenv("BACKFILL_CHECKPOINT_DIR", ".backfill")
+
+Process = Callable[[object, List], Awaitable[int]]
+
+
+@dataclass
+class BackfillOptions:
+    batch_size: int = 500
+    dry_run: bool = False
+    max_rows_per_sec: Optional[float] = None
+    restart: bool = False
+    checkpoint_dir: str = CHECKPOINT_DIR
+
+
+@dataclass
+class Checkpoint:
+    last_key: Optional[object] = None
+    processed: int = 0
+    changed: int = 0
+    updated_at: Optional[str] = None
+    finished: bool = False
+
+
+def checkpoint_path(name: str, options: BackfillOptions) -> str:
+    return os.path.join(options.checkpoint_dir, f"{name}.json")
+
+
+def load_checkpoint(name: str, options: BackfillOptions) -> Checkpoint:
+    path = checkpoint_path(name, options)
+    if options.restart or not os.path.exists(path):
+        return Checkpoint()
+    with open(path) as f:
+        return Checkpoint(**json.load(f))
+
+
+def save_checkpoint(name: str, options: BackfillOptions, checkpoint: Checkpoint):
+    os.makedirs(options.checkpoint_dir, exist_ok=True)
+    checkpoint.updated_at = datetime.utcnow().isoformat()
+    path = checkpoint_path(name, options)
+    # Write-then-rename so a crash never leaves a half-written checkpoint
+    with open(path + ".tmp", "w") as f:
+        json.dump(asdict(checkpoint), f)
+    os.replace(path + ".tmp", path)
+
+
+def _row_key(row, key_column):
+    if hasattr(row, key_column.key):
+        return getattr(row, key_column.key)
+    return row[0]  # Tuple rows: the key must be the first selected column
+
+
+async def run_backfill(name: str, query, key_column, process: Process, options: BackfillOptions,
+                       session_factory=SessionLocal, log=print) -> Checkpoint:
+    """
+    query: a select() with the backfill's filters (no ORDER BY / LIMIT).
+    key_column: the unique column to page on; must be selected (first, for tuple rows).
+    """
+    checkpoint = load_checkpoint(name, options)
+    if checkpoint.finished:
+        log(f"[{name}] Already finished at key {checkpoint.last_key} (use --restart to run again)")
+        return checkpoint
+    if checkpoint.last_key is not None:
+        log(f"[{name}] Resuming after key {checkpoint.last_key} ({checkpoint.processed} rows done)")
+
+    start = time.perf_counter()
+    done_this_run = 0
+    while True:
+        chunk_start = time.perf_counter()
+        async with session_factory() as session:
+            stmt = query
+            if checkpoint.last_key is not None:
+                stmt = stmt.where(key_column > checkpoint.last_key)
+            result = await session.execute(stmt.order_by(key_column).limit(options.batch_size))
+            rows = list(result.scalars().all() if _selects_entity(query) else result.all())
+            if not rows:
+                break
+
+            changed = await process(session, rows)
+            # Read before the rollback/commit expires ORM rows
+            last_key = _row_key(rows[-1], key_column)
+            if options.dry_run:
+                await session.rollback()
+            else:
+                await session.commit()
+
+        checkpoint.last_key = last_key
+        checkpoint.processed += len(rows)
+        checkpoint.changed += changed or 0
+        done_this_run += len(rows)
+        if not options.dry_run:
+            save_checkpoint(name, options, checkpoint)
+
+        elapsed = time.perf_counter() - start
+        log(f"[{name}] {'(dry run) ' if options.dry_run else ''}{checkpoint.processed} rows, "
+            f"{checkpoint.changed} changed, up to key {checkpoint.last_key}, {done_this_run / elapsed:.0f} rows/s")
+
+        if options.max_rows_per_sec:
+            # Sleep off whatever this chunk ran ahead of the allowed rate
+            min_duration = len(rows) / options.max_rows_per_sec
+            spent = time.perf_counter() - chunk_start
+            if spent < min_duration:
+                await asyncio.sleep(min_duration - spent)
+
+    checkpoint.finished = True
+    if not options.dry_run:
+        save_checkpoint(name, options, checkpoint)
+    log(f"[{name}] Done: {checkpoint.processed} rows, {checkpoint.changed} changed "
+        f"in {time.perf_counter() - start:.1f}s{' (dry run, nothing written)' if options.dry_run else ''}")
+    return checkpoint
+
+
+def _selects_entity(query) -> bool:
+    # select(Model) -> ORM objects via scalars(); select(col, col, ...) -> tuples
+    descriptions = query.column_descriptions
+    return len(descriptions) == 1 and descriptions[0].get("entity") is not None and descriptions[0]["type"] is descriptions[0]["entity"]
+
+
+def add_arguments(parser: argparse.ArgumentParser, batch_size: int = 500):
+    parser.add_argument("--batch-size", type=int, default=batch_size, help="Rows per chunk (one transaction each)")
+    parser.add_argument("--dry-run", action="store_true", help="Process every chunk but roll it back")
+    parser.add_argument("--max-rows-per-sec", type=float, default=None, help="Throttle to this many rows per second")
+    parser.add_argument("--restart", action="store_true", help="Ignore the saved checkpoint and start from the beginning")
+    parser.add_argument("--checkpoint-dir", default=CHECKPOINT_DIR)
+
+
+def options_from_args(args) -> BackfillOptions:
+    return BackfillOptions(
+        batch_size=args.batch_size,
+        dry_run=args.dry_run,
+        max_rows_per_sec=args.max_rows_per_sec,
+        restart=args.restart,
+        checkpoint_dir=args.checkpoint_dir,
+    )
@@ -0,0 +1,82 @@
+import ast
+import asyncio
+import random
+from dataclasses import dataclass
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# In-process stand-in for the Piston API used by the benchmark.
+# It never runs code: the "program" sums the integers of the first stdin line,
+# which is exactly what the benchmark seeds as expected output, so submissions
+# walk through every test case and end up Accepted unless a failure is injected.
+
+
+@dataclass
+class FakeProfile:
+    latency_ms: float = 5.0       # Base response latency
+    jitter_ms: float = 2.0        # Uniform +/- jitter around the base latency
+    error_rate: float = 0.0       # Fraction of requests answered with HTTP 500
+    throttle_rate: float = 0.0    # Fraction of requests answered with HTTP 429
+    wrong_answer_rate: float = 0.0  # Fraction of runs that print a wrong result
+
+
+PROFILES = {
+    "fast": FakeProfile(),
+    # Roughly what the public emkc.org endpoint looks like from Render
+    "public": FakeProfile(latency_ms=250.0, jitter_ms=100.0, throttle_rate=0.02),
+    "flaky": FakeProfile(latency_ms=50.0, jitter_ms=30.0, error_rate=0.1, throttle_rate=0.05),
+}
+
+
+def fake_output(stdin: str) -> str:
+    lines = [line for line in stdin.strip().split("\n") if line.strip()]
+    if not lines:
+        return ""
+    value = ast.literal_eval(lines[0])
+    return str(sum(value) if isinstance(value, (list, tuple)) else value)
+
+
+def create_fake_piston(profile: FakeProfile) -> FastAPI:
+    app = FastAPI()
+    app.state.requests = 0
+
+    @app.get("/api/v2/piston/runtimes")
+    async def runtimes():
+        return [
+            {"language": "python", "version": "3.10.0", "aliases": ["py", "python3"]},
+            {"language": "java", "version": "15.0.2", "aliases": []},
+        ]
+
+    @app.post("/api/v2/piston/execute")
+    async def execute(request: Request):
+        app.state.requests += 1
+        payload = await request.json()
+
+        delay = profile.latency_ms + random.uniform(-profile.jitter_ms, profile.jitter_ms)
+        await asyncio.sleep(max(0.0, delay) / 1000)
+
+        roll = random.random()
+        if roll < profile.throttle_rate:
+            return JSONResponse(status_code=429, content={"message": "Requests limited to 5/s"}, headers={"Retry-After": "1"})
+        if roll < profile.throttle_rate + profile.error_rate:
+            return JSONResponse(status_code=500, content={"message": "Internal error"})
+
+        try:
+            stdout = fake_output(payload.get("stdin", ""))
+        except (ValueError, SyntaxError) as e:
+            return {
+                "language": payload.get("language"),
+                "version": payload.get("version"),
+                "run": {"stdout": "", "stderr": f"Driver Error: {e}", "code": 1, "signal": None},
+            }
+        if random.random() < profile.wrong_answer_rate:
+            stdout = "wrong"
+
+        return {
+            "language": payload.get("language"),
+            "version": payload.get("version"),
+            "run": {"stdout": stdout + "\n", "stderr": "", "code": 0, "signal": None, "output": stdout + "\n"},
+        }
+
+    return app
@@ -0,0 +1,302 @@
+"""
+Load-test / benchmark harness.
+
+Stands up the FastAPI app against a scratch database plus an in-process fake Piston
+server, drives a weighted mix of /problems, /execute/run_test and /submissions/
+traffic and reports latency percentiles, throughput and DB query counts per route.
+
+Run from the PROJECT ROOT:
+
+    python -m backend.bench.run                                   # SQLite smoke run
+    python -m backend.bench.run --database-url postgresql+asyncpg://... --duration 60
+    python -m backend.bench.run --profile flaky --json bench.json
+    python -m backend.bench.run --baseline bench.json --max-regression 0.2   # exit 1 on p95 regression
+
+Never point --database-url at production: the harness creates tables and seeds bench-* problems.
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import math
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from backend.bench.fake_piston import PROFILES, FakeProfile, create_fake_piston
+
+# Per-request DB query counter; the request driver sets a fresh list before each call
+_query_counter: contextvars.ContextVar = contextvars.ContextVar("bench_query_counter", default=None)
+
+SOLUTION = """
+class Solution:
+    def total(self, nums):
+        return sum(nums)
+"""
+
+# (route label, weight)
+DEFAULT_MIX = {
+    "GET /problems": 40,
+    "GET /problems/{slug}": 30,
+    "POST /execute/run_test": 15,
+    "POST /submissions/": 15,
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    # Nearest-rank percentile
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def parse_mix(raw: str) -> Dict[str, int]:
+    # "problems=40,problem=30,run_test=15,submit=15"
+    aliases = dict(zip(["problems", "problem", "run_test", "submit"], DEFAULT_MIX.keys()))
+    mix = {}
+    for part in raw.split(","):
+        name, _, weight = part.partition("=")
+        mix[aliases[name.strip()]] = int(weight)
+    return mix
+
+
+async def seed(num_problems: int, cases_per_problem: int) -> List[dict]:
+    from backend.database import Base, SessionLocal, engine
+    from backend.models import problem as _problem, submission as _submission, user as _user  # noqa: F401 - register tables
+    from backend.models.problem import Problem, TestCase
+    from sqlalchemy.future import select
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    seeded = []
+    async with SessionLocal() as session:
+        for i in range(num_problems):
+            slug = f"bench-{i}"
+            result = await session.execute(select(Problem).where(Problem.slug == slug))
+            problem = result.scalars().first()
+            if not problem:
+                problem = Problem(
+                    title=f"Bench Problem {i}",
+                    slug=slug,
+                    description="Return the sum of the array. " * 20,
+                    difficulty=random.choice(["Easy", "Medium", "Hard"]),
+                    concepts="Arrays,Math",
+                )
+                session.add(problem)
+                await session.flush()
+                for j in range(cases_per_problem):
+                    nums = [random.randint(-1000, 1000) for _ in range(random.randint(1, 50))]
+                    session.add(TestCase(
+                        problem_id=problem.id,
+                        input_data=str(nums),
+                        expected_output=str(sum(nums)),
+                        is_hidden=j > 0,
+                    ))
+            seeded.append({"id": problem.id, "slug": slug})
+        await session.commit()
+    return seeded
+
+
+async def run_benchmark(args) -> dict:
+    import httpx
+    import uvicorn
+
+    profile = PROFILES[args.profile]
+    profile = FakeProfile(
+        latency_ms=args.latency_ms if args.latency_ms is not None else profile.latency_ms,
+        jitter_ms=profile.jitter_ms,
+        error_rate=args.error_rate if args.error_rate is not None else profile.error_rate,
+        throttle_rate=args.throttle_rate if args.throttle_rate is not None else profile.throttle_rate,
+        wrong_answer_rate=profile.wrong_answer_rate,
+    )
+
+    # 1. Fake executor on a real localhost socket so the executor client's HTTP path is exercised
+    port = _free_port()
+    fake_app = create_fake_piston(profile)
+    fake_server = uvicorn.Server(uvicorn.Config(fake_app, host="127.0.0.1", port=port, log_level="warning"))
+    fake_task = asyncio.create_task(fake_server.serve())
+    while not fake_server.started:
+        await asyncio.sleep(0.05)
+
+    # 2. Point the backend at the scratch DB and the fake executor BEFORE importing it
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["DB_ECHO"] = "false"
+    os.environ["PISTON_API_URLS"] = f"http://127.0.0.1:{port}/api/v2/piston/execute"
+    os.environ["EXECUTOR_RATE_PER_SEC"] = str(args.executor_rate)
+    os.environ.setdefault("EXECUTOR_BACKOFF_BASE", "0.05")
+
+    from sqlalchemy import event
+    from backend.database import engine
+    from backend.main import app
+
+    def count_query(*_):
+        counter = _query_counter.get()
+        if counter is not None:
+            counter[0] += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_query)
+
+    problems = await seed(args.problems, args.cases)
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    queries: Dict[str, List[int]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+
+    mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX
+    routes, weights = list(mix.keys()), list(mix.values())
+
+    async def one_request(client: httpx.AsyncClient, route: str, worker_id: int):
+        problem = random.choice(problems)
+        if route == "GET /problems":
+            return await client.get("/problems", params={"limit": 100})
+        if route == "GET /problems/{slug}":
+            return await client.get(f"/problems/{problem['slug']}")
+        if route == "POST /execute/run_test":
+            return await client.post(
+                "/execute/run_test",
+                params={"problem_id": problem["id"]},
+                json={"source_code": SOLUTION, "language_id": 71, "stdin": ""},
+            )
+        return await client.post("/submissions/", json={
+            "problem_id": problem["id"],
+            "code": SOLUTION,
+            "language": "python",
+            "clerk_id": f"bench-user-{worker_id}",
+            "email": f"bench-user-{worker_id}@example.com",
+            "username": f"bench{worker_id}",
+        })
+
+    deadline = time.perf_counter() + args.duration
+    remaining = [args.requests] if args.requests else None
+
+    async def worker(client: httpx.AsyncClient, worker_id: int):
+        while time.perf_counter() < deadline:
+            if remaining is not None:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            route = random.choices(routes, weights)[0]
+            counter = [0]
+            token = _query_counter.set(counter)
+            start = time.perf_counter()
+            try:
+                response = await one_request(client, route, worker_id)
+                if response.status_code >= 400:
+                    errors[route] += 1
+            except Exception:
+                errors[route] += 1
+            finally:
+                latencies[route].append((time.perf_counter() - start) * 1000)
+                queries[route].append(counter[0])
+                _query_counter.reset(token)
+
+    # 3. Drive the app in-process (no socket) so we measure the backend, not the HTTP client
+    transport = httpx.ASGITransport(app=app)
+    started = time.perf_counter()
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        await asyncio.gather(*(worker(client, i) for i in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    from backend.executor import executor
+    await executor.close()
+    await engine.dispose()
+    fake_server.should_exit = True
+    await fake_task
+
+    report = {"elapsed_s": elapsed, "executor_requests": fake_app.state.requests, "routes": {}}
+    for route in routes:
+        values = sorted(latencies[route])
+        if not values:
+            continue
+        report["routes"][route] = {
+            "count": len(values),
+            "errors": errors[route],
+            "rps": len(values) / elapsed,
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99),
+            "avg_queries": sum(queries[route]) / len(queries[route]),
+        }
+    report["total_rps"] = sum(len(v) for v in latencies.values()) / elapsed
+    return report
+
+
+def print_report(report: dict):
+    print(f"\n{'Route':<26} {'Count':>7} {'Err':>5} {'RPS':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'Queries':>8}")
+    print("-" * 88)
+    for route, r in report["routes"].items():
+        print(f"{route:<26} {r['count']:>7} {r['errors']:>5} {r['rps']:>8.1f} {r['p50_ms']:>9.1f} "
+              f"{r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['avg_queries']:>8.1f}")
+    print("-" * 88)
+    print(f"Total throughput: {report['total_rps']:.1f} req/s over {report['elapsed_s']:.1f}s "
+          f"({report['executor_requests']} executor calls)")
+
+
+def check_regressions(report: dict, baseline: dict, max_regression: float) -> List[str]:
+    failures = []
+    for route, r in report["routes"].items():
+        base = baseline.get("routes", {}).get(route)
+        if not base or not base["p95_ms"]:
+            continue
+        ratio = r["p95_ms"] / base["p95_ms"] - 1
+        if ratio > max_regression:
+            failures.append(f"{route}: p95 {base['p95_ms']:.1f}ms -> {r['p95_ms']:.1f}ms (+{ratio:.0%})")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the DSAwithPV backend against a fake executor.")
+    parser.add_argument("--database-url", default=None,
+                        help="Scratch database URL (default: temporary SQLite file)")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds to run")
+    parser.add_argument("--requests", type=int, default=0, help="Stop after N requests (0 = duration only)")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--problems", type=int, default=50)
+    parser.add_argument("--cases", type=int, default=10, help="Test cases per seeded problem")
+    parser.add_argument("--mix", default=None, help="Weights, e.g. problems=40,problem=30,run_test=15,submit=15")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="fast", help="Fake executor behaviour")
+    parser.add_argument("--latency-ms", type=float, default=None)
+    parser.add_argument("--error-rate", type=float, default=None)
+    parser.add_argument("--throttle-rate", type=float, default=None)
+    parser.add_argument("--executor-rate", type=float, default=0, help="Outbound pacing (0 = unpaced)")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write the report as JSON")
+    parser.add_argument("--baseline", default=None, help="Previous JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed p95 slowdown vs baseline")
+    args = parser.parse_args()
+
+    if args.database_url is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="dsabench-"), "bench.db")
+        args.database_url = f"sqlite+aiosqlite:///{path}"
+
+    report = asyncio.run(run_benchmark(args))
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = check_regressions(report, json.load(f), args.max_regression)
+        if failures:
+            print("\nRegressions detected:")
+            for failure in failures:
+                print(f"  {failure}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import hashlib
+import os
+import zlib
+from typing import Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.database import dialect_insert
+from backend.models.blob import Blob
+
+# Content-addressed storage for submission code and output.
+#
+# Text is hashed (sha256) and compressed with zstd when the optional `zstandard`
+# package is installed, zlib otherwise; tiny or incompressible values are stored raw.
+# Every row records its codec, so blobs written with either codec stay readable.
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+MIN_COMPRESS_BYTES = 64
+ZLIB_LEVEL = int(os.getenv("BLOB_ZLIB_LEVEL", "6"))
+ZSTD_LEVEL = int(os.getenv("BLOB_ZSTD_LEVEL", "6"))
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def compress(raw: bytes) -> Tuple[str, bytes]:
+    if len(raw) < MIN_COMPRESS_BYTES:
+        return "raw", raw
+    if zstandard is not None:
+        codec, data = "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    else:
+        codec, data = "zlib", zlib.compress(raw, ZLIB_LEVEL)
+    if len(data) >= len(raw):
+        return "raw", raw
+    return codec, data
+
+
+def decompress(codec: str, data: bytes) -> str:
+    if codec == "raw":
+        raw = data
+    elif codec == "zlib":
+        raw = zlib.decompress(data)
+    elif codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Blob is zstd-compressed but the 'zstandard' package is not installed")
+        raw = zstandard.ZstdDecompressor().decompress(data)
+    else:
+        raise ValueError(f"Unknown blob codec: {codec}")
+    return bytes(raw).decode()
+
+
+def blob_row(text: str) -> dict:
+    raw = text.encode()
+    codec, data = compress(raw)
+    return {"hash": hashlib.sha256(raw).hexdigest(), "codec": codec, "size": len(raw), "data": data}
+
+
+async def put_many(db: AsyncSession, texts) -> None:
+    """Stores every non-None text (duplicates are skipped by the primary key). Caller commits."""
+    rows = {}
+    for text in texts:
+        if text is not None:
+            row = blob_row(text)
+            rows[row["hash"]] = row
+    if rows:
+        insert = dialect_insert(db)
+        await db.execute(insert(Blob).on_conflict_do_nothing(index_elements=["hash"]), list(rows.values()))
+
+
+async def put(db: AsyncSession, text: Optional[str]) -> Optional[str]:
+    """Stores `text` if it isn't stored yet and returns its hash. Caller commits."""
+    if text is None:
+        return None
+    await put_many(db, [text])
+    return content_hash(text)
@@ -0,0 +1,319 @@
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from backend.database import dialect_insert
+from backend.models.contest import Contest, ContestEntry
+from backend.models.user import User
+
+# Contest standings.
+#
+# ContestEntry rows are the source of truth: record_submission() updates the submitting user's row
+# (locked) in the same transaction as the submission. After the commit, apply_update() moves the user
+# in that contest's in-memory Leaderboard, an order-statistics treap keyed by
+#
+#     (-solved, penalty, last_solved_at, user_id)
+#
+# so rank lookups, inserts and moves are O(log n) and a standings page is O(log n + page size),
+# however many participants there are. Each move is published to the contest's SSE subscribers.
+# Boards are built from contest_entries on first use and rebuilt after CONTEST_BOARD_RELOAD seconds
+# to pick up other workers' updates (apply_update only reaches this process's board).
+
+BOARD_RELOAD_SECONDS = float(os.getenv("CONTEST_BOARD_RELOAD", "30"))
+NOT_COUNTED = {"Compilation Error"}  # Doesn't cost an attempt
+
+
+def naive_utc(value: datetime) -> datetime:
+    """Contest times are stored as naive UTC (like datetime.utcnow()); aware input is converted, naive is taken as UTC."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class _Node:
+    __slots__ = ("key", "priority", "left", "right", "size")
+
+    def __init__(self, key):
+        self.key = key
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+        self.size = 1
+
+
+def _size(node) -> int:
+    return node.size if node else 0
+
+
+def _update(node):
+    node.size = 1 + _size(node.left) + _size(node.right)
+
+
+def _split(node, key, inclusive: bool = False) -> Tuple[Optional[_Node], Optional[_Node]]:
+    """(keys < key, keys >= key), or (keys <= key, keys > key) when inclusive"""
+    if node is None:
+        return None, None
+    if node.key < key or (inclusive and node.key == key):
+        node.right, right = _split(node.right, key, inclusive)
+        _update(node)
+        return node, right
+    left, node.left = _split(node.left, key, inclusive)
+    _update(node)
+    return left, node
+
+
+def _merge(left, right):
+    if left is None or right is None:
+        return left or right
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _update(left)
+        return left
+    right.left = _merge(left, right.left)
+    _update(right)
+    return right
+
+
+class OrderStatisticTreap:
+    """Sorted set of unique keys with O(log n) insert / remove / rank / select."""
+
+    def __init__(self):
+        self.root = None
+
+    def __len__(self) -> int:
+        return _size(self.root)
+
+    def insert(self, key):
+        left, right = _split(self.root, key)
+        self.root = _merge(_merge(left, _Node(key)), right)
+
+    def remove(self, key):
+        left, right = _split(self.root, key)
+        _, right = _split(right, key, inclusive=True)
+        self.root = _merge(left, right)
+
+    def rank(self, key) -> int:
+        """Number of keys < key."""
+        node, count = self.root, 0
+        while node is not None:
+            if node.key < key:
+                count += _size(node.left) + 1
+                node = node.right
+            else:
+                node = node.left
+        return count
+
+    def select(self, index: int):
+        """The index-th smallest key (0-based)."""
+        node = self.root
+        while node is not None:
+            left = _size(node.left)
+            if index < left:
+                node = node.left
+            elif index == left:
+                return node.key
+            else:
+                index -= left + 1
+                node = node.right
+        raise IndexError(index)
+
+    def slice(self, start: int, count: int) -> List:
+        """Keys at positions [start, start + count), skipping whole subtrees before start."""
+        out = []
+
+        def walk(node, offset):
+            # offset = position of the first key in this subtree
+            if node is None or len(out) >= count:
+                return
+            left = _size(node.left)
+            if start < offset + left:
+                walk(node.left, offset)
+            position = offset + left
+            if start <= position and len(out) < count:
+                out.append(node.key)
+            if position + 1 < start + count:
+                walk(node.right, position + 1)
+
+        walk(self.root, 0)
+        return out
+
+
+def board_key(solved: int, penalty: int, last_solved_at: Optional[int], user_id: int) -> tuple:
+    return (-solved, penalty, last_solved_at or 0, user_id)
+
+
+class Leaderboard:
+    def __init__(self, contest_id: int):
+        self.contest_id = contest_id
+        self.tree = OrderStatisticTreap()
+        self.keys: Dict[int, tuple] = {}  # user_id -> current key
+        self.rows: Dict[int, dict] = {}  # user_id -> standing snapshot
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.tree)
+
+    def rank(self, user_id: int) -> Optional[int]:
+        """1-based; participants tied on (solved, penalty) share a rank."""
+        key = self.keys.get(user_id)
+        if key is None:
+            return None
+        return self.tree.rank((key[0], key[1])) + 1  # (-solved, penalty) sorts before every full key with them
+
+    def upsert(self, row: dict) -> Tuple[Optional[int], int]:
+        """Places/moves one participant; returns (old rank, new rank)."""
+        user_id = row["user_id"]
+        old_rank = self.rank(user_id)
+        if user_id in self.keys:
+            self.tree.remove(self.keys[user_id])
+        key = board_key(row["solved"], row["penalty"], row["last_solved_at"], user_id)
+        self.tree.insert(key)
+        self.keys[user_id] = key
+        self.rows[user_id] = row
+        return old_rank, self.rank(user_id)
+
+    def page(self, offset: int, limit: int) -> List[dict]:
+        return [
+            {**self.rows[key[-1]], "rank": self.tree.rank((key[0], key[1])) + 1}
+            for key in self.tree.slice(offset, limit)
+        ]
+
+    def publish(self, event: dict):
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A subscriber that can't keep up is dropped rather than slowing judging down
+                self.subscribers.discard(queue)
+
+    def subscribe(self, max_backlog: int = 1000) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=max_backlog)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+
+
+_boards: Dict[int, Leaderboard] = {}
+
+
+def entry_row(entry: ContestEntry, username: Optional[str]) -> dict:
+    return {
+        "user_id": entry.user_id,
+        "username": username,
+        "solved": entry.solved,
+        "penalty": entry.penalty,
+        "last_solved_at": entry.last_solved_at,
+        "problems": json.loads(entry.problem_state or "{}"),
+    }
+
+
+async def get_board(db: AsyncSession, contest_id: int) -> Leaderboard:
+    board = _boards.get(contest_id)
+    if board is None or time.monotonic() - board.loaded_at > BOARD_RELOAD_SECONDS:
+        result = await db.execute(
+            select(ContestEntry, User.username)
+            .join(User, User.id == ContestEntry.user_id)
+            .where(ContestEntry.contest_id == contest_id)
+        )
+        fresh = Leaderboard(contest_id)
+        for entry, username in result.all():
+            fresh.upsert(entry_row(entry, username))
+        if board is not None:
+            fresh.subscribers = board.subscribers  # Keep live feeds across reloads
+        board = _boards[contest_id] = fresh
+    return board
+
+
+async def _locked_entry(db: AsyncSession, contest_id: int, user_id: int) -> ContestEntry:
+    # Get-or-create, then lock, so concurrent submissions by one participant serialize (as in user_stats)
+    insert = dialect_insert(db)
+    await db.execute(
+        insert(ContestEntry).values(contest_id=contest_id, user_id=user_id)
+        .on_conflict_do_nothing(index_elements=["contest_id", "user_id"])
+    )
+    result = await db.execute(
+        select(ContestEntry)
+        .where(ContestEntry.contest_id == contest_id, ContestEntry.user_id == user_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().one()
+
+
+async def record_submission(db: AsyncSession, contest_id: int, user_id: int, username: Optional[str],
+                            problem_id: int, status: str, when: Optional[datetime] = None) -> Optional[dict]:
+    """
+    Applies one judged submission to the participant's entry. Caller commits, then passes the
+    returned row to apply_update(). None when it doesn't count (contest not running, problem not in
+    the contest, already solved, compilation error).
+    """
+    when = when or datetime.utcnow()
+    result = await db.execute(select(Contest).where(Contest.id == contest_id))
+    contest = result.scalars().first()
+    if contest is None or not contest.is_running(when) or problem_id not in {p.id for p in contest.problems}:
+        return None
+    if status in NOT_COUNTED:
+        return None
+
+    entry = await _locked_entry(db, contest_id, user_id)
+    state = json.loads(entry.problem_state or "{}")
+    problem = state.setdefault(str(problem_id), {"attempts": 0, "solved_at": None})
+    if problem["solved_at"] is not None:
+        return None
+
+    if status == "Accepted":
+        minute = int((when - contest.start_time).total_seconds() // 60)
+        problem["solved_at"] = minute
+        entry.solved += 1
+        entry.penalty += minute + contest.penalty_minutes * problem["attempts"]
+        entry.last_solved_at = minute
+    else:
+        problem["attempts"] += 1
+    entry.problem_state = json.dumps(state, sort_keys=True)
+    return {"contest_id": contest_id, **entry_row(entry, username)}
+
+
+def apply_update(update: dict):
+    """Moves the participant on this process's board (if loaded) and publishes the change."""
+    board = _boards.get(update["contest_id"])
+    if board is None:
+        return  # Built from contest_entries on first read
+    row = {k: v for k, v in update.items() if k != "contest_id"}
+    old_rank, new_rank = board.upsert(row)
+    board.publish({
+        "user_id": row["user_id"],
+        "username": row["username"],
+        "old_rank": old_rank,
+        "new_rank": new_rank,
+        "solved": row["solved"],
+        "penalty": row["penalty"],
+        "participants": len(board),
+    })
+
+
+async def feed(board: Leaderboard, is_disconnected, heartbeat: float = 15.0) -> AsyncIterator[str]:
+    """SSE stream of rank changes for one board; a comment line every `heartbeat` seconds keeps proxies open."""
+    queue = board.subscribe()
+    try:
+        yield f"event: hello\ndata: {json.dumps({'participants': len(board)})}\n\n"
+        while not await is_disconnected():
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                if queue not in board.subscribers:
+                    return  # Dropped for falling behind; the client reconnects and reloads standings
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: rank\ndata: {json.dumps(event)}\n\n"
+    finally:
+        board.unsubscribe(queue)
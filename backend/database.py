@@ -1,23 +1,39 @@
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from fastapi import Request
+import logging
 import os
+import time
 from dotenv import load_dotenv
 
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
 env_path = Path(__file__).parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
-DATABASE_URL = os.getenv("DATABASE_URL")
-if DATABASE_URL and DATABASE_URL.startswith("postgres://"):
-    DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql+asyncpg://", 1)
+def _normalize_url(url):
+    if url and url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql+asyncpg://", 1)
+    return url
 
+DATABASE_URL = _normalize_url(os.getenv("DATABASE_URL"))
+# Optional read replica for read-only routes (see get_read_db). Unset -> everything uses the primary.
+READ_DATABASE_URL = _normalize_url(os.getenv("READ_DATABASE_URL"))
 
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=True,
-    connect_args={"statement_cache_size": 0}
-)
+def _create_engine(url):
+    # statement_cache_size is asyncpg-specific (needed behind pgbouncer); other drivers (e.g. aiosqlite for local smoke runs) reject it
+    connect_args = {"statement_cache_size": 0} if url.startswith("postgresql+asyncpg") else {}
+    return create_async_engine(
+        url,
+        echo=False,  # DB_ECHO logs SQL through backend.logs instead of SQLAlchemy's synchronous handler
+        connect_args=connect_args
+    )
+
+engine = _create_engine(DATABASE_URL)
+read_engine = _create_engine(READ_DATABASE_URL) if READ_DATABASE_URL else engine
 
 SessionLocal = sessionmaker(
     bind=engine,
@@ -25,8 +41,96 @@ SessionLocal = sessionmaker(
     expire_on_commit=False,
 )
 
+ReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
 Base = declarative_base()
 
 async def get_db():
     async with SessionLocal() as session:
         yield session
+
+# --- Read/write routing ---
+#
+# Reads go to the replica unless
+#   * the request touches something written within READ_AFTER_WRITE_WINDOW seconds
+#     (read-your-writes: a user's submission list right after they submit, a problem right after an edit), or
+#   * the replica is more than REPLICA_MAX_LAG seconds behind (checked every REPLICA_LAG_CHECK_INTERVAL seconds).
+# Recent writes are tracked per process, so with several workers behind a load balancer the window
+# only covers requests landing on the worker that did the write; keep REPLICA_MAX_LAG small in that setup.
+
+READ_AFTER_WRITE_WINDOW = float(os.getenv("READ_AFTER_WRITE_WINDOW", "5"))
+REPLICA_MAX_LAG = float(os.getenv("REPLICA_MAX_LAG", "10"))
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", "5"))
+
+# Caught up with everything it received -> 0, otherwise time since the last replayed transaction
+REPLICA_LAG_SQL = (
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+_recent_writes = {}  # key -> monotonic time of the last write
+_replica_lag = {"checked_at": 0.0, "lag": 0.0}
+
+def write_key(kind: str, value) -> str:
+    return f"{kind}:{value}"
+
+def note_write(*keys):
+    """Call after committing a write so reads of the same keys stay on the primary for a moment."""
+    now = time.monotonic()
+    if len(_recent_writes) > 10000:
+        for key, at in list(_recent_writes.items()):
+            if now - at > READ_AFTER_WRITE_WINDOW:
+                del _recent_writes[key]
+    for key in keys:
+        _recent_writes[key] = now
+
+def _request_keys(request: Request):
+    params = {**request.query_params, **request.path_params}
+    if params.get("clerk_id"):
+        yield write_key("user", params["clerk_id"])
+    if params.get("problem_id"):
+        yield write_key("problem", params["problem_id"])
+    if params.get("slug"):
+        yield write_key("slug", params["slug"])
+
+def _recently_written(request: Request) -> bool:
+    now = time.monotonic()
+    return any(now - _recent_writes.get(key, float("-inf")) < READ_AFTER_WRITE_WINDOW for key in _request_keys(request))
+
+async def replica_lag() -> float:
+    now = time.monotonic()
+    if now - _replica_lag["checked_at"] > REPLICA_LAG_CHECK_INTERVAL:
+        _replica_lag["checked_at"] = now
+        try:
+            async with read_engine.connect() as conn:
+                _replica_lag["lag"] = float((await conn.execute(text(REPLICA_LAG_SQL))).scalar() or 0)
+        except Exception as e:
+            # Unreachable replica counts as infinitely behind until the next check
+            logger.warning("Replica lag check failed: %s", e)
+            _replica_lag["lag"] = float("inf")
+    return _replica_lag["lag"]
+
+async def get_read_db(request: Request):
+    """Session for read-only routes: the replica when one is configured and fresh enough, else the primary."""
+    use_primary = (
+        read_engine is engine
+        or _recently_written(request)
+        or (read_engine.dialect.name == "postgresql" and await replica_lag() > REPLICA_MAX_LAG)
+    )
+    async with (SessionLocal if use_primary else ReadSessionLocal)() as session:
+        yield session
+
+def dialect_insert(session):
+    """
+    Returns the dialect-specific `insert` for the session's engine, which supports
+    on_conflict_do_update / on_conflict_do_nothing on both Postgres and SQLite.
+    """
+    if session.bind.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert
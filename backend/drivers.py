@@ -150,3 +150,157 @@ public class Main {{
 // User Code
 {user_code}
 """
+
+BATCH_RESULT_MARKER = "__DSA_BATCH_RESULT__"
+
+def get_python_batch_driver(user_code: str) -> str:
+    # Same argument parsing as get_python_driver, but stdin is a JSON list of case inputs and
+    # one run answers all of them. Used to compute expected outputs from a reference solution
+    # in bulk. Prints from the user code are swallowed; the last line is the marker + JSON results.
+    return f"""
+import sys
+import ast
+import io
+import json
+import contextlib
+
+# User Code
+{user_code}
+
+def _run_case(input_str):
+    lines = [line for line in input_str.strip().split('\\n') if line.strip()]
+    args = [ast.literal_eval(line) for line in lines]
+    sol = Solution()
+    method_name = [func for func in dir(sol) if callable(getattr(sol, func)) and not func.startswith("__")][0]
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = getattr(sol, method_name)(*args)
+    return str(result)
+
+if __name__ == "__main__":
+    cases = json.loads(sys.stdin.read())
+    results = []
+    for input_str in cases:
+        try:
+            results.append({{"ok": True, "output": _run_case(input_str)}})
+        except Exception as e:
+            results.append({{"ok": False, "error": f"{{type(e).__name__}}: {{e}}"}})
+    sys.stdout.write("\\n{BATCH_RESULT_MARKER}" + json.dumps(results) + "\\n")
+"""
+
+GENERATOR_RESULT_MARKER = "__DSA_GENERATOR_RESULT__"
+
+def get_python_generator_driver(generator_code: str) -> str:
+    # Runs a test case generator (see testgen.py) in the sandbox. stdin is {"seed", "start", "stop"};
+    # every index gets its own seeded Random, so a range produces the same inputs in any batching.
+    # The last line is the marker + a JSON list of input texts.
+    return f"""
+import sys
+import io
+import json
+import random
+import contextlib
+
+# Generator Code
+{generator_code}
+
+def _format_input(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, tuple):
+        return "\\n".join(json.dumps(arg) if isinstance(arg, str) else str(arg) for arg in value)
+    return str(value)
+
+if __name__ == "__main__":
+    request = json.loads(sys.stdin.read())
+    if not callable(globals().get("generate")):
+        raise SystemExit("Generator script must define generate(rng, index)")
+    inputs = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(request["start"], request["stop"]):
+            inputs.append(_format_input(generate(random.Random(request["seed"] * 1_000_003 + i), i)))
+    sys.stdout.write("\\n{GENERATOR_RESULT_MARKER}" + json.dumps(inputs) + "\\n")
+"""
+
+CHECK_RESULT_MARKER = "__DSA_CHECK_RESULT__"
+CHECK_EXCERPT_CHARS = 512
+
+# In-sandbox checking (see judge.py): the program's stdout is captured inside the sandbox,
+# stripped and hashed there. The first stdin line carries a nonce for this run
+#     #check <nonce>
+# and only the marker line with it, __DSA_CHECK_RESULT__<nonce>{"hash", "size", "excerpt"}, comes back.
+# The verdict is decided by the judge, never in the sandbox: the expected output doesn't go in at all.
+
+def get_python_checker(program: str) -> str:
+    return f"""
+import sys
+import io
+import json
+import hashlib
+import contextlib
+
+def _check(program):
+    # Locals, not module globals: the user program runs as __main__ and can read those
+    header, _, rest = sys.stdin.read().partition("\\n")
+    fields = header.split()
+    nonce = fields[1] if len(fields) > 1 else ""
+    sys.stdin = io.StringIO(rest)
+
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        # Errors escaping the program (e.g. a SyntaxError in the user code) still exit non-zero with a traceback
+        exec(compile(program, "main.py", "exec"), {{"__name__": "__main__"}})
+
+    out = buf.getvalue().strip().encode()
+    sys.stdout.write("\\n{CHECK_RESULT_MARKER}" + nonce + json.dumps({{
+        "hash": hashlib.sha256(out).hexdigest(),
+        "size": len(out),
+        "excerpt": out[:{CHECK_EXCERPT_CHARS}].decode(errors="replace"),
+    }}) + "\\n")
+
+_check({program!r})
+"""
+
+def get_java_checker(program: str) -> str:
+    # The driver's Main becomes DriverMain and a new Main wraps it
+    program = program.replace("public class Main {", "class DriverMain {", 1)
+    return program + f"""
+public class Main {{
+    public static void main(String[] args) throws Exception {{
+        String stdin = new String(System.in.readAllBytes(), java.nio.charset.StandardCharsets.UTF_8);
+        int newline = stdin.indexOf('\\n');
+        String header = newline >= 0 ? stdin.substring(0, newline) : stdin;
+        String rest = newline >= 0 ? stdin.substring(newline + 1) : "";
+        String[] fields = header.trim().split("\\\\s+");
+        String nonce = fields.length > 1 ? fields[1] : "";
+        System.setIn(new ByteArrayInputStream(rest.getBytes(java.nio.charset.StandardCharsets.UTF_8)));
+
+        PrintStream realOut = System.out;
+        ByteArrayOutputStream captured = new ByteArrayOutputStream();
+        System.setOut(new PrintStream(captured, true, "UTF-8"));
+        try {{
+            DriverMain.main(args);
+        }} finally {{
+            System.out.flush();
+            System.setOut(realOut);
+        }}
+
+        byte[] out = captured.toString("UTF-8").strip().getBytes(java.nio.charset.StandardCharsets.UTF_8);
+        byte[] digest = java.security.MessageDigest.getInstance("SHA-256").digest(out);
+        StringBuilder hash = new StringBuilder();
+        for (byte b : digest) hash.append(String.format("%02x", b));
+        String excerpt = new String(out, 0, Math.min(out.length, {CHECK_EXCERPT_CHARS}), java.nio.charset.StandardCharsets.UTF_8);
+        realOut.println("\\n{CHECK_RESULT_MARKER}" + nonce + "{{\\"hash\\":\\"" + hash + "\\",\\"size\\":" + out.length
+            + ",\\"excerpt\\":" + jsonString(excerpt) + "}}");
+    }}
+
+    private static String jsonString(String s) {{
+        StringBuilder sb = new StringBuilder("\\"");
+        for (char c : s.toCharArray()) {{
+            if (c == '"' || c == '\\\\') sb.append('\\\\').append(c);
+            else if (c < 0x20) sb.append(String.format("\\\\u%04x", (int) c));
+            else sb.append(c);
+        }}
+        return sb.append('"').toString();
+    }}
+}}
+"""
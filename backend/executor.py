@@ -0,0 +1,337 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import List, Optional
+
+import httpx
+
+from backend import profiling
+from backend import local_executor
+
+# Outbound client for the code execution engine (Piston).
+#
+# The public Piston endpoint rate-limits callers, so every execution goes
+# through this client instead of a bare httpx call. It:
+#   * paces requests per endpoint with a token bucket (EXECUTOR_RATE_PER_SEC / EXECUTOR_BURST)
+#   * retries transient failures (429, 5xx, network errors) with jittered exponential backoff
+#   * opens a circuit breaker per endpoint after sustained failures
+#   * round-robins across every endpoint in PISTON_API_URLS (e.g. a local Piston stand-in)
+#   * runs `local://` endpoints in-process through local_executor (no pacing; see that module)
+#
+# Executions are pure functions of (code, stdin), so retrying them is always safe.
+
+DEFAULT_PISTON_URL = "https://emkc.org/api/v2/piston/execute"
+
+logger = logging.getLogger(__name__)
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_urls() -> List[str]:
+    # Comma-separated list, falls back to the single-URL variable and then the public endpoint
+    raw = os.getenv("PISTON_API_URLS") or os.getenv("PISTON_API_URL") or DEFAULT_PISTON_URL
+    return [url.strip() for url in raw.split(",") if url.strip()]
+
+
+class ExecutorUnavailable(Exception):
+    """Raised when no executor endpoint could run the payload after all retries."""
+
+
+class RateLimiter:
+    """Token bucket: `rate` requests per second with bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return  # Pacing disabled
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """
+    Closed -> Open after `failure_threshold` consecutive failures.
+    Open -> Half-open once `reset_timeout` seconds have passed; one trial request is let through.
+    Half-open -> Closed on success, back to Open on failure. Until the trial reports back, every
+    other caller is turned away; a trial that never reports (e.g. cancelled) is replaced after
+    another `reset_timeout`.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_started_at: Optional[float] = None
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == self.OPEN:
+            if now - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+        elif self.trial_started_at is not None and now - self.trial_started_at < self.reset_timeout:
+            return False  # Half-open with the trial still in flight
+        self.trial_started_at = now
+        return True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trial_started_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_started_at = None
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+class ExecutorEndpoint:
+    def __init__(self, url: str, rate: float, burst: int, failure_threshold: int, reset_timeout: float):
+        self.url = url
+        self.local = url.startswith(local_executor.LOCAL_SCHEME)
+        self.limiter = RateLimiter(0 if self.local else rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+
+class _TransientError(Exception):
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def runtimes_url(endpoint: ExecutorEndpoint) -> str:
+    # Piston serves GET .../runtimes next to POST .../execute
+    return endpoint.url.rsplit("/", 1)[0] + "/runtimes"
+
+
+class ExecutorClient:
+    def __init__(
+        self,
+        urls: List[str],
+        rate: float = 5.0,
+        burst: int = 5,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        timeout: float = 30.0,
+    ):
+        if not urls:
+            raise ValueError("At least one executor endpoint is required")
+        self.endpoints = [
+            ExecutorEndpoint(url, rate, burst, failure_threshold, reset_timeout) for url in urls
+        ]
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self._next = 0
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    def from_env(cls) -> "ExecutorClient":
+        return cls(
+            urls=_env_urls(),
+            rate=_env_float("EXECUTOR_RATE_PER_SEC", 5.0),
+            burst=_env_int("EXECUTOR_BURST", 5),
+            max_retries=_env_int("EXECUTOR_MAX_RETRIES", 3),
+            backoff_base=_env_float("EXECUTOR_BACKOFF_BASE", 0.5),
+            backoff_max=_env_float("EXECUTOR_BACKOFF_MAX", 8.0),
+            failure_threshold=_env_int("EXECUTOR_BREAKER_THRESHOLD", 5),
+            reset_timeout=_env_float("EXECUTOR_BREAKER_RESET", 30.0),
+            timeout=_env_float("EXECUTOR_TIMEOUT", 30.0),
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # One pooled client for the whole process so connections are reused across requests
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        return self._client
+
+    async def close(self):
+        await local_executor.runner.close()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _pick_endpoint(self) -> Optional[ExecutorEndpoint]:
+        # Round-robin, skipping endpoints whose breaker is open
+        for _ in range(len(self.endpoints)):
+            endpoint = self.endpoints[self._next % len(self.endpoints)]
+            self._next += 1
+            if endpoint.breaker.allow():
+                return endpoint
+        return None
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, min(max, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def _post(self, endpoint: ExecutorEndpoint, payload: dict) -> dict:
+        if endpoint.local:
+            try:
+                return await local_executor.runner.execute(payload)
+            except local_executor.LocalExecutorError as e:
+                raise _TransientError(str(e))
+        try:
+            response = await self.client.post(endpoint.url, json=payload)
+        except httpx.TransportError as e:
+            raise _TransientError(f"{type(e).__name__}: {e}")
+
+        if response.status_code == 429 or response.status_code >= 500:
+            retry_after = response.headers.get("Retry-After")
+            try:
+                retry_after = float(retry_after) if retry_after else None
+            except ValueError:
+                retry_after = None
+            raise _TransientError(f"HTTP {response.status_code} from {endpoint.url}", retry_after)
+
+        # Other 4xx are caller errors (bad language, malformed payload); retrying won't help
+        response.raise_for_status()
+        return response.json()
+
+    async def ping(self) -> List[dict]:
+        """
+        Probes every endpoint's runtimes listing (a cheap GET next to /execute) and reports latency.
+        Used by /readyz and the startup warm-up, which also opens the pooled connection / TLS session.
+        """
+        async def probe(endpoint: ExecutorEndpoint) -> dict:
+            url = runtimes_url(endpoint)
+            start = time.perf_counter()
+            if endpoint.local:
+                try:
+                    await local_executor.runner.runtimes()
+                    ok, error = True, None
+                except Exception as e:
+                    # Starting the local pools can fail in many ways (no interpreter, bad LOCAL_JAVA, ...)
+                    ok, error = False, f"{type(e).__name__}: {e}"
+            else:
+                try:
+                    await endpoint.limiter.acquire()
+                    response = await self.client.get(url)
+                    ok = response.status_code < 400
+                    error = None if ok else f"HTTP {response.status_code}"
+                except httpx.HTTPError as e:
+                    ok, error = False, f"{type(e).__name__}: {e}"
+            return {
+                "url": endpoint.url,
+                "ok": ok,
+                "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+                "breaker": endpoint.breaker.state,
+                "error": error,
+            }
+
+        return list(await asyncio.gather(*(probe(endpoint) for endpoint in self.endpoints)))
+
+    async def runtimes(self) -> List[dict]:
+        """
+        The runtimes ({"language", "version", "aliases"}) that every endpoint which answers can run, so a
+        version pinned from this list is accepted wherever round-robin sends it. Local endpoints run any
+        version of their languages: next to remote endpoints they only narrow the languages.
+        """
+        async def listing(endpoint: ExecutorEndpoint) -> List[tuple]:
+            if endpoint.local:
+                runtimes = await local_executor.runner.runtimes()
+            else:
+                await endpoint.limiter.acquire()
+                response = await self.client.get(runtimes_url(endpoint))
+                response.raise_for_status()
+                runtimes = response.json()
+            return [(name, runtime["version"]) for runtime in runtimes
+                    for name in [runtime["language"], *runtime.get("aliases", [])]]
+
+        listings = await asyncio.gather(*(listing(endpoint) for endpoint in self.endpoints), return_exceptions=True)
+        errors, local, remote = [], [], []
+        for endpoint, result in zip(self.endpoints, listings):
+            if isinstance(result, Exception):
+                # Not only HTTP errors: local pools that fail to start, a malformed listing, ...
+                errors.append(f"{endpoint.url}: {type(result).__name__}: {result}")
+            else:
+                (local if endpoint.local else remote).append(result)
+        if not local and not remote:
+            raise ExecutorUnavailable("Could not list runtimes: " + "; ".join(errors))
+        if errors:
+            logger.warning("Runtimes listed without %s", "; ".join(errors))
+
+        if remote:
+            common = set.intersection(*(set(pairs) for pairs in remote))
+            for pairs in local:
+                names = {name for name, _ in pairs}
+                common = {(name, version) for name, version in common if name in names}
+        else:
+            common = set(local[0])
+        return [{"language": name, "version": version, "aliases": []} for name, version in sorted(common)]
+
+    async def execute(self, payload: dict) -> dict:
+        """
+        Runs a Piston execute payload and returns the raw JSON response.
+        Raises ExecutorUnavailable when every attempt failed transiently or all breakers are open,
+        and httpx.HTTPStatusError for non-retryable 4xx responses.
+        """
+        last_error = "no executor endpoint available"
+        for attempt in range(self.max_retries + 1):
+            endpoint = self._pick_endpoint()
+            if endpoint is None:
+                raise ExecutorUnavailable(f"All executor endpoints are unavailable ({last_error})")
+
+            await endpoint.limiter.acquire()
+            try:
+                async with profiling.timed("executor"):
+                    result = await self._post(endpoint, payload)
+            except _TransientError as e:
+                endpoint.breaker.record_failure()
+                last_error = str(e)
+                logger.debug("Executor attempt failed", extra={"endpoint": endpoint.url, "attempt": attempt, "error": last_error})
+                if attempt < self.max_retries:
+                    delay = self._backoff(attempt)
+                    if e.retry_after is not None:
+                        delay = max(delay, min(e.retry_after, self.backoff_max))
+                    await asyncio.sleep(delay)
+                continue
+            except httpx.HTTPStatusError:
+                # The endpoint answered (a caller error): it's up, and a half-open trial is over
+                endpoint.breaker.record_success()
+                raise
+
+            endpoint.breaker.record_success()
+            return result
+
+        raise ExecutorUnavailable(f"Executor failed after {self.max_retries + 1} attempts ({last_error})")
+
+
+executor = ExecutorClient.from_env()
@@ -1,66 +1,61 @@
+import argparse
 import asyncio
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
-from backend.database import SessionLocal
-from backend.models.problem import Problem
+from backend.models.problem import Problem, TestCase
+from backend import backfill
 
-async def fix():
-    async with SessionLocal() as session:
-        # Find the Two Sum problem
-        result = await session.execute(
-            select(Problem).options(selectinload(Problem.test_cases)).where(Problem.slug == "two-sum")
-        )
-        problem = result.scalars().first()
-        
-        if problem and problem.test_cases:
-            for tc in problem.test_cases:
-                print(f"Checking TC ID {tc.id}: {tc.input_data!r}")
-                
-                # Check if it looks like CP format (starts with a single number, then space sep args)
-                lines = tc.input_data.strip().split('\n')
-                if len(lines) >= 3:
-                     # Heuristic: 
-                     # Line 1: Count (ignore)
-                     # Line 2: Array elements (space separated)
-                     # Line 3: Target
-                     try:
-                         # array_elements = lines[1].split()
-                         # target = lines[2]
-                         # Check if line 1 is just an integer (count)
-                         int(lines[0]) 
-                         
-                         narr = [int(x) for x in lines[1].split()]
-                         target = int(lines[2])
-                         
-                         new_input = f"{narr}\n{target}"
-                         tc.input_data = new_input
-                         session.add(tc)
-                         print(f"  -> Fixed to: {new_input!r}")
-                     except ValueError:
-                         print("  -> Could not auto-fix (ValueError)")
-                elif len(lines) == 1:
-                     # Maybe just `3 2 4` ?
-                     pass
-                
-                # Fix Outputs as well
-                if " " in tc.expected_output and "[" not in tc.expected_output:
-                     try:
-                         # Try converting "0 1" -> "[0, 1]"
-                         out_parts = [int(x) for x in tc.expected_output.split()]
-                         new_out = str(out_parts)
-                         tc.expected_output = new_out
-                         session.add(tc)
-                         print(f"  -> Fixed Output to: {new_out!r}")
-                     except ValueError:
-                         pass
+# Rewrites competitive-programming style test cases ("count\nelements\ntarget", "0 1") into the
+# one-argument-per-line format the drivers parse ("[elements]\ntarget", "[0, 1]").
+# Runs in chunks through backend/backfill.py, so it is resumable and safe on large problems.
+#
+#   python -m backend.fix_testcase --slug two-sum --dry-run
 
-            await session.commit()
-            print("Finished fixing test cases.")
-        else:
-            print("Problem 'two-sum' not found or has no test cases.")
+def fix_input(input_data: str):
+    # Heuristic:
+    # Line 1: Count (ignore)
+    # Line 2: Array elements (space separated)
+    # Line 3: Target
+    lines = input_data.strip().split('\n')
+    if len(lines) < 3:
+        return None
+    try:
+        int(lines[0])
+        narr = [int(x) for x in lines[1].split()]
+        target = int(lines[2])
+    except ValueError:
+        return None
+    return f"{narr}\n{target}"
 
-if __name__ == "__main__":
+def fix_output(expected_output: str):
+    # Try converting "0 1" -> "[0, 1]"
+    if " " not in expected_output or "[" in expected_output:
+        return None
     try:
-        asyncio.run(fix())
-    except Exception as e:
-        print(f"Error: {e}")
+        return str([int(x) for x in expected_output.split()])
+    except ValueError:
+        return None
+
+async def fix_chunk(session, test_cases) -> int:
+    changed = 0
+    for tc in test_cases:
+        new_input = fix_input(tc.input_data)
+        new_output = fix_output(tc.expected_output)
+        if new_input is not None:
+            print(f"  TC {tc.id}: input {tc.input_data!r} -> {new_input!r}")
+            tc.input_data = new_input
+        if new_output is not None:
+            print(f"  TC {tc.id}: output {tc.expected_output!r} -> {new_output!r}")
+            tc.expected_output = new_output
+        changed += new_input is not None or new_output is not None
+    return changed
+
+async def fix(slug: str, options: backfill.BackfillOptions):
+    query = select(TestCase).join(Problem, Problem.id == TestCase.problem_id).where(Problem.slug == slug)
+    await backfill.run_backfill(f"fix_testcase_{slug}", query, TestCase.id, fix_chunk, options)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert CP-style test cases of a problem to driver format.")
+    parser.add_argument("--slug", default="two-sum")
+    backfill.add_arguments(parser, batch_size=200)
+    args = parser.parse_args()
+    asyncio.run(fix(args.slug, backfill.options_from_args(args)))
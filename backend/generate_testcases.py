@@ -0,0 +1,50 @@
+import argparse
+import asyncio
+from sqlalchemy.future import select
+from backend.database import SessionLocal
+from backend.models.problem import Problem
+from backend import testgen
+
+# Bulk-generate test cases for a problem from the command line (same pipeline as
+# POST /problems/{id}/testcases/generate, without HTTP timeouts for very large runs).
+#
+#   python -m backend.generate_testcases two-sum gen.py ref.py --count 5000 --seed 42
+
+async def main(args):
+    with open(args.generator) as f:
+        generator_code = f.read()
+    with open(args.reference) as f:
+        reference_code = f.read()
+
+    async with SessionLocal() as session:
+        result = await session.execute(select(Problem).where(Problem.slug == args.slug))
+        problem = result.scalars().first()
+        if not problem:
+            print(f"Problem '{args.slug}' not found.")
+            return
+
+        summary = await testgen.generate_test_cases(
+            session,
+            problem.id,
+            generator_code=generator_code,
+            reference_code=reference_code,
+            count=args.count,
+            seed=args.seed,
+            is_hidden=not args.public,
+            batch_size=args.batch_size,
+        )
+        print(f"Generated {summary['generated']}, duplicates {summary['duplicates']}, "
+              f"failed {summary['failed']}, inserted {summary['inserted']}")
+        for error in summary["errors"]:
+            print(f"  {error}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate test cases from a generator script and a reference solution.")
+    parser.add_argument("slug")
+    parser.add_argument("generator", help="Python file defining generate(rng, index)")
+    parser.add_argument("reference", help="Python file with the reference Solution class")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=testgen.BATCH_SIZE)
+    parser.add_argument("--public", action="store_true", help="Mark generated cases as visible samples")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,119 @@
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException, Response
+
+# Idempotency-Key support for endpoints that cost executor time.
+#
+# The first request with a key runs; its result is kept for IDEMPOTENCY_TTL seconds and replayed
+# (with `Idempotent-Replayed: true`) to later requests with the same key. A retry that arrives while
+# the first run is still in flight waits for it instead of judging again. Reusing a key with a
+# different request body is a 422.
+#
+# Client errors (4xx) are replayed like results; server errors and 503s are not stored, so a retry
+# after an executor outage actually runs. The store is per process (like the other in-memory caches):
+# with several workers, retries only dedupe when they land on the same one.
+
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", "3600"))
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+MAX_KEY_LENGTH = 255
+
+
+@dataclass
+class Entry:
+    fingerprint: str
+    future: asyncio.Future
+    created_at: float = field(default_factory=time.monotonic)
+
+
+def _consume_exception(future: asyncio.Future):
+    # Nobody may be waiting; mark the exception retrieved so asyncio doesn't log it
+    if not future.cancelled():
+        future.exception()
+
+
+class IdempotencyStore:
+    def __init__(self, ttl: float = IDEMPOTENCY_TTL, max_entries: int = IDEMPOTENCY_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Entry]" = OrderedDict()
+
+    def _get(self, key: str) -> Optional[Entry]:
+        entry = self.entries.get(key)
+        if entry is not None and entry.future.done() and time.monotonic() - entry.created_at > self.ttl:
+            del self.entries[key]
+            return None
+        return entry
+
+    def _evict(self):
+        # Oldest finished entries first; in-flight ones are never dropped
+        for key in list(self.entries):
+            if len(self.entries) <= self.max_entries:
+                break
+            if self.entries[key].future.done():
+                del self.entries[key]
+
+    async def run(self, key: str, fingerprint: str, fn: Callable[[], Awaitable]):
+        """Returns (result, replayed)."""
+        while True:
+            entry = self._get(key)
+            if entry is None:
+                break
+            if entry.fingerprint != fingerprint:
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+            try:
+                return await asyncio.shield(entry.future), True
+            except asyncio.CancelledError:
+                if not entry.future.cancelled():
+                    raise  # We were cancelled ourselves
+                # The first run was abandoned (client went away) - run it here instead
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+        entry = self.entries[key] = Entry(fingerprint, future)
+        self._evict()
+        try:
+            result = await fn()
+        except HTTPException as e:
+            if e.status_code >= 500:
+                self.entries.pop(key, None)
+            future.set_exception(e)
+            raise
+        except asyncio.CancelledError:
+            self.entries.pop(key, None)
+            future.cancel()
+            raise
+        except Exception as e:
+            self.entries.pop(key, None)
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        # TTL counts from completion
+        entry.created_at = time.monotonic()
+        return result, False
+
+
+store = IdempotencyStore()
+
+
+def fingerprint(*parts) -> str:
+    raw = "\x1f".join(p.model_dump_json() if hasattr(p, "model_dump_json") else str(p) for p in parts)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+async def idempotent(key: Optional[str], scope: str, request_parts: tuple, response: Response,
+                     fn: Callable[[], Awaitable]):
+    """Runs fn() once per (scope, Idempotency-Key); without a key it just runs."""
+    if not key:
+        return await fn()
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters")
+    result, replayed = await store.run(f"{scope}:{key}", fingerprint(*request_parts), fn)
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
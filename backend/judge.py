@@ -0,0 +1,204 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import AsyncIterator, List, Optional
+
+from fastapi import HTTPException
+
+from backend.executor import executor, ExecutorUnavailable
+from backend import languages
+from backend.drivers import CHECK_RESULT_MARKER, CHECK_EXCERPT_CHARS
+
+# Shared judging flow: wrap user code in a driver, run it against test cases one by one
+# and compare against the expected output. Used by the blocking submit endpoint and by
+# the streaming one, which forwards each CaseResult to the client as soon as it is known.
+#
+# ExecutorUnavailable is deliberately NOT caught here: callers turn it into a 503 instead
+# of recording a verdict the user didn't earn.
+#
+# In-sandbox checking: for large expected outputs, shipping the program's whole stdout back and
+# comparing here costs executor bandwidth and our memory for nothing. With JUDGE_COMPARE_MODE
+#   api      always compare here (the original behaviour)
+#   sandbox  always compare in the sandbox (languages with a checker)
+#   auto     compare in the sandbox when the expected output is >= JUDGE_SANDBOX_THRESHOLD bytes (default)
+# the driver is wrapped in the language's checker and a fresh nonce goes in as the first stdin line,
+# so the program text is identical across cases. Only the output's hash, its size and a short excerpt
+# come back, on a marker line carrying the nonce; the hash is compared against the expected output's
+# here. The expected output never enters the sandbox, so the program can't learn or forge a verdict.
+# Both sides compare the stripped output, as before.
+
+PASSED = "Passed"
+FINISHED = "Finished"  # Ran cleanly, but there was no expected output to compare against (custom input)
+
+COMPARE_MODE = os.getenv("JUDGE_COMPARE_MODE", "auto").lower()
+SANDBOX_THRESHOLD = int(os.getenv("JUDGE_SANDBOX_THRESHOLD", "1024"))
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CaseResult:
+    index: int
+    test_case_id: Optional[int]
+    status: str  # Passed, Finished, Wrong Answer, Runtime Error, Compilation Error, Error
+    output: str  # Message shown to the user when the case fails
+    time_ms: Optional[float] = None
+    memory_kb: Optional[float] = None
+    stdout: str = ""
+    stderr: str = ""
+
+    @property
+    def passed(self) -> bool:
+        return self.status == PASSED
+
+
+@dataclass
+class Verdict:
+    """Running summary of a judged submission: first failure wins, runtime/memory are the slowest/largest case."""
+    status: str = "Accepted"
+    output: str = ""
+    runtime_ms: Optional[float] = None
+    memory_kb: Optional[float] = None
+    timed: bool = True  # False once a case came back without a sandbox time: the slowest case is then unknown
+
+    def add(self, case: CaseResult):
+        if case.time_ms is None:
+            self.timed, self.runtime_ms = False, None
+        elif self.timed:
+            self.runtime_ms = max(self.runtime_ms or 0.0, case.time_ms)
+        if case.memory_kb is not None:
+            self.memory_kb = max(self.memory_kb or 0.0, case.memory_kb)
+        if not case.passed and self.status == "Accepted":
+            self.status = case.status
+            self.output = case.output
+
+
+def get_language(language: str) -> languages.Language:
+    lang = languages.get(language)
+    if lang is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported language '{language}'. Supported: {', '.join(languages.supported())}.")
+    return lang
+
+
+def build_driver(language: str, code: str) -> str:
+    return get_language(language).driver(code)
+
+
+def compare_in_sandbox(lang: languages.Language, expected: Optional[str]) -> bool:
+    if expected is None or lang.checker is None or COMPARE_MODE == "api":
+        return False
+    return COMPARE_MODE == "sandbox" or len(expected) >= SANDBOX_THRESHOLD
+
+
+@lru_cache(maxsize=64)
+def checked_program(language: str, full_code: str) -> str:
+    # Cases of one submission share the wrapped program
+    return get_language(language).checker(full_code)
+
+
+def parse_check(stdout: str, nonce: str) -> Optional[dict]:
+    _, marker, report = stdout.rpartition(CHECK_RESULT_MARKER + nonce)
+    if not marker:
+        return None
+    try:
+        report = json.loads(report.strip())
+    except ValueError:
+        return None
+    if not isinstance(report, dict) or not isinstance(report.get("hash"), str) \
+            or not isinstance(report.get("size"), int) or not isinstance(report.get("excerpt"), str):
+        return None
+    return report
+
+
+async def run_case(language: str, full_code: str, tc, index: int) -> CaseResult:
+    # Pinned runtime version and per-language limits come from the registry
+    lang = get_language(language)
+    in_sandbox = compare_in_sandbox(lang, tc.expected_output)
+    if in_sandbox:
+        nonce = uuid.uuid4().hex
+        payload = lang.payload(checked_program(language, full_code), f"#check {nonce}\n" + tc.input_data)
+    else:
+        payload = lang.payload(full_code, tc.input_data)
+
+    try:
+        data = await executor.execute(payload)
+    except ExecutorUnavailable:
+        raise
+    except Exception as e:
+        return CaseResult(index, tc.id, "Error", f"Execution Error: {str(e)}")
+
+    run_stage = data.get("run", {})
+    compile_stage = data.get("compile", {})
+
+    # Only the sandbox's own measurements: timing the call here would count pacing waits, retries and
+    # round-trips. Without them the case has no time, and the submission stays out of the percentiles.
+    time_ms = run_stage.get("wall_time")
+    memory = run_stage.get("memory")
+    memory_kb = memory / 1024 if memory is not None else None
+
+    run_code = run_stage.get("code", 0)
+    compile_code = compile_stage.get("code", 0)
+
+    # Check for failure exit codes
+    if compile_code != 0:
+        output = compile_stage.get("stderr", "") or "Unknown compilation error"
+        return CaseResult(index, tc.id, "Compilation Error", output, time_ms, memory_kb, stderr=output)
+
+    if run_code != 0:
+        output = run_stage.get("stderr", "") or "Unknown runtime error"
+        return CaseResult(index, tc.id, "Runtime Error", output, time_ms, memory_kb,
+                          stdout=run_stage.get("stdout", ""), stderr=output)
+
+    # If success (codes are 0), we ignore stderr (warnings)
+    stdout = run_stage.get("stdout", "").strip()
+
+    if tc.expected_output is None:
+        return CaseResult(index, tc.id, FINISHED, "", time_ms, memory_kb, stdout=stdout)
+
+    if in_sandbox:
+        report = parse_check(stdout, nonce)
+        if report is None:
+            return CaseResult(index, tc.id, "Runtime Error", "Judge did not report a verdict", time_ms, memory_kb,
+                              stdout=stdout[-2000:])
+        # Any "passed" the program printed is ignored: only the hash of what it wrote counts
+        if report["hash"] != hashlib.sha256(tc.expected_output.strip().encode()).hexdigest():
+            got = report["excerpt"]
+            if len(got.encode()) < report["size"]:
+                got += f"... ({report['size']} bytes in total)"
+            expected = tc.expected_output.strip()
+            if len(expected) > CHECK_EXCERPT_CHARS:
+                expected = expected[:CHECK_EXCERPT_CHARS] + f"... ({len(expected.encode())} bytes in total)"
+            output = f"Input: {tc.input_data}\nExpected: {expected}\nGot: {got}"
+            return CaseResult(index, tc.id, "Wrong Answer", output, time_ms, memory_kb, stdout=report["excerpt"])
+        return CaseResult(index, tc.id, PASSED, "", time_ms, memory_kb, stdout=report["excerpt"])
+
+    # Compare Output
+    # Normalize newlines and whitespace
+    expected = tc.expected_output.strip()
+    if stdout != expected:
+        output = f"Input: {tc.input_data}\nExpected: {expected}\nGot: {stdout}"
+        return CaseResult(index, tc.id, "Wrong Answer", output, time_ms, memory_kb, stdout=stdout)
+
+    return CaseResult(index, tc.id, PASSED, "", time_ms, memory_kb, stdout=stdout)
+
+
+async def run_cases_concurrently(language: str, full_code: str, test_cases: List) -> List[CaseResult]:
+    """Runs every case at once (the executor client still paces outbound requests). Results keep input order."""
+    return list(await asyncio.gather(
+        *(run_case(language, full_code, tc, index) for index, tc in enumerate(test_cases))
+    ))
+
+
+async def judge(language: str, full_code: str, test_cases: List) -> AsyncIterator[CaseResult]:
+    """Yields one CaseResult per test case, stopping after the first failing case."""
+    for index, tc in enumerate(test_cases):
+        result = await run_case(language, full_code, tc, index)
+        logger.debug("Case judged", extra={"case": index, "case_status": result.status, "time_ms": result.time_ms})
+        yield result
+        if not result.passed:
+            return
@@ -0,0 +1,409 @@
+import asyncio
+import hashlib
+import os
+import shutil
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+# Warm JVM pool for the local executor (see local_executor.py).
+#
+# Starting a JVM costs more than running a typical test case, so instead of `java Main` per case
+# we keep LOCAL_JVM_WORKERS JVMs running DsaWorker (below). A worker
+#   * compiles a submission in-process with javax.tools (no javac startup); compiled classes are
+#     cached on disk per source hash, so every case of a submission reuses one compile
+#   * runs Main.main of a compiled submission in a fresh URLClassLoader (statics start clean every run)
+#     on its own thread, with System.in/out/err swapped for buffers and a wall-clock limit
+# and is recycled after LOCAL_JVM_MAX_RUNS runs, or straight away when a run misbehaves
+# (timed out, ran out of memory, or left threads behind); a replacement is started in the background.
+#
+# The heap limit is per JVM (LOCAL_JVM_HEAP_MB), not per run, and memory isn't reported.
+# A program that calls System.exit() takes its worker down and gets a Runtime Error.
+#
+# Protocol on the worker's stdin/stdout, tab separated:
+#   COMPILE <src dir> <out dir>\n
+#   RUN <class dir> <timeout ms> <stdin bytes>\n<stdin>
+#   -> DONE <code> <wall ms> <cpu ms> <stdout bytes> <stderr bytes> <clean|dirty>\n<stdout><stderr>
+# code -1 means the time limit was hit.
+
+JVM_WORKERS = int(os.getenv("LOCAL_JVM_WORKERS", "2"))
+JVM_MAX_RUNS = int(os.getenv("LOCAL_JVM_MAX_RUNS", "200"))
+JVM_HEAP_MB = int(os.getenv("LOCAL_JVM_HEAP_MB", "512"))
+JVM_STACK_MB = int(os.getenv("LOCAL_JVM_STACK_MB", "64"))
+JAVA = os.getenv("LOCAL_JAVA", "java")
+JAVAC = os.getenv("LOCAL_JAVAC", "javac")
+COMPILE_CACHE_SIZE = int(os.getenv("LOCAL_COMPILE_CACHE_SIZE", "256"))
+RESPONSE_GRACE_SECONDS = 5.0  # On top of the run's own limit before a silent worker is killed
+
+WORKER_SOURCE = r'''
+import java.io.*;
+import java.lang.management.ManagementFactory;
+import java.lang.management.ThreadMXBean;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.net.URL;
+import java.net.URLClassLoader;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.*;
+import java.util.*;
+import java.util.stream.*;
+import javax.tools.JavaCompiler;
+import javax.tools.ToolProvider;
+
+public class DsaWorker {
+    static final InputStream REAL_IN = System.in;
+    static final PrintStream REAL_ERR = System.err;
+    static final ThreadMXBean THREADS = ManagementFactory.getThreadMXBean();
+    static long stackBytes;
+
+    static class Result {
+        long code, wallMs, cpuMs;
+        byte[] stdout = new byte[0], stderr = new byte[0];
+        boolean dirty;
+    }
+
+    public static void main(String[] args) throws Exception {
+        stackBytes = Long.parseLong(args[0]) * 1024 * 1024;
+        DataInputStream in = new DataInputStream(new BufferedInputStream(new FileInputStream(FileDescriptor.in)));
+        OutputStream out = new BufferedOutputStream(new FileOutputStream(FileDescriptor.out));
+        // Stray prints from the worker itself must never reach the protocol stream
+        System.setOut(REAL_ERR);
+
+        String line;
+        while ((line = readLine(in)) != null) {
+            String[] parts = line.split("\t");
+            Result r;
+            if (parts[0].equals("COMPILE")) {
+                r = compile(parts[1], parts[2]);
+            } else if (parts[0].equals("RUN")) {
+                byte[] stdin = new byte[Integer.parseInt(parts[3])];
+                in.readFully(stdin);
+                r = run(parts[1], Long.parseLong(parts[2]), stdin);
+            } else {
+                REAL_ERR.println("Unknown command: " + parts[0]);
+                Runtime.getRuntime().halt(2);
+                return;
+            }
+            String header = "DONE\t" + r.code + "\t" + r.wallMs + "\t" + r.cpuMs + "\t" + r.stdout.length
+                + "\t" + r.stderr.length + "\t" + (r.dirty ? "dirty" : "clean") + "\n";
+            out.write(header.getBytes(StandardCharsets.UTF_8));
+            out.write(r.stdout);
+            out.write(r.stderr);
+            out.flush();
+            if (r.dirty) {
+                // A stuck thread or a broken heap can't be cleaned up from inside; start over instead
+                Runtime.getRuntime().halt(0);
+            }
+        }
+    }
+
+    static String readLine(DataInputStream in) throws IOException {
+        ByteArrayOutputStream line = new ByteArrayOutputStream();
+        int b;
+        while ((b = in.read()) != '\n') {
+            if (b < 0) return line.size() == 0 ? null : line.toString("UTF-8");
+            line.write(b);
+        }
+        return line.toString("UTF-8");
+    }
+
+    static Result compile(String srcDir, String outDir) throws IOException {
+        Result r = new Result();
+        JavaCompiler compiler = ToolProvider.getSystemJavaCompiler();
+        if (compiler == null) {
+            r.code = 2;
+            r.stderr = "No Java compiler available (the local executor needs a JDK, not a JRE)".getBytes(StandardCharsets.UTF_8);
+            return r;
+        }
+        List<String> argv = new ArrayList<>(List.of("-d", outDir, "-nowarn", "-encoding", "UTF-8"));
+        try (Stream<Path> files = Files.list(Paths.get(srcDir))) {
+            files.filter(p -> p.toString().endsWith(".java")).forEach(p -> argv.add(p.toString()));
+        }
+        ByteArrayOutputStream err = new ByteArrayOutputStream();
+        long start = System.nanoTime(), cpu = THREADS.getCurrentThreadCpuTime();
+        r.code = compiler.run(null, err, err, argv.toArray(new String[0]));
+        r.wallMs = (System.nanoTime() - start) / 1000000;
+        r.cpuMs = (THREADS.getCurrentThreadCpuTime() - cpu) / 1000000;
+        r.stderr = err.toByteArray();
+        return r;
+    }
+
+    static Result run(String classDir, long timeoutMs, byte[] stdin) throws Exception {
+        Result r = new Result();
+        ByteArrayOutputStream out = new ByteArrayOutputStream(), err = new ByteArrayOutputStream();
+        PrintStream outStream = new PrintStream(out, true, "UTF-8"), errStream = new PrintStream(err, true, "UTF-8");
+        URLClassLoader loader = new URLClassLoader(
+            new URL[] { Paths.get(classDir).toUri().toURL() }, ClassLoader.getPlatformClassLoader());
+        int threadsBefore = Thread.activeCount();
+        long[] cpu = { 0 };
+        boolean[] fatal = { false };
+
+        Thread main = new Thread(null, () -> {
+            try {
+                Method entry = Class.forName("Main", true, loader).getMethod("main", String[].class);
+                entry.invoke(null, (Object) new String[0]);
+            } catch (InvocationTargetException e) {
+                Throwable cause = e.getCause();
+                errStream.print("Exception in thread \"main\" ");
+                cause.printStackTrace(errStream);
+                r.code = 1;
+                fatal[0] = cause instanceof OutOfMemoryError;
+            } catch (Throwable e) {
+                e.printStackTrace(errStream);
+                r.code = 1;
+                fatal[0] = e instanceof Error;
+            } finally {
+                cpu[0] = THREADS.getCurrentThreadCpuTime();
+            }
+        }, "main", stackBytes);
+        main.setContextClassLoader(loader);
+
+        System.setIn(new ByteArrayInputStream(stdin));
+        System.setOut(outStream);
+        System.setErr(errStream);
+        long start = System.nanoTime();
+        try {
+            main.start();
+            main.join(timeoutMs);
+        } finally {
+            r.wallMs = (System.nanoTime() - start) / 1000000;
+            System.setIn(REAL_IN);
+            System.setOut(REAL_ERR);
+            System.setErr(REAL_ERR);
+        }
+
+        if (main.isAlive()) {
+            r.code = -1;
+            r.dirty = true;
+            errStream.println("Time limit exceeded (" + timeoutMs + " ms)");
+        } else {
+            r.cpuMs = cpu[0] / 1000000;
+            r.dirty = fatal[0] || Thread.activeCount() > threadsBefore;
+            loader.close();
+        }
+        outStream.flush();
+        errStream.flush();
+        r.stdout = out.toByteArray();
+        r.stderr = err.toByteArray();
+        return r;
+    }
+}
+'''
+
+
+class JvmPoolError(Exception):
+    """The pool itself failed (worker crashed, protocol broke); the run may be retried."""
+
+
+class WorkerExited(JvmPoolError):
+    def __init__(self, returncode: int):
+        super().__init__(f"JVM worker exited with code {returncode}")
+        self.returncode = returncode
+
+
+@dataclass
+class Frame:
+    code: int
+    wall_ms: int
+    cpu_ms: int
+    stdout: str
+    stderr: str
+    dirty: bool
+
+
+class JvmWorker:
+    def __init__(self, proc: asyncio.subprocess.Process):
+        self.proc = proc
+        self.runs = 0
+        self.retired = False
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.returncode is None
+
+    async def call(self, command: List[str], body: bytes, timeout: float) -> Frame:
+        try:
+            self.proc.stdin.write("\t".join(command).encode() + b"\n" + body)
+            await self.proc.stdin.drain()
+            return await asyncio.wait_for(self._read_frame(), timeout)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError) as e:
+            self.retired = True
+            try:
+                await asyncio.wait_for(self.proc.wait(), 1.0)
+            except asyncio.TimeoutError:
+                raise JvmPoolError(f"JVM worker did not answer: {type(e).__name__}") from e
+            raise WorkerExited(self.proc.returncode) from e
+
+    async def _read_frame(self) -> Frame:
+        fields = (await self.proc.stdout.readline()).decode().rstrip("\n").split("\t")
+        if len(fields) != 7 or fields[0] != "DONE":
+            raise ValueError(f"bad frame {fields!r}")
+        code, wall_ms, cpu_ms, out_len, err_len = map(int, fields[1:6])
+        stdout = await self.proc.stdout.readexactly(out_len)
+        stderr = await self.proc.stdout.readexactly(err_len)
+        self.runs += 1
+        if fields[6] == "dirty":
+            self.retired = True
+        return Frame(code, wall_ms, cpu_ms, stdout.decode(errors="replace"), stderr.decode(errors="replace"), self.retired)
+
+    async def kill(self):
+        if self.alive:
+            self.proc.kill()
+        await self.proc.wait()
+
+
+@dataclass
+class Compiled:
+    ok: bool
+    class_dir: str
+    stderr: str
+
+
+class JvmPool:
+    def __init__(self, work_dir: str, size: int = JVM_WORKERS, max_runs: int = JVM_MAX_RUNS,
+                 heap_mb: int = JVM_HEAP_MB, stack_mb: int = JVM_STACK_MB):
+        self.work_dir = work_dir
+        self.size = max(1, size)
+        self.max_runs = max_runs
+        self.heap_mb = heap_mb
+        self.stack_mb = stack_mb
+        self.idle: List[JvmWorker] = []
+        self.slots = asyncio.Semaphore(self.size)
+        self.compiled: "OrderedDict[str, Compiled]" = OrderedDict()
+        self.compiling: Dict[str, asyncio.Future] = {}
+        self._worker_dir: Optional[str] = None
+        self._setup_lock = asyncio.Lock()
+        self._replenishing: set = set()
+        self._warmed = False
+
+    async def _worker_classes(self) -> str:
+        # javac once per worker source version, shared by every JVM in the pool
+        async with self._setup_lock:
+            if self._worker_dir is None:
+                digest = hashlib.sha256(WORKER_SOURCE.encode()).hexdigest()[:16]
+                worker_dir = os.path.join(self.work_dir, f"worker-{digest}")
+                if not os.path.exists(os.path.join(worker_dir, "DsaWorker.class")):
+                    os.makedirs(worker_dir, exist_ok=True)
+                    with open(os.path.join(worker_dir, "DsaWorker.java"), "w") as f:
+                        f.write(WORKER_SOURCE)
+                    proc = await asyncio.create_subprocess_exec(
+                        JAVAC, "-nowarn", "-d", worker_dir, os.path.join(worker_dir, "DsaWorker.java"),
+                        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+                    )
+                    output, _ = await proc.communicate()
+                    if proc.returncode != 0:
+                        raise JvmPoolError(f"Could not compile the JVM worker: {output.decode(errors='replace')}")
+                self._worker_dir = worker_dir
+            return self._worker_dir
+
+    async def _spawn(self) -> JvmWorker:
+        worker_dir = await self._worker_classes()
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                JAVA, f"-Xmx{self.heap_mb}m", "-XX:+UseSerialGC", "-Xshare:auto",
+                "-cp", worker_dir, "DsaWorker", str(self.stack_mb),
+                stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+            )
+        except OSError as e:
+            raise JvmPoolError(f"Could not start {JAVA}: {e}") from e
+        return JvmWorker(proc)
+
+    async def _replenish(self):
+        # Keep recycled workers' replacements warm so the next run doesn't pay JVM startup
+        try:
+            if len(self.idle) < self.size:
+                self.idle.append(await self._spawn())
+        except JvmPoolError:
+            pass
+
+    async def warm(self):
+        """Starts the pool's JVMs ahead of the first run (once; recycling keeps it topped up after that)."""
+        if self._warmed:
+            return
+        self._warmed = True
+        missing = self.size - len(self.idle)
+        workers = await asyncio.gather(*(self._spawn() for _ in range(missing)), return_exceptions=True)
+        self.idle.extend(w for w in workers if isinstance(w, JvmWorker))
+
+    @asynccontextmanager
+    async def worker(self):
+        async with self.slots:
+            worker = None
+            while self.idle and worker is None:
+                candidate = self.idle.pop()
+                worker = candidate if candidate.alive else None
+            if worker is None:
+                worker = await self._spawn()
+            reusable = False
+            try:
+                yield worker
+                reusable = worker.alive and not worker.retired and worker.runs < self.max_runs
+            finally:
+                if reusable:
+                    self.idle.append(worker)
+                else:
+                    await worker.kill()
+                    task = asyncio.create_task(self._replenish())
+                    self._replenishing.add(task)
+                    task.add_done_callback(self._replenishing.discard)
+
+    async def compile(self, source: str, timeout_ms: int) -> Compiled:
+        key = hashlib.sha256(source.encode()).hexdigest()
+        if key in self.compiled:
+            self.compiled.move_to_end(key)
+            return self.compiled[key]
+        if key in self.compiling:
+            # Cases of one submission run concurrently; only the first compiles
+            return await asyncio.shield(self.compiling[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self.compiling[key] = future
+        try:
+            result = await self._compile(key, source, timeout_ms)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Retrieved; waiters re-raise it
+            raise
+        finally:
+            self.compiling.pop(key, None)
+        future.set_result(result)
+        self.compiled[key] = result
+        while len(self.compiled) > COMPILE_CACHE_SIZE:
+            _, old = self.compiled.popitem(last=False)
+            shutil.rmtree(os.path.dirname(old.class_dir), ignore_errors=True)
+        return result
+
+    async def _compile(self, key: str, source: str, timeout_ms: int) -> Compiled:
+        base = os.path.join(self.work_dir, "java", key)
+        src_dir, class_dir = os.path.join(base, "src"), os.path.join(base, "classes")
+        os.makedirs(src_dir, exist_ok=True)
+        os.makedirs(class_dir, exist_ok=True)
+        with open(os.path.join(src_dir, "Main.java"), "w") as f:
+            f.write(source)
+        async with self.worker() as worker:
+            frame = await worker.call(["COMPILE", src_dir, class_dir], b"", timeout_ms / 1000 + RESPONSE_GRACE_SECONDS)
+        # Report paths the way the sandbox would ("Main.java:3: error: ...")
+        return Compiled(frame.code == 0, class_dir, frame.stderr.replace(src_dir + os.sep, ""))
+
+    async def run(self, class_dir: str, stdin: str, timeout_ms: int) -> Frame:
+        data = stdin.encode()
+        async with self.worker() as worker:
+            try:
+                return await worker.call(
+                    ["RUN", class_dir, str(timeout_ms), str(len(data))], data,
+                    timeout_ms / 1000 + RESPONSE_GRACE_SECONDS,
+                )
+            except WorkerExited as e:
+                # The program took its JVM down (System.exit, or a crash); its output went with it
+                message = "The program exited the JVM (System.exit is not supported by the local Java runner)"
+                return Frame(e.returncode or 1, 0, 0, "", message, True)
+
+    async def close(self):
+        for task in list(self._replenishing):
+            task.cancel()
+        workers, self.idle = self.idle, []
+        await asyncio.gather(*(w.kill() for w in workers), return_exceptions=True)
@@ -0,0 +1,126 @@
+import json
+import os
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend.drivers import get_python_driver, get_java_driver, get_python_checker, get_java_checker
+
+# Language runtime registry: everything we need to run code in one language.
+#
+# Each entry pins an executor runtime version (so the executor doesn't resolve "*" on every
+# call and results don't shift when it adds a version) and sets explicit compile/run limits.
+# Defaults live below; LANGUAGES_CONFIG may point at a JSON file overriding fields per language:
+#
+#     {"python": {"version": "3.12.0", "run_timeout_ms": 5000}, "java": {"run_memory_mb": 1024}}
+#
+# validate() runs once at startup against the executor's /runtimes list. A pinned version the
+# executor doesn't have is repinned to its newest version of that language (or startup fails with
+# LANGUAGES_STRICT=true); a language the executor doesn't offer at all is disabled.
+
+
+@dataclass(frozen=True)
+class Language:
+    name: str  # What we store in submissions.language and what the frontend sends
+    runtime: str  # Executor (Piston) language name
+    version: str  # Pinned executor runtime version
+    ids: Tuple[int, ...]  # Editor language ids accepted by /execute (language_id)
+    driver: Callable[[str], str]  # Wraps a Solution class into a runnable program
+    file_name: str
+    compile_timeout_ms: int = 10000
+    run_timeout_ms: int = 3000
+    compile_memory_mb: int = -1  # -1 = executor default
+    run_memory_mb: int = -1
+    checker: Optional[Callable[[str], str]] = None  # Wraps a driver program to compare its output in the sandbox
+
+    def payload(self, source: str, stdin: str = "") -> dict:
+        """Executor request for `source` (already wrapped in the driver, if any)."""
+        return {
+            "language": self.runtime,
+            "version": self.version,
+            "files": [{"name": self.file_name, "content": source}],
+            "stdin": stdin,
+            "compile_timeout": self.compile_timeout_ms,
+            "run_timeout": self.run_timeout_ms,
+            "compile_memory_limit": _bytes(self.compile_memory_mb),
+            "run_memory_limit": _bytes(self.run_memory_mb),
+        }
+
+
+def _bytes(mb: int) -> int:
+    return mb * 1024 * 1024 if mb >= 0 else -1
+
+
+DEFAULT_LANGUAGES = [
+    Language(
+        name="python", runtime="python", version="3.10.0", ids=(71,),
+        driver=get_python_driver, checker=get_python_checker, file_name="main.py",
+        run_timeout_ms=3000, run_memory_mb=256,
+    ),
+    Language(
+        name="java", runtime="java", version="15.0.2", ids=(62,),
+        driver=get_java_driver, checker=get_java_checker, file_name="Main.java",
+        compile_timeout_ms=10000, run_timeout_ms=3000, run_memory_mb=512,
+    ),
+]
+
+CONFIG_FIELDS = {"version", "compile_timeout_ms", "run_timeout_ms", "compile_memory_mb", "run_memory_mb"}
+
+
+def load(path: Optional[str] = None) -> Dict[str, Language]:
+    languages = {lang.name: lang for lang in DEFAULT_LANGUAGES}
+    path = path or os.getenv("LANGUAGES_CONFIG")
+    if path:
+        with open(path) as f:
+            overrides = json.load(f)
+        for name, fields in overrides.items():
+            if name not in languages:
+                raise ValueError(f"LANGUAGES_CONFIG: unknown language '{name}' (no driver for it)")
+            unknown = set(fields) - CONFIG_FIELDS
+            if unknown:
+                raise ValueError(f"LANGUAGES_CONFIG: unknown fields for {name}: {', '.join(sorted(unknown))}")
+            languages[name] = replace(languages[name], **fields)
+    return languages
+
+
+registry: Dict[str, Language] = load()
+
+
+def get(name: Optional[str]) -> Optional[Language]:
+    return registry.get((name or "").lower())
+
+
+def by_id(language_id: int) -> Optional[Language]:
+    return next((lang for lang in registry.values() if language_id in lang.ids), None)
+
+
+def supported() -> List[str]:
+    return sorted(registry)
+
+
+def _version_key(version: str):
+    return tuple(int(part) if part.isdigit() else 0 for part in version.split("."))
+
+
+async def validate(executor, strict: Optional[bool] = None) -> List[str]:
+    """Checks every pinned runtime against the executor; returns a list of what was changed."""
+    strict = os.getenv("LANGUAGES_STRICT", "false").lower() == "true" if strict is None else strict
+    available: Dict[str, List[str]] = {}
+    for runtime in await executor.runtimes():
+        for alias in [runtime["language"], *runtime.get("aliases", [])]:
+            available.setdefault(alias, []).append(runtime["version"])
+
+    changes = []
+    for name, lang in list(registry.items()):
+        versions = available.get(lang.runtime)
+        if versions and lang.version in versions:
+            continue
+        if strict:
+            raise RuntimeError(f"Executor has no {lang.runtime} {lang.version} (available: {versions or 'none'})")
+        if not versions:
+            del registry[name]
+            changes.append(f"{name}: disabled, executor has no {lang.runtime} runtime")
+        else:
+            newest = max(versions, key=_version_key)
+            registry[name] = replace(lang, version=newest)
+            changes.append(f"{name}: {lang.version} not available, pinned to {newest}")
+    return changes
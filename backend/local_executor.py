@@ -0,0 +1,140 @@
+import asyncio
+import os
+import platform
+import re
+import sys
+import tempfile
+from typing import List, Optional
+
+from backend.jvm_pool import JvmPool, JvmPoolError, JAVA
+from backend.python_pool import PythonPool, PythonPoolError
+
+# In-process stand-in for Piston, for self-hosted deployments and local development.
+#
+# Listing `local://` in PISTON_API_URLS (alone, or next to remote endpoints) routes executions
+# to LocalExecutor instead of HTTP. It takes the same payloads and answers in Piston's response
+# shape ({"compile": {...}, "run": {stdout, stderr, output, code, signal, wall_time, cpu_time}}),
+# so the judge, the runtime registry and /execute work unchanged:
+#   * java runs on a pool of warm JVMs (jvm_pool.py)
+#   * python runs on forks of pre-warmed LOCAL_PYTHON interpreters (python_pool.py)
+# There is no sandbox beyond that: only point it at code you'd run on the host anyway.
+
+LOCAL_SCHEME = "local://"
+LOCAL_PYTHON = os.getenv("LOCAL_PYTHON", sys.executable)
+LOCAL_EXECUTOR_DIR = os.getenv("LOCAL_EXECUTOR_DIR", os.path.join(tempfile.gettempdir(), "dsa-local-executor"))
+
+
+class LocalExecutorError(Exception):
+    """The local runner itself failed (not the program); treated like a transient executor error."""
+
+
+def stage(stdout: str, stderr: str, code: Optional[int], signal: Optional[str] = None,
+          wall_time: Optional[float] = None, cpu_time: Optional[float] = None, memory: Optional[int] = None) -> dict:
+    result = {"stdout": stdout, "stderr": stderr, "output": stdout + stderr, "code": code, "signal": signal}
+    # Measurements are only included when known, like Piston
+    for name, value in (("wall_time", wall_time), ("cpu_time", cpu_time), ("memory", memory)):
+        if value is not None:
+            result[name] = value
+    return result
+
+
+def python_version() -> str:
+    return platform.python_version() if LOCAL_PYTHON == sys.executable else "local"
+
+
+class LocalExecutor:
+    def __init__(self, work_dir: str = LOCAL_EXECUTOR_DIR):
+        self.work_dir = work_dir
+        self._jvm: Optional[JvmPool] = None
+        self._python: Optional[PythonPool] = None
+        self._java_version: Optional[str] = None
+
+    @property
+    def jvm(self) -> JvmPool:
+        if self._jvm is None:
+            self._jvm = JvmPool(self.work_dir)
+        return self._jvm
+
+    @property
+    def python(self) -> PythonPool:
+        if self._python is None:
+            self._python = PythonPool(LOCAL_PYTHON, self.work_dir)
+        return self._python
+
+    async def execute(self, payload: dict) -> dict:
+        language = payload["language"]
+        if language == "java":
+            return await self.run_java(payload)
+        if language == "python":
+            return await self.run_python(payload)
+        raise ValueError(f"The local executor cannot run {language}")
+
+    async def run_java(self, payload: dict) -> dict:
+        source = payload["files"][0]["content"]
+        try:
+            compiled = await self.jvm.compile(source, payload.get("compile_timeout", 10000))
+            response = {"language": "java", "version": await self.java_version()}
+            if not compiled.ok:
+                response["compile"] = stage("", compiled.stderr, 1)
+                return response
+            response["compile"] = stage("", "", 0)
+            frame = await self.jvm.run(compiled.class_dir, payload.get("stdin", ""), payload.get("run_timeout", 3000))
+        except JvmPoolError as e:
+            raise LocalExecutorError(str(e)) from e
+
+        timed_out = frame.code == -1
+        response["run"] = stage(
+            frame.stdout, frame.stderr,
+            None if timed_out else frame.code, "SIGKILL" if timed_out else None,
+            wall_time=frame.wall_ms, cpu_time=frame.cpu_ms,
+        )
+        return response
+
+    async def run_python(self, payload: dict) -> dict:
+        try:
+            result = await self.python.run(
+                payload["files"][0]["content"], payload.get("stdin", ""),
+                payload.get("run_timeout", 3000), payload.get("run_memory_limit", -1),
+            )
+        except PythonPoolError as e:
+            raise LocalExecutorError(str(e)) from e
+        return {
+            "language": "python",
+            "version": python_version(),
+            "run": stage(
+                result.stdout, result.stderr, result.code, result.signal,
+                wall_time=result.wall_ms, cpu_time=result.cpu_ms, memory=result.memory,
+            ),
+        }
+
+    async def java_version(self) -> Optional[str]:
+        if self._java_version is None:
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    JAVA, "-version", stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+                )
+                output, _ = await proc.communicate()
+            except OSError:
+                return None
+            match = re.search(r'version "([^"]+)"', output.decode(errors="replace"))
+            self._java_version = match.group(1) if match else "local"
+        return self._java_version
+
+    async def runtimes(self) -> List[dict]:
+        """Piston-style runtimes list of what this host can run."""
+        runtimes = [{"language": "python", "version": python_version(), "aliases": ["py", "python3"]}]
+        await self.python.warm()  # Startup lists runtimes, so the pools are up before the first submission
+        java_version = await self.java_version()
+        if java_version is not None:
+            runtimes.append({"language": "java", "version": java_version, "aliases": []})
+            await self.jvm.warm()
+        return runtimes
+
+    async def close(self):
+        if self._jvm is not None:
+            await self._jvm.close()
+        if self._python is not None:
+            await self._python.close()
+
+
+runner = LocalExecutor()
@@ -0,0 +1,234 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Optional
+
+from backend import profiling
+
+# Structured logging that never blocks a request.
+#
+# Every record is handed to a bounded in-memory queue (QueueHandler) and formatted and written
+# by a background thread (QueueListener). The request path only pays for building the record;
+# when the writer falls behind, records are dropped (and counted) instead of making callers wait.
+#
+# Records are JSON lines (LOG_FORMAT=text for local development) with the request's context:
+#   request_id  X-Request-ID from the caller or a fresh one, echoed on the response
+#   method/path, route (the matched template), user and problem_id (from path params or bind())
+# RequestContextMiddleware also writes one access record per request with its status, duration and
+# the db/executor time breakdown (see profiling.timed).
+#
+# DEBUG (LOG_LEVEL=DEBUG) is sampled per request: LOG_DEBUG_SAMPLE_RATE of requests log their debug
+# records, all of them, so a sampled request can be followed end to end. Other levels are never sampled.
+# DB_ECHO=true logs SQL through the same queue at INFO.
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.01"))
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+REQUEST_ID_MAX_LENGTH = 64
+
+logger = logging.getLogger(__name__)
+
+_context: contextvars.ContextVar = contextvars.ContextVar("log_context", default=None)
+_scope: contextvars.ContextVar = contextvars.ContextVar("log_scope", default=None)
+_listener: Optional[logging.handlers.QueueListener] = None
+
+# Attributes every LogRecord has; anything else on a record was passed as `extra` or bound context
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+
+@contextmanager
+def context(**fields):
+    """Starts a fresh log context (a request, a background job) for the code inside the block."""
+    token = _context.set(dict(fields))
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def bind(**fields):
+    """Adds fields to the current log context; they show on every later record in it."""
+    fields = {name: value for name, value in fields.items() if value is not None}
+    current = _context.get()
+    if current is None:
+        _context.set(fields)
+    else:
+        current.update(fields)  # In place, so the request's access record sees them too
+
+
+def _request_fields(scope: dict) -> dict:
+    # Filled in by the router, so only known once the request has been matched
+    fields = {}
+    route = scope.get("route")
+    if route is not None:
+        fields["route"] = getattr(route, "path", None)
+    params = scope.get("path_params") or {}
+    if "problem_id" in params:
+        fields["problem_id"] = params["problem_id"]
+    if "clerk_id" in params:
+        fields["user"] = params["clerk_id"]
+    return fields
+
+
+class ContextFilter(logging.Filter):
+    """Copies the caller's context onto the record (the writer thread can't see the caller's contextvars)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        fields = _context.get()
+        if record.levelno <= logging.DEBUG:
+            sampled = fields.get("sampled") if fields else None
+            if not (sampled if sampled is not None else random.random() < LOG_DEBUG_SAMPLE_RATE):
+                return False
+        scope = _scope.get()
+        if scope is not None:
+            for name, value in _request_fields(scope).items():
+                record.__dict__.setdefault(name, value)
+        if fields:
+            for name, value in fields.items():
+                if name != "sampled":
+                    record.__dict__.setdefault(name, value)
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve everything that depends on the caller (args, the live traceback) before the hand-off;
+        # the JSON itself is built on the writer thread
+        record = logging.makeLogRecord(record.__dict__)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            try:
+                self.queue.put_nowait(logging.makeLogRecord({
+                    "name": logger.name, "levelno": logging.WARNING, "levelname": "WARNING",
+                    "msg": f"Log queue full: dropped {dropped} records", "dropped": dropped,
+                }))
+            except queue.Full:
+                self.dropped = dropped
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for name, value in record.__dict__.items():
+            if name not in _RECORD_ATTRS and not name.startswith("_"):
+                entry[name] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extra = {name: value for name, value in record.__dict__.items()
+                 if name not in _RECORD_ATTRS and not name.startswith("_")}
+        return f"{line} {json.dumps(extra, default=str)}" if extra else line
+
+
+def setup():
+    """Routes every logger through the queue. Idempotent; call once at startup."""
+    global _listener
+    if _listener is not None:
+        return
+    log_queue: queue.Queue = queue.Queue(LOG_QUEUE_SIZE)
+    writer = logging.StreamHandler(sys.stdout)
+    writer.setFormatter(TextFormatter() if LOG_FORMAT == "text" else JsonFormatter())
+
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(ContextFilter())
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(LOG_LEVEL)
+    # SQLAlchemy's own echo writes synchronously; its logger goes through the queue instead
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO if DB_ECHO else logging.WARNING)
+    # httpx logs every request at INFO: one line per executed test case
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    _listener = logging.handlers.QueueListener(log_queue, writer, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown)
+
+
+def shutdown():
+    """Writes out what is still queued and stops the writer thread."""
+    global _listener
+    if _listener is not None:
+        listener, _listener = _listener, None
+        listener.stop()
+
+
+class RequestContextMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        request_id = headers.get(b"x-request-id", b"").decode("latin-1")[:REQUEST_ID_MAX_LENGTH] or uuid.uuid4().hex
+        status = {"code": None}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-request-id", request_id.encode("latin-1"))]}
+            await send(message)
+
+        sampled = LOG_DEBUG_SAMPLE_RATE >= 1 or random.random() < LOG_DEBUG_SAMPLE_RATE
+        with context(request_id=request_id, method=scope["method"], path=scope["path"], sampled=sampled):
+            scope_token = _scope.set(scope)
+            timings_token = profiling.start_timings()
+            start = time.perf_counter()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                duration_ms = (time.perf_counter() - start) * 1000
+                timings = profiling.stop_timings(timings_token)
+                code = status["code"] or 500  # No response started: the app raised
+                logger.log(
+                    logging.WARNING if code >= 500 else logging.INFO,
+                    "%s %s %s", scope["method"], scope["path"], code,
+                    extra={
+                        "status": code,
+                        "duration_ms": round(duration_ms, 2),
+                        **{f"{name}_ms": round(t["ms"], 2) for name, t in timings.items()},
+                    },
+                )
+                _scope.reset(scope_token)
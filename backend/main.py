@@ -1,8 +1,28 @@
+import asyncio
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from backend.routers import problems, execution, submissions
+from backend.routers import problems, execution, submissions, health, users, profiles, contests
+from backend.executor import executor, ExecutorUnavailable
+from backend import languages
+from backend.database import engine, read_engine
+from backend import partitions
+from backend.responses import FastJSONResponse, CompressionMiddleware
+from backend import profiling
+from backend import logs
+
+logs.setup()
+logger = logging.getLogger(__name__)
 
-app = FastAPI()
+# orjson rendering for every route; complete responses above COMPRESS_MIN_BYTES are gzip/brotli-compressed
+app = FastAPI(default_response_class=FastJSONResponse)
+app.add_middleware(CompressionMiddleware)
+# Opt-in: PROFILE_SAMPLE_RATE and/or PROFILE_TOKEN (see backend/profiling.py)
+app.add_middleware(profiling.ProfilingMiddleware)
+profiling.instrument_engine(engine)
+if read_engine is not engine:
+    profiling.instrument_engine(read_engine)
 
 app.add_middleware(
     CORSMiddleware,
@@ -14,12 +34,49 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
+# Outermost: request id, access record and log context for everything below (see backend/logs.py)
+app.add_middleware(logs.RequestContextMiddleware)
 
 app.include_router(problems.router)
 app.include_router(execution.router)
 app.include_router(submissions.router)
+app.include_router(health.router)
+app.include_router(users.router)
+app.include_router(profiles.router)
+app.include_router(contests.router)
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to DSAwithPV Backend"}
+
+# Long-running tasks started at startup, cancelled at shutdown (the loop only keeps weak references)
+_background_tasks = set()
+
+@app.on_event("startup")
+async def startup_warm_up():
+    try:
+        created = await partitions.ensure_partitions(engine)
+        if created:
+            logger.info("Submission partitions ready: %s", ", ".join(created))
+    except Exception:
+        logger.exception("Could not create submission partitions")
+    # ...and again every PARTITION_CHECK_INTERVAL, so a month end doesn't send inserts to the default partition
+    task = asyncio.create_task(partitions.maintain(engine))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    try:
+        # Pin runtimes to what the executor actually has (LANGUAGES_STRICT=true fails startup instead)
+        for change in await languages.validate(executor):
+            logger.info("Language registry: %s", change)
+    except ExecutorUnavailable as e:
+        logger.warning("Could not validate language runtimes: %s", e)
+    await health.warm_up()
+
+@app.on_event("shutdown")
+async def close_executor():
+    for task in list(_background_tasks):
+        task.cancel()
+    await executor.close()
+    logs.shutdown()
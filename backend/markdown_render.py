@@ -0,0 +1,212 @@
+import argparse
+import asyncio
+import hashlib
+import html
+import logging
+import re
+import uuid
+from typing import Optional, Tuple
+
+from sqlalchemy.future import select
+
+from backend.models.problem import Problem
+from backend import backfill
+
+try:
+    import markdown
+except ImportError:  # Optional dependency (listed in requirements.txt)
+    markdown = None
+
+try:
+    import bleach
+except ImportError:  # Optional dependency (listed in requirements.txt)
+    bleach = None
+
+try:
+    from latex2mathml.converter import convert as latex_to_mathml
+except ImportError:  # Optional dependency; without it $...$ stays as written
+    latex_to_mathml = None
+
+# Server-side markdown for problem descriptions and editorials.
+#
+# create_problem / update_problem render both fields to sanitized HTML once and store it next to
+# the markdown, with render_hash: a hash of the sources and RENDERER_VERSION. The problem page
+# then ships ready HTML (and an ETag, see responses.EncodedPayload) instead of every client parsing
+# markdown on every view. What gets rendered:
+#   * GitHub-style markdown: tables, fenced code, lists, links
+#   * fenced code highlighted by Pygments (class-based; stylesheet: frontend/src/app/highlight.css)
+#   * $inline$ and $$display$$ TeX as MathML, when latex2mathml is installed
+# The markdown output goes through an allowlist sanitizer (bleach). Math is taken out first and its
+# MathML is sanitized on its own, against a MathML allowlist: TeX can carry attributes too
+# (\href, \style, \class). It is put back in text only: math that ended up in an attribute (a link
+# URL or title, an image source) goes back as its escaped source. Without markdown or bleach nothing is rendered and
+# the *_html fields stay empty: the frontend falls back to rendering the markdown itself.
+#
+# Problems written before this (or with an older RENDERER_VERSION) are re-rendered by
+#   python -m backend.markdown_render [--dry-run] [--restart]
+
+RENDERER_VERSION = 3  # 2: MathML sanitized (renders from 1 may carry \href/\style attributes); 3: no math in attributes
+
+ALLOWED_TAGS = {
+    "p", "br", "hr", "h1", "h2", "h3", "h4", "h5", "h6", "strong", "em", "b", "i", "del", "s", "sup", "sub",
+    "code", "pre", "blockquote", "ul", "ol", "li", "a", "img", "table", "thead", "tbody", "tr", "th", "td",
+    "span", "div",
+}
+ALLOWED_ATTRIBUTES = {
+    "a": ["href", "title"],
+    "img": ["src", "alt", "title"],
+    "th": ["align"],
+    "td": ["align"],
+    "code": ["class"],
+    "span": ["class"],
+    "div": ["class"],
+    "pre": ["class"],
+}
+ALLOWED_PROTOCOLS = {"http", "https", "mailto"}
+# Presentation MathML only: no href, style or class
+MATHML_TAGS = {
+    "math", "mrow", "mi", "mn", "mo", "ms", "mtext", "mspace", "msup", "msub", "msubsup", "mfrac", "msqrt",
+    "mroot", "mover", "munder", "munderover", "mtable", "mtr", "mtd", "mstyle", "mpadded", "mphantom",
+    "menclose", "mmultiscripts", "mprescripts", "none", "merror",
+}
+MATHML_ATTRIBUTES = {"*": [
+    "xmlns", "display", "displaystyle", "scriptlevel", "mathvariant", "stretchy", "fence", "separator", "form",
+    "accent", "accentunder", "largeop", "movablelimits", "symmetric", "minsize", "maxsize", "lspace", "rspace",
+    "linethickness", "notation", "columnalign", "rowalign", "columnspacing", "rowspacing", "width", "height", "depth",
+]}
+
+# Fenced blocks and inline code spans: `$` inside them is code, not math
+_CODE = re.compile(r"^(`{3,}|~{3,})[^\n]*\n.*?^\1[ \t]*$|(`+)[^\n]*?\2", re.M | re.S)
+# $$display$$, or $inline$ that doesn't open/close on a space and isn't a price ("$5 and $10")
+_MATH = re.compile(r"(?<!\\)\$\$(.+?)(?<!\\)\$\$|(?<![\\$\w])\$(?=\S)([^$\n]+?)(?<=\S)(?<!\\)\$(?!\d)", re.S)
+# A tag in the sanitizer's output; quoted attribute values may contain ">"
+_TAG = re.compile(r"""(<(?:[^>"']|"[^"]*"|'[^']*')*>)""")
+
+logger = logging.getLogger(__name__)
+
+
+def available() -> bool:
+    return markdown is not None and bleach is not None
+
+
+def render_hash(description: str, editorial: Optional[str]) -> str:
+    """Identity of a rendering: changes with either source or RENDERER_VERSION."""
+    return hashlib.sha256(f"{RENDERER_VERSION}\x1f{description}\x1f{editorial or ''}".encode()).hexdigest()
+
+
+def description_body(description: str) -> str:
+    # The problem page shows constraints from their own field, not the description's copy
+    return description.split("### Constraints")[0]
+
+
+def _extract_math(text: str) -> Tuple[str, dict]:
+    """Swaps TeX spans outside code for placeholders that survive markdown and sanitizing."""
+    if latex_to_mathml is None:
+        return text, {}
+    nonce = uuid.uuid4().hex
+    spans = {}
+
+    def replace(match):
+        tex, display = (match.group(1), True) if match.group(1) is not None else (match.group(2), False)
+        key = f"MATH{nonce}X{len(spans)}X"
+        spans[key] = (tex.strip(), display)
+        return f"\n\n{key}\n\n" if display else key
+
+    parts, last = [], 0
+    for code in _CODE.finditer(text):
+        parts.append(_MATH.sub(replace, text[last:code.start()]))
+        parts.append(code.group(0))
+        last = code.end()
+    parts.append(_MATH.sub(replace, text[last:]))
+    return "".join(parts), spans
+
+
+def _source(tex: str, display: bool) -> str:
+    return f"$${tex}$$" if display else f"${tex}$"
+
+
+def _math_html(tex: str, display: bool) -> str:
+    try:
+        mathml = bleach.clean(latex_to_mathml(tex, display="block" if display else "inline"),
+                              tags=MATHML_TAGS, attributes=MATHML_ATTRIBUTES, strip=True)
+    except Exception:
+        # Unsupported TeX: show the source rather than failing the whole render
+        mathml = html.escape(_source(tex, display))
+    return f'<div class="math math-display">{mathml}</div>' if display else f'<span class="math math-inline">{mathml}</span>'
+
+
+def _restore_math(cleaned: str, spans: dict) -> str:
+    """Puts the math back into sanitized HTML: MathML in text, the escaped TeX source inside tags."""
+    if not spans:
+        return cleaned
+    keys = re.compile("|".join(re.escape(key) for key in spans))
+    tokens = _TAG.split(cleaned)  # Text at even indexes, tags at odd ones
+    for i, token in enumerate(tokens):
+        if i % 2:
+            tokens[i] = keys.sub(lambda m: html.escape(_source(*spans[m.group(0)]), quote=True), token)
+            continue
+        _, display = spans.get(token, (None, False))
+        if display and 0 < i < len(tokens) - 1 and tokens[i - 1] == "<p>" and tokens[i + 1] == "</p>":
+            tokens[i - 1] = tokens[i + 1] = ""  # Block math isn't a paragraph
+        tokens[i] = keys.sub(lambda m: _math_html(*spans[m.group(0)]), token)
+    return "".join(tokens)
+
+
+def render(text: Optional[str]) -> Optional[str]:
+    """Sanitized HTML for markdown `text`, or None when there is nothing to render (or no renderer)."""
+    if not text or not available():
+        return None
+    source, spans = _extract_math(text)
+    rendered = markdown.markdown(
+        source,
+        extensions=["extra", "codehilite", "sane_lists"],
+        extension_configs={
+            "codehilite": {"css_class": "highlight", "guess_lang": False},
+            "extra": {"tables": {"use_align_attribute": True}},  # align="" rather than style=""
+        },
+    )
+    cleaned = bleach.clean(rendered, tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES,
+                           protocols=ALLOWED_PROTOCOLS, strip=True)
+    return _restore_math(cleaned, spans)
+
+
+def render_fields(description: str, editorial: Optional[str]) -> dict:
+    """Column values for a problem's rendered markdown. Pure CPU: run it off the event loop."""
+    if not available():
+        return {"description_html": None, "editorial_html": None, "render_hash": None}
+    return {
+        "description_html": render(description_body(description)),
+        "editorial_html": render(editorial),
+        "render_hash": render_hash(description, editorial),
+    }
+
+
+async def render_problem(problem: Problem):
+    """Renders `problem`'s description and editorial onto it (caller commits)."""
+    if not available():
+        logger.warning("markdown/bleach not installed: problem %s is served without pre-rendered HTML", problem.slug)
+    fields = await asyncio.to_thread(render_fields, problem.description, problem.editorial)
+    for name, value in fields.items():
+        setattr(problem, name, value)
+
+
+async def render_chunk(session, problems) -> int:
+    changed = 0
+    for problem in problems:
+        if problem.render_hash != render_hash(problem.description, problem.editorial):
+            await render_problem(problem)
+            changed += 1
+    return changed
+
+
+async def main(options: backfill.BackfillOptions):
+    if not available():
+        raise SystemExit("markdown and bleach are required to render problems (pip install -r backend/requirements.txt)")
+    # One checkpoint per renderer version: bumping RENDERER_VERSION re-renders everything
+    await backfill.run_backfill(f"render_markdown_v{RENDERER_VERSION}", select(Problem), Problem.id, render_chunk, options)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-render problem descriptions and editorials to HTML.")
+    backfill.add_arguments(parser, batch_size=50)
+    args = parser.parse_args()
+    asyncio.run(main(backfill.options_from_args(args)))
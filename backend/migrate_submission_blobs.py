@@ -0,0 +1,41 @@
+import argparse
+import asyncio
+from sqlalchemy import update
+from sqlalchemy.future import select
+from backend.models.submission import Submission
+from backend import backfill
+from backend import blobs
+
+# Moves inline submissions.code / submissions.output into the blobs table, one chunk per
+# transaction (see backend/backfill.py), so it can run against a live database, resume after
+# an interruption and be re-run safely: rows already moved have code_hash set and are skipped.
+#
+#   python -m backend.migrate_submission_blobs --batch-size 500 [--dry-run] [--max-rows-per-sec 2000]
+
+async def move_chunk(session, rows) -> int:
+    await blobs.put_many(session, [text for _, code, output in rows for text in (code, output)])
+    for sid, code, output in rows:
+        await session.execute(
+            update(Submission)
+            .where(Submission.id == sid)
+            .values(
+                code_hash=blobs.content_hash(code),
+                output_hash=blobs.content_hash(output) if output is not None else None,
+                code_text=None,
+                output_text=None,
+            )
+        )
+    return len(rows)
+
+async def migrate(options: backfill.BackfillOptions):
+    query = (
+        select(Submission.id, Submission.code_text, Submission.output_text)
+        .where(Submission.code_hash.is_(None), Submission.code_text.is_not(None))
+    )
+    await backfill.run_backfill("submission_blobs", query, Submission.id, move_chunk, options)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move inline submission code/output into compressed blobs.")
+    backfill.add_arguments(parser, batch_size=500)
+    args = parser.parse_args()
+    asyncio.run(migrate(backfill.options_from_args(args)))
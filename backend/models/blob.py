@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, LargeBinary, DateTime
+from backend.database import Base
+from datetime import datetime
+
+class Blob(Base):
+    """
+    Content-addressed, compressed text (submission code and output).
+    Identical content is stored once; rows are immutable and referenced by sha256 hash.
+    """
+    __tablename__ = "blobs"
+
+    hash = Column(String(64), primary_key=True) # sha256 hex of the UTF-8 text
+    codec = Column(String, nullable=False) # raw, zlib, zstd
+    size = Column(Integer, nullable=False) # Uncompressed size in bytes
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    @property
+    def text(self) -> str:
+        from backend.blobs import decompress
+        return decompress(self.codec, self.data)
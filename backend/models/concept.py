@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Table
+from sqlalchemy.orm import relationship
+from backend.database import Base
+
+# Many-to-many link between problems and concept tags.
+# The composite PK covers lookups by problem; ix_problem_concepts_concept_id covers "problems with concept X".
+problem_concepts = Table(
+    "problem_concepts",
+    Base.metadata,
+    Column("problem_id", Integer, ForeignKey("problems.id", ondelete="CASCADE"), primary_key=True),
+    Column("concept_id", Integer, ForeignKey("concepts.id", ondelete="CASCADE"), primary_key=True, index=True),
+)
+
+class Concept(Base):
+    __tablename__ = "concepts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False) # Display name, e.g. "Dynamic Programming"
+    slug = Column(String, unique=True, index=True, nullable=False) # e.g. "dynamic-programming"
+
+    problems = relationship("Problem", secondary=problem_concepts, back_populates="tags")
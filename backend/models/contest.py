@@ -0,0 +1,51 @@
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Table
+from sqlalchemy.orm import relationship
+from backend.database import Base
+from datetime import datetime
+
+# Problem set of a contest, in display order (A, B, C, ...)
+contest_problems = Table(
+    "contest_problems",
+    Base.metadata,
+    Column("contest_id", Integer, ForeignKey("contests.id", ondelete="CASCADE"), primary_key=True),
+    Column("problem_id", Integer, ForeignKey("problems.id", ondelete="CASCADE"), primary_key=True),
+    Column("position", Integer, nullable=False, default=0),
+)
+
+class Contest(Base):
+    __tablename__ = "contests"
+
+    id = Column(Integer, primary_key=True, index=True)
+    slug = Column(String, unique=True, index=True, nullable=False)
+    title = Column(String, nullable=False)
+    description = Column(Text, nullable=True)
+    start_time = Column(DateTime, nullable=False)
+    end_time = Column(DateTime, nullable=False)
+    # ICPC-style scoring: rank by solved (desc), then penalty minutes (asc).
+    # Penalty per solved problem = minutes from start to the accepted submission
+    # + penalty_minutes for every rejected attempt before it.
+    penalty_minutes = Column(Integer, nullable=False, default=20)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    problems = relationship("Problem", secondary=contest_problems, order_by=contest_problems.c.position, lazy="selectin")
+
+    def is_running(self, when: datetime) -> bool:
+        return self.start_time <= when < self.end_time
+
+class ContestEntry(Base):
+    """
+    One participant's standing, updated in the same transaction as each contest submission
+    (see backend/contests.py). This is what the in-memory leaderboard is rebuilt from.
+    """
+    __tablename__ = "contest_entries"
+
+    contest_id = Column(Integer, ForeignKey("contests.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    solved = Column(Integer, nullable=False, default=0)
+    penalty = Column(Integer, nullable=False, default=0) # Minutes
+    last_solved_at = Column(Integer, nullable=True) # Minutes from start of the latest solve (tie-break)
+    problem_state = Column(Text, nullable=False, default="{}") # JSON: problem_id -> {"attempts", "solved_at"}
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Register Problem with the mapper alongside Contest
+from backend.models.problem import Problem  # noqa: E402,F401
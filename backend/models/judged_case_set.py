@@ -0,0 +1,22 @@
+import hashlib
+import json
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from backend.database import Base
+from datetime import datetime
+
+class JudgedCaseSet(Base):
+    """
+    A problem's test cases at some point in time, as the sorted list of their content hashes.
+    Content-addressed like blobs: every submission judged against the same cases shares one row.
+    """
+    __tablename__ = "judged_case_sets"
+
+    hash = Column(String(64), primary_key=True) # sha256 of the problem id and the JSON list below
+    problem_id = Column(Integer, ForeignKey("problems.id"), nullable=False, index=True)
+    case_hashes = Column(Text, nullable=False) # JSON list of TestCase.content_hash, sorted
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+def case_set(problem_id: int, case_hashes) -> tuple:
+    """(set hash, JSON list) for a problem's test case content hashes; order and duplicates don't matter."""
+    listed = json.dumps(sorted(set(case_hashes)))
+    return hashlib.sha256(f"{problem_id}:{listed}".encode()).hexdigest(), listed
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Date
+import hashlib
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Date, event
 from sqlalchemy.orm import relationship
 from backend.database import Base
 from datetime import date
@@ -17,8 +18,23 @@ class Problem(Base):
     editorial = Column(Text, nullable=True) # Markdown content for solution
     concepts = Column(String, nullable=True) # Comma-separated list of concepts
     date_posted = Column(Date, default=date.today)
+    # Sanitized HTML of description/editorial, rendered on write (backend/markdown_render.py)
+    description_html = Column(Text, nullable=True)
+    editorial_html = Column(Text, nullable=True)
+    render_hash = Column(String(64), nullable=True)
     
     test_cases = relationship("TestCase", back_populates="problem", cascade="all, delete-orphan")
+    # Normalized form of `concepts` (kept in sync on create/update, used for filtering and search)
+    tags = relationship("Concept", secondary="problem_concepts", back_populates="problems")
+
+def testcase_hash(input_data: str, expected_output: str) -> str:
+    """Identity of a test case's content; expected output is stripped, as the judge compares it."""
+    return hashlib.sha256(f"{input_data}\x1f{(expected_output or '').strip()}".encode()).hexdigest()
+
+def _insert_hash(context):
+    # Column default, so bulk inserts (testgen) get it too
+    params = context.get_current_parameters()
+    return testcase_hash(params["input_data"], params["expected_output"])
 
 class TestCase(Base):
     __tablename__ = "test_cases"
@@ -28,5 +44,14 @@ class TestCase(Base):
     input_data = Column(Text, nullable=False)
     expected_output = Column(Text, nullable=False)
     is_hidden = Column(Integer, default=True) # Boolean might be better, but explicit is fine. 0=Public, 1=Hidden
+    # testcase_hash(input_data, expected_output): lets a rejudge run only new or changed cases (backend/rejudge.py)
+    content_hash = Column(String(64), nullable=True, default=_insert_hash)
 
     problem = relationship("Problem", back_populates="test_cases")
+
+@event.listens_for(TestCase, "before_update")
+def _update_hash(mapper, connection, target):
+    target.content_hash = testcase_hash(target.input_data, target.expected_output)
+
+# Register the concept tables with the mapper alongside Problem
+from backend.models.concept import Concept  # noqa: E402,F401
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, PrimaryKeyConstraint
+from backend.database import Base
+
+class RuntimeHistogram(Base):
+    """
+    One row per non-empty bucket of the runtime / memory distribution of Accepted
+    submissions for a (problem, language). Buckets are log-scaled, see backend/percentiles.py.
+    """
+    __tablename__ = "runtime_histograms"
+
+    problem_id = Column(Integer, ForeignKey("problems.id"), nullable=False)
+    language = Column(String, nullable=False)
+    metric = Column(String, nullable=False) # runtime, memory
+    bucket = Column(Integer, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("problem_id", "language", "metric", "bucket"),
+    )
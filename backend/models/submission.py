@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Float, Index
 from sqlalchemy.orm import relationship
 from backend.database import Base
 from datetime import datetime
@@ -11,11 +11,41 @@ class Submission(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True) # Check if we want to enforce relationship or just store ID
     # For now, let's link to User model if we want statistics later
     
-    code = Column(Text, nullable=False)
+    # Code and output live in the content-addressed `blobs` table (see backend/blobs.py).
+    # The inline columns only hold rows written before that and not yet moved by migrate_submission_blobs.
+    code_text = Column("code", Text, nullable=True)
+    code_hash = Column(String(64), ForeignKey("blobs.hash"), nullable=True)
     language = Column(String, nullable=False)
     status = Column(String, default="Pending") # Accepted, Wrong Answer, Runtime Error, etc.
-    output = Column(Text, nullable=True) # Result or error message
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    output_text = Column("output", Text, nullable=True)
+    output_hash = Column(String(64), ForeignKey("blobs.hash"), nullable=True) # Result or error message
+    # Partition key on Postgres (monthly ranges, see backend/partitions.py). The table's real primary
+    # key is (id, timestamp); id alone is still unique (one sequence) and is what the ORM keys on.
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    runtime_ms = Column(Float, nullable=True) # Slowest test case wall time
+    memory_kb = Column(Float, nullable=True) # Peak memory across test cases (if the executor reports it)
+    # Accepted submissions: the JudgedCaseSet (test case content hashes) they were judged against
+    judged_set_hash = Column(String(64), nullable=True)
 
     problem = relationship("Problem")
     user = relationship("User")
+    # selectin: one batched blob query per list of submissions, and safe under AsyncSession
+    code_blob = relationship("Blob", foreign_keys=[code_hash], lazy="selectin")
+    output_blob = relationship("Blob", foreign_keys=[output_hash], lazy="selectin")
+
+    @property
+    def code(self):
+        return self.code_blob.text if self.code_blob is not None else self.code_text
+
+    @property
+    def output(self):
+        return self.output_blob.text if self.output_blob is not None else self.output_text
+
+    __table_args__ = (
+        Index("ix_submissions_user_problem_status", "user_id", "problem_id", "status"),
+        Index("ix_submissions_timestamp", "timestamp"),
+        Index("ix_submissions_problem_timestamp", "problem_id", "timestamp"),
+    )
+
+# Register Blob with the mapper alongside Submission
+from backend.models.blob import Blob  # noqa: E402,F401
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, Text, ForeignKey, Date, DateTime
+from backend.database import Base
+from datetime import datetime
+
+class UserStats(Base):
+    """
+    Per-user progress counters, updated in the same transaction as each judged submission
+    (see backend/user_stats.py) so profile reads are a single primary-key lookup.
+    """
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    solved_easy = Column(Integer, default=0, nullable=False)
+    solved_medium = Column(Integer, default=0, nullable=False)
+    solved_hard = Column(Integer, default=0, nullable=False)
+    solved_total = Column(Integer, default=0, nullable=False) # Distinct problems with an Accepted submission
+    attempts = Column(Integer, default=0, nullable=False) # All judged submissions
+    accepted = Column(Integer, default=0, nullable=False) # Accepted submissions (not distinct)
+    concept_counts = Column(Text, default="{}", nullable=False) # JSON: concept slug -> distinct problems solved
+    current_streak = Column(Integer, default=0, nullable=False) # Consecutive days with an Accepted submission
+    longest_streak = Column(Integer, default=0, nullable=False)
+    last_solved_date = Column(Date, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import os
+from datetime import date, datetime
+from typing import List, Tuple
+
+from sqlalchemy import text
+
+# Monthly range partitions of `submissions` (Postgres only; see the partition_submissions migration).
+#
+# ensure_partitions() creates the partitions for the current month and the next
+# PARTITION_MONTHS_AHEAD months so inserts never fall through to the default partition.
+# It runs at startup, every PARTITION_CHECK_INTERVAL seconds from maintain() in long-running
+# processes, and from the retention job; it is a no-op on other dialects.
+#
+# Rows that did land in the default partition (a month nobody created in time) would make
+# CREATE TABLE ... PARTITION OF fail for that month forever. ensure_partitions() then detaches the
+# default partition, creates the month, moves its rows over and reattaches it, in one transaction.
+
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "2"))
+PARTITION_CHECK_INTERVAL = float(os.getenv("PARTITION_CHECK_INTERVAL", "86400"))
+DEFAULT_PARTITION = "submissions_default"
+
+logger = logging.getLogger(__name__)
+
+
+def month_start(d) -> date:
+    return date(d.year, d.month, 1)
+
+
+def add_months(d: date, months: int) -> date:
+    index = d.year * 12 + (d.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(start: date) -> str:
+    return f"submissions_y{start.year}m{start.month:02d}"
+
+
+def partition_ddl(start: date) -> str:
+    end = add_months(start, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(start)} PARTITION OF submissions "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def months_between(first: date, last: date) -> List[date]:
+    months, current = [], month_start(first)
+    while current <= last:
+        months.append(current)
+        current = add_months(current, 1)
+    return months
+
+
+async def is_partitioned(conn) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    result = await conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = 'submissions'"
+    ))
+    return result.first() is not None
+
+
+async def _default_has_rows(conn, start: date) -> bool:
+    result = await conn.execute(
+        text(f"SELECT 1 FROM {DEFAULT_PARTITION} WHERE timestamp >= :start AND timestamp < :end LIMIT 1"),
+        {"start": start, "end": add_months(start, 1)},
+    )
+    return result.first() is not None
+
+
+async def _split_default(conn, start: date) -> int:
+    """Creates `start`'s partition out of the default partition's rows for that month; returns how many moved."""
+    bounds = {"start": start, "end": add_months(start, 1)}
+    in_month = "timestamp >= :start AND timestamp < :end"
+    await conn.execute(text(f"ALTER TABLE submissions DETACH PARTITION {DEFAULT_PARTITION}"))
+    await conn.execute(text(partition_ddl(start)))
+    # Same column order: both are partitions of submissions
+    await conn.execute(text(f"INSERT INTO {partition_name(start)} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_month}"), bounds)
+    moved = await conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_month}"), bounds)
+    await conn.execute(text(f"ALTER TABLE submissions ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    return moved.rowcount
+
+
+async def ensure_partitions(engine, months_ahead: int = PARTITION_MONTHS_AHEAD) -> List[str]:
+    """Creates the missing partitions from this month on; returns the names of the ones it created."""
+    async with engine.begin() as conn:
+        if not await is_partitioned(conn):
+            return []
+        attached = {name for name, _ in await list_partitions(conn)}
+        current = month_start(datetime.utcnow())
+        created = []
+        for start in months_between(current, add_months(current, months_ahead)):
+            if partition_name(start) in attached:
+                continue
+            if DEFAULT_PARTITION in attached and await _default_has_rows(conn, start):
+                moved = await _split_default(conn, start)
+                logger.warning("Moved %d submissions out of the default partition into %s", moved, partition_name(start))
+            else:
+                await conn.execute(text(partition_ddl(start)))
+            created.append(partition_name(start))
+        return created
+
+
+async def maintain(engine, interval: float = PARTITION_CHECK_INTERVAL):
+    """Re-runs ensure_partitions every `interval` seconds, so a process running past a month end keeps up. Runs until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            created = await ensure_partitions(engine)
+            if created:
+                logger.info("Submission partitions created: %s", ", ".join(created))
+        except Exception:
+            logger.exception("Could not create submission partitions")
+
+
+async def list_partitions(conn) -> List[Tuple[str, str]]:
+    """(partition name, bound expression) for every attached partition, oldest first."""
+    result = await conn.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = 'submissions' ORDER BY c.relname"
+    ))
+    return [(name, bound) for name, bound in result.all()]
@@ -0,0 +1,178 @@
+import math
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from backend.database import dialect_insert
+from backend.models.runtime_histogram import RuntimeHistogram
+
+# Runtime / memory distribution of Accepted submissions per (problem, language).
+#
+# Values are bucketed on a log scale (fixed, a few hundred buckets per metric) and each
+# distribution is a Fenwick tree over those buckets, so recording a submission and
+# answering "faster than X%" are both O(log buckets) no matter how many submissions exist.
+# The buckets are persisted in `runtime_histograms` (one upserted row per non-empty bucket,
+# incremented in the same transaction as the Submission) and cached in memory per process.
+# Cached trees are reloaded after RELOAD_SECONDS to pick up other workers' submissions.
+
+RELOAD_SECONDS = float(os.getenv("PERCENTILE_RELOAD_SECONDS", "300"))
+
+
+class Scale:
+    """Log-scaled buckets: bucket 0 is [0, minimum), bucket i covers [minimum*ratio^(i-1), minimum*ratio^i)."""
+
+    def __init__(self, minimum: float, ratio: float, buckets: int):
+        self.minimum = minimum
+        self.ratio = ratio
+        self.buckets = buckets
+
+    def bucket(self, value: float) -> int:
+        if value < self.minimum:
+            return 0
+        return min(self.buckets - 1, int(math.log(value / self.minimum) / math.log(self.ratio)) + 1)
+
+    def upper(self, index: int) -> float:
+        return self.minimum * self.ratio ** index
+
+
+SCALES = {
+    "runtime": Scale(minimum=0.1, ratio=1.03, buckets=460),  # 0.1 ms .. ~80 s, 3% resolution
+    "memory": Scale(minimum=64, ratio=1.05, buckets=240),  # 64 KB .. ~7 GB, 5% resolution
+}
+
+
+class Fenwick:
+    def __init__(self, size: int):
+        self.size = size
+        self.tree = [0] * (size + 1)
+        self.total = 0
+
+    def add(self, index: int, delta: int):
+        self.total += delta
+        i = index + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, index: int) -> int:
+        """Sum of counts in buckets [0, index]."""
+        result = 0
+        i = min(index + 1, self.size)
+        while i > 0:
+            result += self.tree[i]
+            i -= i & -i
+        return result
+
+    def search(self, k: int) -> int:
+        """Smallest bucket index whose prefix sum is >= k (k >= 1)."""
+        pos = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and self.tree[nxt] < k:
+                pos = nxt
+                k -= self.tree[nxt]
+            step >>= 1
+        return pos
+
+
+class Distribution:
+    def __init__(self, metric: str):
+        self.scale = SCALES[metric]
+        self.tree = Fenwick(self.scale.buckets)
+        self.counts: Dict[int, int] = {}
+        self.loaded_at = time.monotonic()
+
+    def add_bucket(self, bucket: int, count: int):
+        self.tree.add(bucket, count)
+        self.counts[bucket] = self.counts.get(bucket, 0) + count
+
+    def record(self, value: float):
+        self.add_bucket(self.scale.bucket(value), 1)
+
+    def beats(self, value: float) -> Optional[float]:
+        """Percentage of recorded submissions strictly slower (larger) than `value`."""
+        if not self.tree.total:
+            return None
+        slower = self.tree.total - self.tree.prefix(self.scale.bucket(value))
+        return round(100.0 * slower / self.tree.total, 2)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th quantile (0 < q <= 1)."""
+        if not self.tree.total:
+            return None
+        k = max(1, math.ceil(q * self.tree.total))
+        return round(self.scale.upper(self.tree.search(k)), 2)
+
+    def histogram(self) -> List[dict]:
+        return [
+            {"bucket": b, "upper": round(self.scale.upper(b), 2), "count": c}
+            for b, c in sorted(self.counts.items()) if c
+        ]
+
+
+_cache: Dict[Tuple[int, str, str], Distribution] = {}
+
+
+async def get_distribution(db: AsyncSession, problem_id: int, language: str, metric: str) -> Distribution:
+    key = (problem_id, language.lower(), metric)
+    dist = _cache.get(key)
+    if dist is None or time.monotonic() - dist.loaded_at > RELOAD_SECONDS:
+        result = await db.execute(
+            select(RuntimeHistogram.bucket, RuntimeHistogram.count).where(
+                RuntimeHistogram.problem_id == problem_id,
+                RuntimeHistogram.language == key[1],
+                RuntimeHistogram.metric == metric,
+            )
+        )
+        dist = Distribution(metric)
+        for bucket, count in result.all():
+            dist.add_bucket(bucket, count)
+        _cache[key] = dist
+    return dist
+
+
+async def record_accepted(db: AsyncSession, problem_id: int, language: str,
+                          runtime_ms: Optional[float], memory_kb: Optional[float], delta: int = 1):
+    """
+    Increments the persisted buckets (delta=-1 takes a submission back out, e.g. after a rejudge).
+    Runs inside the caller's transaction; call apply_accepted after commit.
+    """
+    insert = dialect_insert(db)
+    for metric, value in (("runtime", runtime_ms), ("memory", memory_kb)):
+        if value is None:
+            continue
+        stmt = insert(RuntimeHistogram).values(
+            problem_id=problem_id,
+            language=language.lower(),
+            metric=metric,
+            bucket=SCALES[metric].bucket(value),
+            count=max(delta, 0),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["problem_id", "language", "metric", "bucket"],
+            set_={"count": RuntimeHistogram.count + delta},
+        )
+        await db.execute(stmt)
+
+
+def apply_accepted(problem_id: int, language: str, runtime_ms: Optional[float], memory_kb: Optional[float],
+                   delta: int = 1):
+    # Only touch distributions that are already cached; uncached ones will load the committed rows
+    for metric, value in (("runtime", runtime_ms), ("memory", memory_kb)):
+        dist = _cache.get((problem_id, language.lower(), metric))
+        if dist is not None and value is not None:
+            dist.add_bucket(dist.scale.bucket(value), delta)
+
+
+async def submission_percentiles(db: AsyncSession, problem_id: int, language: str,
+                                 runtime_ms: Optional[float], memory_kb: Optional[float]) -> Tuple[Optional[float], Optional[float]]:
+    runtime_pct = memory_pct = None
+    if runtime_ms is not None:
+        runtime_pct = (await get_distribution(db, problem_id, language, "runtime")).beats(runtime_ms)
+    if memory_kb is not None:
+        memory_pct = (await get_distribution(db, problem_id, language, "memory")).beats(memory_kb)
+    return runtime_pct, memory_pct
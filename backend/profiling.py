@@ -0,0 +1,190 @@
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Dict
+
+from sqlalchemy import event
+
+# Opt-in request profiling.
+#
+# ProfilingMiddleware profiles a request when it is sampled (PROFILE_SAMPLE_RATE, 0 = never)
+# or carries `X-Profile-Token: <PROFILE_TOKEN>` (ignored unless PROFILE_TOKEN is set). A profile has
+#   * wall time and CPU time of the event-loop thread while the request was in flight
+#   * time spent awaiting the database and the executor (count + ms), the rest being "other"
+#   * a stack sampler over the event-loop thread every PROFILE_INTERVAL_MS, as collapsed stacks
+#     ("outer;inner;leaf count", the flamegraph.pl / speedscope input format)
+# and is written as JSON to PROFILE_DIR (newest PROFILE_MAX_FILES kept), retrievable from /admin/profiles.
+#
+# The loop thread is shared: concurrent requests show up in CPU time and stack samples too.
+# DB/executor timings are per request (contextvars), so those are exact; awaits that overlap
+# (e.g. run_test's concurrent cases) can add up to more than the wall time.
+
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))
+MAX_STACK_DEPTH = 64
+
+logger = logging.getLogger(__name__)
+
+_timings: contextvars.ContextVar = contextvars.ContextVar("profile_timings", default=None)
+
+
+def record(category: str, elapsed_ms: float):
+    timings = _timings.get()
+    if timings is not None:
+        entry = timings.setdefault(category, {"count": 0, "ms": 0.0})
+        entry["count"] += 1
+        entry["ms"] += elapsed_ms
+
+
+def start_timings() -> contextvars.Token:
+    """Starts collecting db/executor timings for this request, or joins a collection already running."""
+    return _timings.set(_timings.get() if _timings.get() is not None else {})
+
+
+def stop_timings(token: contextvars.Token) -> dict:
+    timings = _timings.get()
+    _timings.reset(token)
+    return timings
+
+
+@asynccontextmanager
+async def timed(category: str):
+    """Wrap an await to attribute its time to `category` in the current request's profile (if any)."""
+    if _timings.get() is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(category, (time.perf_counter() - start) * 1000)
+
+
+def instrument_engine(engine):
+    """Attributes cursor execution time on `engine` to the "db" category."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profile_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("profile_start")
+        if starts:
+            record("db", (time.perf_counter() - starts.pop()) * 1000)
+
+
+class StackSampler(threading.Thread):
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> Dict[str, int]:
+        self.stopped.set()
+        self.join()
+        return dict(self.stacks.most_common())
+
+
+def _should_profile(headers: dict) -> bool:
+    if PROFILE_TOKEN and headers.get(b"x-profile-token", b"").decode("latin-1") == PROFILE_TOKEN:
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def _write(profile: dict):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(os.path.join(PROFILE_DIR, f"{profile['id']}.json"), "w") as f:
+        json.dump(profile, f)
+    files = sorted(
+        (os.path.join(PROFILE_DIR, name) for name in os.listdir(PROFILE_DIR) if name.endswith(".json")),
+        key=os.path.getmtime,
+    )
+    for path in files[:-PROFILE_MAX_FILES]:
+        os.remove(path)
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self.sampling = False  # One stack sampler at a time; overlapping profiles still get timings
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _should_profile(dict(scope.get("headers") or [])):
+            return await self.app(scope, receive, send)
+
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        status = {"code": None}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        sampler = None
+        if not self.sampling:
+            self.sampling = True
+            sampler = StackSampler(threading.get_ident(), PROFILE_INTERVAL_MS / 1000)
+            sampler.start()
+
+        token = start_timings()
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            wall_ms = (time.perf_counter() - wall_start) * 1000
+            cpu_ms = (time.thread_time() - cpu_start) * 1000
+            timings = stop_timings(token)
+            stacks = {}
+            if sampler is not None:
+                stacks = sampler.stop()
+                self.sampling = False
+
+            awaited = sum(t["ms"] for t in timings.values())
+            profile = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "status": status["code"],
+                "started_at": time.time() - wall_ms / 1000,
+                "wall_ms": round(wall_ms, 2),
+                "cpu_ms": round(cpu_ms, 2),
+                "breakdown": {
+                    **{name: {"count": t["count"], "ms": round(t["ms"], 2)} for name, t in timings.items()},
+                    "other_ms": round(max(0.0, wall_ms - awaited), 2),
+                },
+                "sample_interval_ms": PROFILE_INTERVAL_MS if sampler is not None else None,
+                "stacks": stacks,
+            }
+            try:
+                await asyncio.to_thread(_write, profile)
+            except OSError as e:
+                logger.warning("Could not write profile %s: %s", profile_id, e)
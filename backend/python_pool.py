@@ -0,0 +1,138 @@
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import List, Optional
+
+# Pre-forked Python runner for the local executor (see local_executor.py).
+#
+# A fresh interpreter per test case spends most of a small case starting up and importing. Instead
+# we keep LOCAL_PYTHON_WORKERS zygotes (python_zygote.py): long-lived interpreters with the stdlib
+# modules drivers and solutions use already imported. A run is a fork of a zygote, so it starts warm,
+# and the zygote itself never runs user code, so nothing leaks from one run into the next.
+#
+# The child gets the payload's memory limit (RLIMIT_AS), an output cap (RLIMIT_FSIZE,
+# LOCAL_OUTPUT_LIMIT_MB), a CPU backstop (RLIMIT_CPU) and a wall-clock kill, and runs in its own
+# process group so anything it forks dies with it. Wall time, CPU time and peak RSS come back with
+# every run. A zygote that dies is replaced on the next run.
+
+PYTHON_WORKERS = int(os.getenv("LOCAL_PYTHON_WORKERS", str(os.cpu_count() or 2)))
+OUTPUT_LIMIT_MB = int(os.getenv("LOCAL_OUTPUT_LIMIT_MB", "64"))
+ZYGOTE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "python_zygote.py")
+RESPONSE_GRACE_SECONDS = 5.0  # On top of the run's own limit before a silent zygote is killed
+
+
+class PythonPoolError(Exception):
+    """A zygote failed (not the program); the run may be retried."""
+
+
+@dataclass
+class RunResult:
+    code: Optional[int]
+    signal: Optional[str]
+    wall_ms: float
+    cpu_ms: float
+    memory: int  # Peak RSS in bytes
+    stdout: str
+    stderr: str
+
+
+class Zygote:
+    def __init__(self, proc: asyncio.subprocess.Process):
+        self.proc = proc
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.returncode is None
+
+    async def run(self, source: str, stdin: str, timeout_ms: int, memory: int) -> RunResult:
+        source_bytes, stdin_bytes = source.encode(), stdin.encode()
+        header = {
+            "timeout_ms": timeout_ms,
+            "memory": memory,
+            "output_limit": OUTPUT_LIMIT_MB * 1024 * 1024,
+            "source": len(source_bytes),
+            "stdin": len(stdin_bytes),
+        }
+        try:
+            self.proc.stdin.write(json.dumps(header).encode() + b"\n" + source_bytes + stdin_bytes)
+            await self.proc.stdin.drain()
+            return await asyncio.wait_for(self._read_result(), timeout_ms / 1000 + RESPONSE_GRACE_SECONDS)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError) as e:
+            await self.kill()
+            raise PythonPoolError(f"Python zygote failed: {type(e).__name__}: {e}") from e
+
+    async def _read_result(self) -> RunResult:
+        line = await self.proc.stdout.readline()
+        if not line:
+            raise ConnectionError("zygote exited")
+        result = json.loads(line)
+        stdout = await self.proc.stdout.readexactly(result["stdout"])
+        stderr = await self.proc.stdout.readexactly(result["stderr"])
+        return RunResult(
+            result["code"], result["signal"], result["wall_ms"], result["cpu_ms"], result["memory"],
+            stdout.decode(errors="replace"), stderr.decode(errors="replace"),
+        )
+
+    async def kill(self):
+        if self.alive:
+            self.proc.kill()
+        await self.proc.wait()
+
+
+class PythonPool:
+    def __init__(self, python: str, work_dir: str, size: int = PYTHON_WORKERS):
+        self.python = python
+        self.work_dir = work_dir
+        self.size = max(1, size)
+        self.idle: List[Zygote] = []
+        self.slots = asyncio.Semaphore(self.size)
+        self._warmed = False
+
+    async def _spawn(self) -> Zygote:
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                self.python, "-I", ZYGOTE_SCRIPT, cwd=self.work_dir,
+                stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+            )
+        except OSError as e:
+            raise PythonPoolError(f"Could not start {self.python}: {e}") from e
+        return Zygote(proc)
+
+    async def warm(self):
+        """Starts the zygotes ahead of the first run."""
+        if self._warmed:
+            return
+        self._warmed = True
+        os.makedirs(self.work_dir, exist_ok=True)
+        zygotes = await asyncio.gather(*(self._spawn() for _ in range(self.size - len(self.idle))), return_exceptions=True)
+        self.idle.extend(z for z in zygotes if isinstance(z, Zygote))
+
+    @asynccontextmanager
+    async def zygote(self):
+        async with self.slots:
+            zygote = None
+            while self.idle and zygote is None:
+                candidate = self.idle.pop()
+                zygote = candidate if candidate.alive else None
+            if zygote is None:
+                os.makedirs(self.work_dir, exist_ok=True)
+                zygote = await self._spawn()
+            reusable = False
+            try:
+                yield zygote
+                reusable = zygote.alive
+            finally:
+                if reusable:
+                    self.idle.append(zygote)
+                elif zygote.alive:
+                    zygote.proc.kill()  # Cancelled mid-run: its reply would be read by the next run
+
+    async def run(self, source: str, stdin: str, timeout_ms: int, memory: int = -1) -> RunResult:
+        async with self.zygote() as zygote:
+            return await zygote.run(source, stdin, timeout_ms, memory)
+
+    async def close(self):
+        zygotes, self.idle = self.idle, []
+        await asyncio.gather(*(z.kill() for z in zygotes), return_exceptions=True)
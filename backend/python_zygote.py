@@ -0,0 +1,176 @@
+import sys
+import os
+import io
+import json
+import time
+import signal
+import tempfile
+import threading
+import traceback
+import linecache
+import resource
+from collections import OrderedDict
+
+# What drivers and typical solutions import; children get them for free
+import ast
+import contextlib
+import collections
+import heapq
+import bisect
+import itertools
+import functools
+import math
+import random
+import string
+import re
+import typing
+import dataclasses
+
+# Forkserver for the local executor's Python runs (see python_pool.py). Run as a plain script by
+# LOCAL_PYTHON, so it must not import anything from `backend`.
+#
+# Speaks on stdin/stdout, one request at a time:
+#     {"timeout_ms", "memory", "output_limit", "source", "stdin"}\n<source bytes><stdin bytes>
+#  -> {"code", "signal", "wall_ms", "cpu_ms", "memory", "stdout", "stderr"}\n<stdout bytes><stderr bytes>
+# ("source"/"stdin"/"stdout"/"stderr" in the headers are byte lengths.)
+#
+# Each run forks a child that inherits the modules imported above and the compiled program, so it
+# starts in well under a millisecond instead of paying for interpreter startup and imports.
+
+COMPILED_CACHE_SIZE = 32
+SIGNALS = {int(s): s.name for s in signal.Signals}
+
+
+def read_request(stream):
+    line = stream.readline()
+    if not line:
+        return None
+    header = json.loads(line)
+    source = stream.read(header["source"]).decode()
+    stdin = stream.read(header["stdin"])
+    return header, source, stdin
+
+
+def child(program, files, memory: int, output_limit: int, cpu_seconds: int):
+    # Own process group, so a program that forks can be killed as a whole
+    os.setpgid(0, 0)
+    for fd, f in enumerate(files):
+        os.dup2(f.fileno(), fd)
+    if memory > 0:
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    if output_limit > 0:
+        resource.setrlimit(resource.RLIMIT_FSIZE, (output_limit, output_limit))
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    random.seed()  # Otherwise every run replays the zygote's random state
+
+    sys.stdin = io.TextIOWrapper(io.FileIO(0, "r", closefd=False))
+    sys.stdout = io.TextIOWrapper(io.FileIO(1, "w", closefd=False))
+    sys.stderr = io.TextIOWrapper(io.FileIO(2, "w", closefd=False), line_buffering=True)
+    sys.argv = ["main.py"]
+    code = 0
+    try:
+        if isinstance(program, str):
+            sys.stderr.write(program)  # SyntaxError found while compiling
+            code = 1
+        else:
+            exec(program, {"__name__": "__main__", "__builtins__": __builtins__})
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            sys.stderr.write(f"{e.code}\n")
+            code = 1
+    except BaseException:
+        # Drop this frame so the traceback starts in main.py, as with `python main.py`
+        etype, value, tb = sys.exc_info()
+        traceback.print_exception(etype, value, tb.tb_next)
+        code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except BaseException:
+            code = code or 1
+        os._exit(code)
+
+
+def kill_group(pid: int):
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def compile_program(source: str, cache: OrderedDict):
+    # Every case of a submission runs the same program: compile it once, here in the parent
+    if source in cache:
+        cache.move_to_end(source)
+        return cache[source]
+    try:
+        program = compile(source, "main.py", "exec")
+    except SyntaxError:
+        program = "".join(traceback.format_exception_only(*sys.exc_info()[:2]))
+    cache[source] = program
+    while len(cache) > COMPILED_CACHE_SIZE:
+        cache.popitem(last=False)
+    return program
+
+
+def run(header: dict, source: str, stdin: bytes, cache: OrderedDict) -> tuple:
+    program = compile_program(source, cache)
+    # Lets tracebacks in the child quote main.py's lines
+    linecache.cache["main.py"] = (len(source), None, source.splitlines(True), "main.py")
+    timeout = header["timeout_ms"] / 1000
+    with tempfile.TemporaryFile() as stdin_file, tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        stdin_file.write(stdin)
+        stdin_file.seek(0)
+
+        start = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            child(program, (stdin_file, out, err), header["memory"], header["output_limit"], int(timeout) + 1)
+
+        # Wall-clock limit; RLIMIT_CPU only catches busy loops
+        timer = threading.Timer(timeout, kill_group, (pid,))
+        timer.start()
+        _, status, usage = os.wait4(pid, 0)
+        wall_ms = (time.perf_counter() - start) * 1000
+        timer.cancel()
+        kill_group(pid)  # Anything the program left running
+
+        if os.WIFSIGNALED(status):
+            code, sig = None, SIGNALS.get(os.WTERMSIG(status), str(os.WTERMSIG(status)))
+        else:
+            code, sig = os.WEXITSTATUS(status), None
+
+        out.seek(0)
+        err.seek(0)
+        stdout, stderr = out.read(), err.read()
+    return {
+        "code": code,
+        "signal": sig,
+        "wall_ms": round(wall_ms, 2),
+        "cpu_ms": round((usage.ru_utime + usage.ru_stime) * 1000, 2),
+        "memory": usage.ru_maxrss * 1024,  # KiB on Linux
+        "stdout": len(stdout),
+        "stderr": len(stderr),
+    }, stdout, stderr
+
+
+def main():
+    requests, replies = sys.stdin.buffer, sys.stdout.buffer
+    cache = OrderedDict()
+    while True:
+        request = read_request(requests)
+        if request is None:
+            return
+        result, stdout, stderr = run(*request, cache)
+        replies.write(json.dumps(result).encode() + b"\n" + stdout + stderr)
+        replies.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+import argparse
+import asyncio
+from backend.database import SessionLocal
+from backend import user_stats
+
+# Recompute user_stats from the full submissions history, in batches of users.
+#
+#   python -m backend.rebuild_user_stats --batch-size 200
+
+async def main(batch_size: int):
+    total = await user_stats.rebuild(SessionLocal, batch_size=batch_size)
+    print(f"Finished rebuilding stats for {total} users.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild user_stats from submission history.")
+    parser.add_argument("--batch-size", type=int, default=200, help="Users per transaction")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
@@ -0,0 +1,206 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+from typing import Dict, List, Set
+
+from fastapi import HTTPException
+from sqlalchemy import event, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from backend.database import SessionLocal, dialect_insert
+from backend.models.problem import Problem, TestCase, testcase_hash
+from backend.models.submission import Submission
+from backend.models.judged_case_set import JudgedCaseSet, case_set
+from backend.judge import build_driver, judge, Verdict
+from backend import backfill
+from backend import blobs
+from backend import percentiles
+from backend import user_stats
+from backend import logs
+
+# Incremental rejudging after a problem's test cases change.
+#
+# Every test case has a content hash, and every Accepted submission points at the JudgedCaseSet
+# (the content hashes) it was judged against. A rejudge compares that set with the problem's current
+# cases and runs only the cases the submission hasn't passed yet: adding one case to a problem with
+# 10k accepted solutions costs 10k runs, not 10k times every case. Unchanged cases cost nothing even
+# though update_problem re-creates the rows, and removed cases are simply dropped.
+#
+# Per submission:
+#   passes the new cases -> stays Accepted, now points at the current set
+#   fails one            -> takes that verdict, its output prefixed with a "Rejudged ..." note. The
+#                           owner's user_stats are rebuilt, and its runtime/memory leave the
+#                           distribution (this process's cache right after the chunk commits,
+#                           other processes' on reload)
+# Contest standings are left as they were at the contest.
+#
+# Runs through backfill.run_backfill: keyset chunks over submission ids, one transaction per chunk,
+# resumable, throttled. Within a chunk, REJUDGE_CONCURRENCY submissions are judged at once. An
+# executor outage aborts the chunk before it commits, and the next run resumes there.
+#
+# update_problem and test case generation start one in the background (REJUDGE_ON_UPDATE);
+#   python -m backend.rejudge --problem-id 3 [--dry-run] [--max-rows-per-sec 5]
+# runs it from the command line.
+
+REJUDGE_ON_UPDATE = os.getenv("REJUDGE_ON_UPDATE", "true").lower() == "true"
+REJUDGE_CONCURRENCY = int(os.getenv("REJUDGE_CONCURRENCY", "4"))
+REJUDGE_BATCH_SIZE = int(os.getenv("REJUDGE_BATCH_SIZE", "50"))
+REJUDGE_MAX_ROWS_PER_SEC = float(os.getenv("REJUDGE_MAX_ROWS_PER_SEC", "2"))  # Background runs only
+REJUDGED_PREFIX = "Rejudged after the test cases changed:\n"
+
+logger = logging.getLogger(__name__)
+
+
+def case_hash(tc: TestCase) -> str:
+    return tc.content_hash or testcase_hash(tc.input_data, tc.expected_output)
+
+
+async def record_case_set(db: AsyncSession, problem_id: int, test_cases) -> str:
+    """Stores (once) the set of `test_cases` and returns its hash. Runs in the caller's transaction."""
+    set_hash, listed = case_set(problem_id, (case_hash(tc) for tc in test_cases))
+    insert = dialect_insert(db)
+    await db.execute(
+        insert(JudgedCaseSet).values(hash=set_hash, problem_id=problem_id, case_hashes=listed)
+        .on_conflict_do_nothing(index_elements=["hash"])
+    )
+    return set_hash
+
+
+async def _judge_new_cases(submission: Submission, new_cases: List[TestCase], slots: asyncio.Semaphore):
+    try:
+        full_code = build_driver(submission.language, submission.code)
+    except HTTPException:
+        return None  # Language no longer offered; leave the submission alone
+    async with slots:
+        verdict = Verdict()
+        async for case in judge(submission.language.lower(), full_code, new_cases):
+            verdict.add(case)
+    return verdict
+
+
+async def rejudge_problem(problem_id: int, options: backfill.BackfillOptions,
+                          session_factory=SessionLocal, log=print) -> backfill.Checkpoint:
+    async with session_factory() as db:
+        result = await db.execute(select(TestCase).where(TestCase.problem_id == problem_id).order_by(TestCase.id))
+        cases = list(result.scalars().all())
+        current = await record_case_set(db, problem_id, cases)
+        if options.dry_run:
+            await db.rollback()
+        else:
+            await db.commit()
+
+    known_sets: Dict[str, Set[str]] = {current: {case_hash(tc) for tc in cases}}
+    slots = asyncio.Semaphore(REJUDGE_CONCURRENCY)
+
+    async def process(session: AsyncSession, submissions: List[Submission]) -> int:
+        unknown = {s.judged_set_hash for s in submissions if s.judged_set_hash and s.judged_set_hash not in known_sets}
+        if unknown:
+            rows = await session.execute(select(JudgedCaseSet).where(JudgedCaseSet.hash.in_(unknown)))
+            for row in rows.scalars().all():
+                known_sets[row.hash] = set(json.loads(row.case_hashes))
+
+        # No recorded set (or a lost one) means nothing is known to have passed: run every case
+        pending = [
+            (s, [tc for tc in cases if case_hash(tc) not in known_sets.get(s.judged_set_hash, set())])
+            for s in submissions
+        ]
+        verdicts = await asyncio.gather(
+            *(_judge_new_cases(s, new_cases, slots) for s, new_cases in pending if new_cases),
+            return_exceptions=True,
+        )
+        for outcome in verdicts:
+            if isinstance(outcome, BaseException):
+                raise outcome  # ExecutorUnavailable etc.: nothing in this chunk is committed
+        verdicts = iter(verdicts)
+
+        failed = []
+        for submission, new_cases in pending:
+            verdict = next(verdicts) if new_cases else Verdict()
+            if verdict is None:
+                continue
+            submission.judged_set_hash = current
+            if verdict.status == "Accepted":
+                continue
+            log(f"  Submission {submission.id}: Accepted -> {verdict.status}")
+            submission.status = verdict.status
+            submission.output_hash = await blobs.put(session, REJUDGED_PREFIX + verdict.output)
+            await percentiles.record_accepted(session, submission.problem_id, submission.language,
+                                              submission.runtime_ms, submission.memory_kb, delta=-1)
+            failed.append(submission)
+
+        user_ids = sorted({s.user_id for s in failed if s.user_id})
+        if user_ids:
+            await session.flush()
+            await user_stats.rebuild_users(session, user_ids)
+        if failed:
+            # This process's cached distributions follow once the chunk commits (never on a dry run's rollback)
+            taken_out = [(s.problem_id, s.language, s.runtime_ms, s.memory_kb) for s in failed]
+
+            def take_out_of_cache(_session):
+                for row in taken_out:
+                    percentiles.apply_accepted(*row, delta=-1)
+
+            event.listen(session.sync_session, "after_commit", take_out_of_cache, once=True)
+        return len(failed)
+
+    query = select(Submission).where(
+        Submission.problem_id == problem_id,
+        Submission.status == "Accepted",
+        or_(Submission.judged_set_hash.is_(None), Submission.judged_set_hash != current),
+    )
+    # One checkpoint per target case set: a later change starts its own pass
+    return await backfill.run_backfill(f"rejudge_{problem_id}_{current[:12]}", query, Submission.id, process,
+                                       options, session_factory=session_factory, log=log)
+
+
+_running: Dict[int, asyncio.Task] = {}
+_rerun: Set[int] = set()
+
+
+def schedule(problem_id: int):
+    """Rejudges the problem in the background; if a rejudge is already running, it runs once more afterwards."""
+    if problem_id in _running:
+        _rerun.add(problem_id)
+        return
+    _running[problem_id] = asyncio.create_task(_background(problem_id))
+
+
+async def _background(problem_id: int):
+    options = backfill.BackfillOptions(batch_size=REJUDGE_BATCH_SIZE, max_rows_per_sec=REJUDGE_MAX_ROWS_PER_SEC)
+    # Own context: the task outlives the request that scheduled it
+    with logs.context(job="rejudge", problem_id=problem_id):
+        try:
+            while True:
+                _rerun.discard(problem_id)
+                try:
+                    await rejudge_problem(problem_id, options, log=logger.info)
+                except Exception:
+                    logger.exception("Rejudge of problem %s stopped (python -m backend.rejudge resumes it)", problem_id)
+                    return
+                if problem_id not in _rerun:
+                    return
+        finally:
+            _running.pop(problem_id, None)
+
+
+def is_running(problem_id: int) -> bool:
+    return problem_id in _running
+
+
+async def main(problem_ids: List[int], options: backfill.BackfillOptions):
+    if not problem_ids:
+        async with SessionLocal() as db:
+            problem_ids = list((await db.execute(select(Problem.id).order_by(Problem.id))).scalars().all())
+    for problem_id in problem_ids:
+        checkpoint = await rejudge_problem(problem_id, options)
+        print(f"Problem {problem_id}: {checkpoint.processed} submissions checked, {checkpoint.changed} no longer accepted")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rejudge Accepted submissions against new or changed test cases.")
+    parser.add_argument("--problem-id", type=int, action="append", default=[], help="Repeatable; default: every problem")
+    backfill.add_arguments(parser, batch_size=REJUDGE_BATCH_SIZE)
+    args = parser.parse_args()
+    asyncio.run(main(args.problem_id, backfill.options_from_args(args)))
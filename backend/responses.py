@@ -0,0 +1,180 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from fastapi.responses import JSONResponse, Response
+
+# Response encoding: orjson rendering, negotiated compression and a cache of serialized payloads.
+#
+# FastJSONResponse is the app's default response class. CompressionMiddleware compresses
+# complete (non-streaming) responses above COMPRESS_MIN_BYTES with brotli when the client
+# accepts it and the optional `brotli` package is installed, gzip otherwise. SSE and other
+# streamed bodies pass through untouched so events still arrive as they happen.
+#
+# PayloadCache keeps the encoded bytes of hot read payloads (problem pages), already compressed
+# for each encoding, so a hit skips ORM validation, JSON encoding and compression entirely.
+# Those responses carry an ETag and PAYLOAD_CACHE_CONTROL; a matching If-None-Match gets a 304.
+
+try:
+    import orjson
+except ImportError:  # Optional dependency (listed in requirements.txt)
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+PAYLOAD_CACHE_TTL = float(os.getenv("PAYLOAD_CACHE_TTL", "60"))
+PAYLOAD_CACHE_SIZE = int(os.getenv("PAYLOAD_CACHE_SIZE", "256"))
+# Public problem payloads; clients and CDNs revalidate with If-None-Match after max-age
+PAYLOAD_CACHE_CONTROL = os.getenv("PAYLOAD_CACHE_CONTROL", "public, max-age=60, stale-while-revalidate=300")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    accepted = {part.split(";")[0].strip().lower() for part in (accept_encoding or "").split(",")}
+    if "br" in accepted and brotli is not None:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware (BaseHTTPMiddleware would buffer streaming responses)."""
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope.get("headers") or [])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                # Hold the start message until we know whether the body gets compressed
+                start_message = message
+                response_headers = {k.lower(): v for k, v in message.get("headers", [])}
+                passthrough = (
+                    b"content-encoding" in response_headers
+                    or response_headers.get(b"content-type", b"").startswith(b"text/event-stream")
+                )
+                if passthrough:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                return await send(message)
+
+            body = message.get("body", b"")
+            if message.get("more_body", False):
+                # Streamed body: send as-is
+                passthrough = True
+                await send(start_message)
+                return await send(message)
+
+            raw_headers = [(k, v) for k, v in start_message.get("headers", []) if k.lower() != b"content-length"]
+            if len(body) >= self.minimum_size:
+                body = compress(body, encoding)
+                raw_headers.append((b"content-encoding", encoding.encode()))
+            raw_headers.append((b"content-length", str(len(body)).encode()))
+            raw_headers.append((b"vary", b"Accept-Encoding"))
+            await send({**start_message, "headers": raw_headers})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class EncodedPayload:
+    """One serialized payload plus its compressed variants (made lazily, once)."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.created_at = time.monotonic()
+        self.variants: Dict[str, bytes] = {}
+        # Weak: the same payload is sent under several encodings
+        self.etag = f'W/"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+    def not_modified(self, if_none_match: Optional[str]) -> bool:
+        tags = {tag.strip().removeprefix("W/") for tag in (if_none_match or "").split(",")}
+        return "*" in tags or self.etag.removeprefix("W/") in tags
+
+    def response(self, accept_encoding: str, if_none_match: Optional[str] = None) -> Response:
+        encoding = choose_encoding(accept_encoding) if len(self.body) >= COMPRESS_MIN_BYTES else None
+        headers = {"Vary": "Accept-Encoding", "ETag": self.etag, "Cache-Control": PAYLOAD_CACHE_CONTROL}
+        if self.not_modified(if_none_match):
+            return Response(status_code=304, headers=headers)
+        if encoding is None:
+            return Response(content=self.body, media_type="application/json", headers=headers)
+        if encoding not in self.variants:
+            self.variants[encoding] = compress(self.body, encoding)
+        # Content-Encoding set -> CompressionMiddleware leaves it alone
+        headers["Content-Encoding"] = encoding
+        return Response(content=self.variants[encoding], media_type="application/json", headers=headers)
+
+
+class PayloadCache:
+    """Small LRU of EncodedPayloads with a TTL (other workers' writes show up within PAYLOAD_CACHE_TTL)."""
+
+    def __init__(self, max_entries: int = PAYLOAD_CACHE_SIZE, ttl: float = PAYLOAD_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: "OrderedDict[str, EncodedPayload]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[EncodedPayload]:
+        payload = self.entries.get(key)
+        if payload is None:
+            return None
+        if time.monotonic() - payload.created_at > self.ttl:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return payload
+
+    def put(self, key: str, content) -> EncodedPayload:
+        payload = EncodedPayload(dumps(content))
+        if self.max_entries > 0:
+            self.entries[key] = payload
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return payload
+
+    def clear(self):
+        self.entries.clear()
+
+
+# Problem pages and listings; cleared whenever a problem or its test cases change
+problem_payloads = PayloadCache()
@@ -0,0 +1,112 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from typing import List, Optional
+
+from backend.database import get_db, get_read_db, SessionLocal
+from backend.models.contest import Contest, contest_problems
+from backend.models.problem import Problem
+from backend.models.user import User
+from backend.schemas import ContestCreate, ContestResponse, ContestStandingsResponse, ContestStanding
+from backend.routers.problems import require_admin
+from backend import contests
+
+router = APIRouter(
+    prefix="/contests",
+    tags=["contests"],
+)
+
+MAX_PAGE_SIZE = 200
+
+async def load_contest(db: AsyncSession, slug: str) -> Contest:
+    result = await db.execute(select(Contest).where(Contest.slug == slug))
+    contest = result.scalars().first()
+    if not contest:
+        raise HTTPException(status_code=404, detail="Contest not found")
+    return contest
+
+@router.post("", response_model=ContestResponse)
+async def create_contest(contest: ContestCreate, clerk_id: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    await require_admin(db, clerk_id)
+    # toISOString() sends "...Z": the columns are naive UTC, so convert before comparing or storing
+    start_time, end_time = contests.naive_utc(contest.start_time), contests.naive_utc(contest.end_time)
+    if end_time <= start_time:
+        raise HTTPException(status_code=400, detail="end_time must be after start_time")
+    result = await db.execute(select(Contest.id).where(Contest.slug == contest.slug))
+    if result.scalar() is not None:
+        raise HTTPException(status_code=400, detail="Contest with this slug already exists")
+    result = await db.execute(select(Problem.id).where(Problem.id.in_(contest.problem_ids)))
+    missing = set(contest.problem_ids) - set(result.scalars().all())
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Unknown problem ids: {sorted(missing)}")
+
+    db_contest = Contest(
+        slug=contest.slug,
+        title=contest.title,
+        description=contest.description,
+        start_time=start_time,
+        end_time=end_time,
+        penalty_minutes=contest.penalty_minutes,
+    )
+    db.add(db_contest)
+    await db.flush()
+    if contest.problem_ids:
+        await db.execute(insert(contest_problems), [
+            {"contest_id": db_contest.id, "problem_id": pid, "position": i}
+            for i, pid in enumerate(dict.fromkeys(contest.problem_ids))
+        ])
+    await db.commit()
+    return await load_contest(db, contest.slug)
+
+@router.get("", response_model=List[ContestResponse])
+async def get_contests(db: AsyncSession = Depends(get_read_db)):
+    result = await db.execute(select(Contest).order_by(Contest.start_time.desc()))
+    return result.scalars().all()
+
+@router.get("/{slug}", response_model=ContestResponse)
+async def get_contest(slug: str, db: AsyncSession = Depends(get_read_db)):
+    return await load_contest(db, slug)
+
+@router.get("/{slug}/standings", response_model=ContestStandingsResponse)
+async def get_standings(slug: str, offset: int = 0, limit: int = 50, db: AsyncSession = Depends(get_db)):
+    # Served from the in-memory board: O(log n + limit) per page
+    contest = await load_contest(db, slug)
+    board = await contests.get_board(db, contest.id)
+    offset = max(0, offset)
+    return ContestStandingsResponse(
+        contest_id=contest.id,
+        total=len(board),
+        offset=offset,
+        standings=[ContestStanding(**row) for row in board.page(offset, max(0, min(limit, MAX_PAGE_SIZE)))],
+    )
+
+@router.get("/{slug}/rank/{clerk_id}", response_model=ContestStanding)
+async def get_rank(slug: str, clerk_id: str, db: AsyncSession = Depends(get_db)):
+    contest = await load_contest(db, slug)
+    result = await db.execute(select(User.id).where(User.clerk_id == clerk_id))
+    user_id = result.scalar()
+    board = await contests.get_board(db, contest.id)
+    rank = board.rank(user_id) if user_id is not None else None
+    if rank is None:
+        raise HTTPException(status_code=404, detail="Not participating in this contest")
+    return ContestStanding(**board.rows[user_id], rank=rank)
+
+@router.get("/{slug}/feed")
+async def standings_feed(slug: str, request: Request):
+    """
+    Server-Sent Events of rank changes as submissions are judged:
+      event: hello  {"participants"}
+      event: rank   {"user_id", "username", "old_rank", "new_rank", "solved", "penalty", "participants"}
+    Other participants shift by one around each move; clients refetch the visible standings page.
+    """
+    # Own short session: a request-scoped one would hold a pooled connection for as long as the client listens
+    async with SessionLocal() as db:
+        contest = await load_contest(db, slug)
+        board = await contests.get_board(db, contest.id)
+    return StreamingResponse(
+        contests.feed(board, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
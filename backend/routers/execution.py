@@ -1,124 +1,161 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Response
+from typing import Optional
 import httpx
 from backend.schemas import ExecutionRequest, ExecutionResponse
+from backend.executor import executor, ExecutorUnavailable
+from backend import languages
+from backend import idempotency
 
 router = APIRouter(
     prefix="/execute",
     tags=["execution"],
 )
 
-PISTON_API_URL = "https://emkc.org/api/v2/piston/execute"
-
 @router.post("/", response_model=ExecutionResponse)
-async def execute_code(request: ExecutionRequest):
+async def execute_code(request: ExecutionRequest, response: Response, idempotency_key: Optional[str] = Header(None)):
     """
     Executes raw code using the Piston API.
     Useful for manual debugging if the user writes their own print statements.
     """
-    payload = {
-        "language": get_piston_language_name(request.language_id),
-        "version": "*",
-        "files": [{"content": request.source_code}],
-        "stdin": request.stdin or "",
-    }
-    return await run_piston(payload)
+    language = get_language_by_id(request.language_id)
+    return await idempotency.idempotent(
+        idempotency_key, "execute", (request,), response,
+        lambda: run_piston(language.payload(request.source_code, request.stdin or "")),
+    )
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 from fastapi import Depends
+from types import SimpleNamespace
+import os
 from backend.database import get_db
 from backend.models.problem import Problem
-from backend.models.submission import Submission
+from backend.schemas import RunTestRequest, RunTestResponse, CaseRunResult
+from backend.judge import build_driver, run_cases_concurrently, PASSED, FINISHED
+
+# Upper bound on cases per Run click, so one request can't fan out unbounded executor work
+MAX_RUN_CASES = int(os.getenv("MAX_RUN_CASES", "10"))
 
-@router.post("/run_test", response_model=ExecutionResponse)
-async def run_test_case(request: ExecutionRequest, problem_id: int, db: AsyncSession = Depends(get_db)):
+@router.post("/run_test", response_model=RunTestResponse)
+async def run_test_case(
+    request: RunTestRequest,
+    problem_id: int,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None),
+):
     """
-    Wraps user code with a driver and runs it against the FIRST test case of the problem.
+    Wraps user code with a driver and runs it, concurrently, against either the
+    user's custom inputs or every public (non-hidden) test case of the problem.
+    Public cases are compared with their expected output; custom inputs just report stdout.
     """
-    # 1. Fetch Problem
-    result = await db.execute(
-        select(Problem).options(selectinload(Problem.test_cases)).where(Problem.id == problem_id)
+    return await idempotency.idempotent(
+        idempotency_key, "run_test", (request, problem_id), response, lambda: run_tests(request, problem_id, db)
     )
-    problem = result.scalars().first()
-    if not problem or not problem.test_cases:
-        raise HTTPException(status_code=404, detail="Problem or test cases not found")
-    
-    test_case = problem.test_cases[0]
-    
-    # 2. Prepare Driver
-    from backend.drivers import get_python_driver, get_java_driver
-    
-    language_name = get_piston_language_name(request.language_id)
-    full_code = ""
 
-    if language_name == "python":
-        full_code = get_python_driver(request.source_code)
-    elif language_name == "java":
-        full_code = get_java_driver(request.source_code)
+async def run_tests(request: RunTestRequest, problem_id: int, db: AsyncSession) -> RunTestResponse:
+    # 1. Pick Cases
+    if request.custom_inputs:
+        if len(request.custom_inputs) > MAX_RUN_CASES:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_RUN_CASES} custom inputs per run.")
+        cases = [SimpleNamespace(id=None, input_data=text, expected_output=None, is_hidden=False)
+                 for text in request.custom_inputs]
     else:
-        raise HTTPException(status_code=400, detail="Automated verification is currently supported for Python and Java only.")
+        result = await db.execute(
+            select(Problem).options(selectinload(Problem.test_cases)).where(Problem.id == problem_id)
+        )
+        problem = result.scalars().first()
+        if not problem or not problem.test_cases:
+            raise HTTPException(status_code=404, detail="Problem or test cases not found")
+
+        cases = [tc for tc in problem.test_cases if not tc.is_hidden][:MAX_RUN_CASES]
+        if not cases:
+            # No samples - keep the old behaviour of running the first case, without revealing it
+            cases = problem.test_cases[:1]
 
-    payload = {
-        "language": language_name,
-        "version": "*",
-        "files": [{"content": full_code}],
-        "stdin": test_case.input_data,
-    }
-    return await run_piston(payload)
+    # 2. Prepare Driver
+    language_name = get_language_by_id(request.language_id).name
+    full_code = build_driver(language_name, request.source_code)
+
+    # 3. Run All Cases At Once
+    try:
+        results = await run_cases_concurrently(language_name, full_code, cases)
+    except ExecutorUnavailable as e:
+        raise HTTPException(status_code=503, detail=f"Execution Engine Unavailable: {str(e)}")
+
+    case_responses = []
+    for tc, res in zip(cases, results):
+        hidden = bool(tc.is_hidden)
+        compared = res.status in (PASSED, "Wrong Answer")
+        case_responses.append(CaseRunResult(
+            index=res.index,
+            input=None if hidden else tc.input_data,
+            stdout=res.stdout,
+            stderr=res.stderr,
+            expected_output=None if hidden or tc.expected_output is None else tc.expected_output.strip(),
+            passed=(res.status == PASSED) if compared else None,
+            status=res.status,
+            time_ms=res.time_ms,
+        ))
+
+    # Mirror the first problematic case at the top level so existing clients keep working.
+    # Top-level status keeps its old meaning: did the code run (not: was it correct).
+    headline = next((c for c in case_responses if c.status not in (PASSED, FINISHED)), case_responses[0])
+    ran_ok = all(c.status in (PASSED, FINISHED, "Wrong Answer") for c in case_responses)
+    return RunTestResponse(
+        stdout=headline.stdout,
+        stderr=headline.stderr,
+        status="Success" if ran_ok else "Error",
+        message=f"{sum(c.passed is True for c in case_responses)}/{sum(c.passed is not None for c in case_responses)} cases passed",
+        cases=case_responses,
+    )
 
 
 async def run_piston(payload: dict) -> ExecutionResponse:
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(PISTON_API_URL, json=payload)
-            response.raise_for_status()
-            result = response.json()
-            
-            run_stage = result.get("run", {})
-            compile_stage = result.get("compile", {})
-            
-            # Determine success based on exit codes
-            # Piston returns code=0 for success
-            compile_code = compile_stage.get("code", 0)
-            run_code = run_stage.get("code", 0)
-            
-            is_success = (compile_code == 0) and (run_code == 0)
-            
-            # Prioritize run stderr. 
-            # If compile failed, use compile stderr.
-            # If compile succeeded but had warnings (stderr not empty), ignore it unless we want to show warnings.
-            # For now, let's only show compile stderr if compile FAILED.
-            
-            final_stderr = ""
-            if compile_code != 0:
-                final_stderr = compile_stage.get("stderr", "")
-            elif run_code != 0:
-                final_stderr = run_stage.get("stderr", "")
-            
-            # If both are 0, we ignore compile warnings in stderr for now to avoid "Note: ..." causing frontend errors
-            
-            return ExecutionResponse(
-                stdout=run_stage.get("stdout", ""),
-                stderr=final_stderr,
-                compile_output=compile_stage.get("stdout", ""),
-                message=result.get("message", ""),
-                status="Success" if is_success else "Error"
-            )
-        except httpx.HTTPError as e:
-            raise HTTPException(status_code=500, detail=f"Execution Engine Error: {str(e)}")
+    try:
+        result = await executor.execute(payload)
+        
+        run_stage = result.get("run", {})
+        compile_stage = result.get("compile", {})
+        
+        # Determine success based on exit codes
+        # Piston returns code=0 for success
+        compile_code = compile_stage.get("code", 0)
+        run_code = run_stage.get("code", 0)
+        
+        is_success = (compile_code == 0) and (run_code == 0)
+        
+        # Prioritize run stderr. 
+        # If compile failed, use compile stderr.
+        # If compile succeeded but had warnings (stderr not empty), ignore it unless we want to show warnings.
+        # For now, let's only show compile stderr if compile FAILED.
+        
+        final_stderr = ""
+        if compile_code != 0:
+            final_stderr = compile_stage.get("stderr", "")
+        elif run_code != 0:
+            final_stderr = run_stage.get("stderr", "")
+        
+        # If both are 0, we ignore compile warnings in stderr for now to avoid "Note: ..." causing frontend errors
+        
+        return ExecutionResponse(
+            stdout=run_stage.get("stdout", ""),
+            stderr=final_stderr,
+            compile_output=compile_stage.get("stdout", ""),
+            message=result.get("message", ""),
+            status="Success" if is_success else "Error"
+        )
+    except ExecutorUnavailable as e:
+        # Transient (rate limit / outage) - tell the client to retry rather than fail the run
+        raise HTTPException(status_code=503, detail=f"Execution Engine Unavailable: {str(e)}")
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=500, detail=f"Execution Engine Error: {str(e)}")
 
 
-def get_piston_language_name(id: int) -> str:
-    # Map our internal or monaco IDs to Piston names
-    # For now, let's assume the frontend sends:
-    # 71 -> python
-    # 62 -> java
-    # 54 -> c++
-    # But better to just handle names if possible, but Piston uses names mostly.
-    # Let's verify standard Piston names.
-    mapping = {
-        71: "python",
-        62: "java"
-    }
-    return mapping.get(id, "python") # Default to python
+def get_language_by_id(language_id: int) -> languages.Language:
+    # Editor language ids (71 -> python, 62 -> java); see backend/languages.py
+    language = languages.by_id(language_id)
+    if language is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported language_id {language_id}. Supported: {', '.join(languages.supported())}.")
+    return language
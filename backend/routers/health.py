@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import os
+import time
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+
+from backend.database import engine
+from backend.executor import executor
+
+router = APIRouter(
+    tags=["health"],
+)
+logger = logging.getLogger(__name__)
+
+# The public executor is rate-limited, so /readyz reuses a recent executor probe instead of pinging on every call
+EXECUTOR_CHECK_TTL = float(os.getenv("READYZ_EXECUTOR_TTL", "30"))
+DB_CHECK_TIMEOUT = float(os.getenv("READYZ_DB_TIMEOUT", "5"))
+WARMUP_DB_CONNECTIONS = int(os.getenv("WARMUP_DB_CONNECTIONS", "2"))
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "15"))
+
+_executor_check = {"checked_at": 0.0, "result": None}
+_started_at = time.time()
+
+
+async def check_database() -> dict:
+    start = time.perf_counter()
+    try:
+        async with engine.connect() as conn:
+            await asyncio.wait_for(conn.execute(text("SELECT 1")), timeout=DB_CHECK_TIMEOUT)
+        ok, error = True, None
+    except Exception as e:
+        ok, error = False, f"{type(e).__name__}: {e}"
+
+    pool = engine.sync_engine.pool
+    return {
+        "ok": ok,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+        "pool": {
+            "size": pool.size() if hasattr(pool, "size") else None,
+            "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+        },
+        "error": error,
+    }
+
+
+async def check_executor(force: bool = False) -> dict:
+    now = time.monotonic()
+    if force or _executor_check["result"] is None or now - _executor_check["checked_at"] > EXECUTOR_CHECK_TTL:
+        endpoints = await executor.ping()
+        _executor_check["result"] = {
+            # Ready as long as at least one endpoint can take work
+            "ok": any(e["ok"] for e in endpoints),
+            "endpoints": endpoints,
+        }
+        _executor_check["checked_at"] = now
+    return _executor_check["result"]
+
+
+async def warm_up():
+    """
+    Runs at startup so the first real request doesn't pay for it: opens pooled DB connections and the
+    executor connection (local:// endpoints start their interpreter pools on the same probe).
+    """
+    async def touch_db():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                *(touch_db() for _ in range(WARMUP_DB_CONNECTIONS)),
+                check_executor(force=True),
+                return_exceptions=True,
+            ),
+            timeout=WARMUP_TIMEOUT,
+        )
+    except asyncio.TimeoutError:
+        # Never block startup on a slow dependency; /readyz will report it
+        logger.warning("Warm-up did not finish within %ss", WARMUP_TIMEOUT)
+        return
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning("Warm-up step failed: %s", result)
+
+
+@router.get("/healthz")
+async def healthz():
+    # Liveness only: the process is up and serving. No dependencies are touched.
+    return {"status": "ok", "uptime_s": round(time.time() - _started_at, 1)}
+
+
+@router.get("/readyz")
+async def readyz():
+    database, executor_status = await asyncio.gather(check_database(), check_executor())
+    ready = database["ok"] and executor_status["ok"]
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "database": database,
+            "executor": executor_status,
+        },
+    )
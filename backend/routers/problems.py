@@ -1,18 +1,92 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
-from typing import List
+from sqlalchemy.orm import selectinload, defer
+from typing import List, Optional
+import os
+import re
 
-from backend.database import get_db
+from backend.database import get_db, get_read_db, note_write, write_key, SessionLocal
 from backend.models.problem import Problem, TestCase
-from backend.schemas import ProblemCreate, ProblemResponse
+from backend.models.user import User, UserRole
+from backend.schemas import (
+    ProblemCreate, ProblemResponse, ProblemPublicResponse, ProblemSummary, TestCasePreview, TestCaseResponse,
+    TestCaseGenerationRequest, TestCaseGenerationResponse, TestCaseGenerationJob,
+)
+from backend.executor import ExecutorUnavailable
+from backend import testgen
+from backend import search
+from backend import rejudge
+from backend import markdown_render
+from backend.responses import problem_payloads, FastJSONResponse
 
 router = APIRouter(
     prefix="/problems",
     tags=["problems"],
 )
 
+# Public problem payloads carry at most MAX_SAMPLES visible cases, each cut at SAMPLE_PREVIEW_CHARS.
+# Full test data (hidden cases included) is only served by the admin /{problem_id}/testcases endpoints.
+MAX_SAMPLES = int(os.getenv("PUBLIC_MAX_SAMPLES", "5"))
+SAMPLE_PREVIEW_CHARS = int(os.getenv("SAMPLE_PREVIEW_CHARS", "2000"))
+TESTCASE_PAGE_MAX = 500
+EXPORT_CHUNK = 200
+
+async def public_views(db: AsyncSession, problems: List[Problem], rendered: bool = False) -> List[dict]:
+    """
+    Public payloads for `problems`: two queries regardless of count, no hidden or oversized data read.
+    `rendered` adds the pre-rendered HTML (single-problem pages; listings leave it deferred).
+    """
+    ids = [p.id for p in problems]
+    counts, samples = {}, {pid: [] for pid in ids}
+    if ids:
+        result = await db.execute(
+            select(TestCase.problem_id, func.count(TestCase.id)).where(TestCase.problem_id.in_(ids)).group_by(TestCase.problem_id)
+        )
+        counts = dict(result.all())
+        # Previews are cut in SQL (one extra char to detect truncation) so large cases never leave the database
+        result = await db.execute(
+            select(
+                TestCase.id,
+                TestCase.problem_id,
+                func.substr(TestCase.input_data, 1, SAMPLE_PREVIEW_CHARS + 1),
+                func.substr(TestCase.expected_output, 1, SAMPLE_PREVIEW_CHARS + 1),
+            )
+            .where(TestCase.problem_id.in_(ids), func.coalesce(TestCase.is_hidden, 0) == 0)
+            .order_by(TestCase.problem_id, TestCase.id)
+        )
+        for tc_id, pid, input_data, expected in result.all():
+            if len(samples[pid]) < MAX_SAMPLES:
+                truncated = len(input_data) > SAMPLE_PREVIEW_CHARS or len(expected) > SAMPLE_PREVIEW_CHARS
+                samples[pid].append(TestCasePreview(
+                    id=tc_id,
+                    input_data=input_data[:SAMPLE_PREVIEW_CHARS],
+                    expected_output=expected[:SAMPLE_PREVIEW_CHARS],
+                    truncated=truncated,
+                ))
+
+    return [
+        ProblemPublicResponse(
+            **ProblemSummary.model_validate(p).model_dump(),
+            samples=samples[p.id],
+            test_case_count=counts.get(p.id, 0),
+            **({"description_html": p.description_html, "editorial_html": p.editorial_html,
+                "render_hash": p.render_hash} if rendered else {}),
+        ).model_dump(mode="json")
+        for p in problems
+    ]
+
+async def require_admin(db: AsyncSession, clerk_id: Optional[str]):
+    # Same role the admin dashboard checks. NOTE: the backend has no session verification yet, so this
+    # keeps test data out of public payloads and casual requests rather than being a security boundary.
+    if not clerk_id:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    result = await db.execute(select(User.role).where(User.clerk_id == clerk_id))
+    if result.scalar() != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+
 @router.post("", response_model=ProblemResponse)
 async def create_problem(problem: ProblemCreate, db: AsyncSession = Depends(get_db)):
     # Check if slug exists
@@ -32,8 +106,11 @@ async def create_problem(problem: ProblemCreate, db: AsyncSession = Depends(get_
         constraints=problem.constraints,
         editorial=problem.editorial,
         concepts=problem.concepts,
+        tags=[],
     )
+    await markdown_render.render_problem(db_problem)
     db.add(db_problem)
+    await search.sync_concepts(db, db_problem, problem.concepts)
     await db.commit()
     await db.refresh(db_problem)
 
@@ -48,6 +125,8 @@ async def create_problem(problem: ProblemCreate, db: AsyncSession = Depends(get_
         db.add(db_tc)
     
     await db.commit()
+    note_write(write_key("problem", db_problem.id), write_key("slug", db_problem.slug))
+    problem_payloads.clear()
     # Reload problem with test cases
     result = await db.execute(
         select(Problem).options(selectinload(Problem.test_cases)).where(Problem.id == db_problem.id)
@@ -55,34 +134,131 @@ async def create_problem(problem: ProblemCreate, db: AsyncSession = Depends(get_
     final_problem = result.scalars().first()
     return final_problem
 
-@router.get("", response_model=List[ProblemResponse])
-async def get_problems(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(Problem).options(selectinload(Problem.test_cases)).offset(skip).limit(limit)
-    )
-    problems = result.scalars().all()
-    return problems
+@router.get("", response_model=List[ProblemPublicResponse])
+async def get_problems(request: Request, skip: int = 0, limit: int = 100, concept: Optional[str] = None, db: AsyncSession = Depends(get_read_db)):
+    # Served from pre-serialized bytes when hot (see backend/responses.py)
+    key = f"list:{skip}:{limit}:{concept or ''}"
+    cached = problem_payloads.get(key)
+    if cached is None:
+        stmt = select(Problem).options(defer(Problem.description_html), defer(Problem.editorial_html))
+        if concept:
+            stmt = search.filter_by_concept(stmt, concept)
+        result = await db.execute(stmt.order_by(Problem.id).offset(skip).limit(limit))
+        problems = result.scalars().all()
+        cached = problem_payloads.put(key, await public_views(db, problems))
+    return cached.response(request.headers.get("accept-encoding", ""), request.headers.get("if-none-match"))
+
+# NOTE: must be declared before /{slug} so "search" and "concepts" aren't taken as slugs
+@router.get("/search", response_model=List[ProblemSummary])
+async def search_problems(
+    q: Optional[str] = None,
+    concept: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 50,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Full-text search over title, description and concepts, optionally filtered by concept/difficulty."""
+    return await search.search_problems(db, q, concept, difficulty, skip, limit)
+
+@router.get("/concepts")
+async def get_concepts(db: AsyncSession = Depends(get_read_db)):
+    return await search.list_concepts(db)
+
+@router.get("/{slug}", response_model=ProblemPublicResponse)
+async def get_problem(slug: str, request: Request, db: AsyncSession = Depends(get_read_db)):
+    key = f"slug:{slug}"
+    cached = problem_payloads.get(key)
+    if cached is None:
+        result = await db.execute(select(Problem).where(Problem.slug == slug))
+        problem = result.scalars().first()
+        if not problem:
+            raise HTTPException(status_code=404, detail="Problem not found")
+        cached = problem_payloads.put(key, (await public_views(db, [problem], rendered=True))[0])
+    return cached.response(request.headers.get("accept-encoding", ""), request.headers.get("if-none-match"))
+
+def parse_case_range(header: Optional[str]):
+    """'cases=0-49' -> (0, 49); open-ended 'cases=100-' -> (100, None)."""
+    match = re.fullmatch(r"cases=(\d+)-(\d*)", (header or "").strip())
+    if not match:
+        return None
+    start, end = int(match.group(1)), int(match.group(2)) if match.group(2) else None
+    if end is not None and end < start:
+        raise HTTPException(status_code=416, detail="Invalid range")
+    return start, end
+
+@router.get("/{problem_id}/testcases", response_model=List[TestCaseResponse])
+async def get_test_cases(
+    problem_id: int,
+    request: Request,
+    clerk_id: Optional[str] = None,
+    offset: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Admin: full test cases (hidden included), one page at a time, ordered by id.
+    Page with offset/limit or a `Range: cases=START-END` header (inclusive, answered with 206 + Content-Range).
+    """
+    await require_admin(db, clerk_id)
+    result = await db.execute(select(func.count(TestCase.id)).where(TestCase.problem_id == problem_id))
+    total = result.scalar() or 0
+
+    requested = parse_case_range(request.headers.get("range"))
+    if requested:
+        offset = requested[0]
+        limit = (requested[1] - requested[0] + 1) if requested[1] is not None else TESTCASE_PAGE_MAX
+        if offset >= total and total > 0:
+            raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"cases */{total}"})
+    limit = max(0, min(limit, TESTCASE_PAGE_MAX))
 
-@router.get("/{slug}", response_model=ProblemResponse)
-async def get_problem(slug: str, db: AsyncSession = Depends(get_db)):
     result = await db.execute(
-        select(Problem).options(selectinload(Problem.test_cases)).where(Problem.slug == slug)
+        select(TestCase).where(TestCase.problem_id == problem_id).order_by(TestCase.id).offset(offset).limit(limit)
     )
-    problem = result.scalars().first()
-    if not problem:
-        raise HTTPException(status_code=404, detail="Problem not found")
-    return problem
+    cases = [TestCaseResponse.model_validate(tc).model_dump(mode="json") for tc in result.scalars().all()]
+    end = offset + len(cases) - 1
+    headers = {"Accept-Ranges": "cases", "Content-Range": f"cases {offset}-{end}/{total}" if cases else f"cases */{total}"}
+    partial = bool(requested) or offset > 0 or end < total - 1
+    return FastJSONResponse(cases, status_code=206 if partial and cases else 200, headers=headers)
+
+@router.get("/{problem_id}/testcases/export")
+async def export_test_cases(problem_id: int, clerk_id: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    """Admin: every test case as NDJSON (one TestCaseResponse per line), streamed in id order."""
+    await require_admin(db, clerk_id)
+
+    async def lines():
+        last_id = 0
+        # The request-scoped session may be closed while streaming, so page with our own
+        async with SessionLocal() as session:
+            while True:
+                result = await session.execute(
+                    select(TestCase)
+                    .where(TestCase.problem_id == problem_id, TestCase.id > last_id)
+                    .order_by(TestCase.id)
+                    .limit(EXPORT_CHUNK)
+                )
+                chunk = result.scalars().all()
+                if not chunk:
+                    return
+                last_id = chunk[-1].id
+                yield "".join(TestCaseResponse.model_validate(tc).model_dump_json() + "\n" for tc in chunk)
+                session.expunge_all()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 @router.put("/{problem_id}", response_model=ProblemResponse)
 async def update_problem(problem_id: int, problem_data: ProblemCreate, db: AsyncSession = Depends(get_db)):
     # 1. Fetch Existing Problem
-    result = await db.execute(select(Problem).options(selectinload(Problem.test_cases)).where(Problem.id == problem_id))
+    result = await db.execute(
+        select(Problem).options(selectinload(Problem.test_cases), selectinload(Problem.tags)).where(Problem.id == problem_id)
+    )
     db_problem = result.scalars().first()
     
     if not db_problem:
         raise HTTPException(status_code=404, detail="Problem not found")
         
     # 2. Update Basic Fields
+    old_slug = db_problem.slug
     db_problem.title = problem_data.title
     db_problem.slug = problem_data.slug
     db_problem.description = problem_data.description
@@ -92,6 +268,9 @@ async def update_problem(problem_id: int, problem_data: ProblemCreate, db: Async
     db_problem.constraints = problem_data.constraints
     db_problem.editorial = problem_data.editorial
     db_problem.concepts = problem_data.concepts
+    if db_problem.render_hash != markdown_render.render_hash(db_problem.description, db_problem.editorial):
+        await markdown_render.render_problem(db_problem)
+    await search.sync_concepts(db, db_problem, problem_data.concepts)
     
     # 3. Update Test Cases (Strategy: Delete All & Re-create)
     # This is simpler than diffing.
@@ -108,6 +287,11 @@ async def update_problem(problem_id: int, problem_data: ProblemCreate, db: Async
         db.add(new_tc)
         
     await db.commit()
+    note_write(write_key("problem", problem_id), write_key("slug", old_slug), write_key("slug", db_problem.slug))
+    problem_payloads.clear()
+    if rejudge.REJUDGE_ON_UPDATE:
+        # Re-checks Accepted submissions against new/changed cases only (a no-op when none changed)
+        rejudge.schedule(problem_id)
     
     # 4. Refresh & Return
     result = await db.execute(
@@ -115,3 +299,75 @@ async def update_problem(problem_id: int, problem_data: ProblemCreate, db: Async
     )
     final_problem = result.scalars().first()
     return final_problem
+
+@router.post(
+    "/{problem_id}/testcases/generate",
+    response_model=TestCaseGenerationResponse,
+    responses={202: {"model": TestCaseGenerationJob}},
+)
+async def generate_test_cases(
+    problem_id: int,
+    request: TestCaseGenerationRequest,
+    clerk_id: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Admin: generate inputs with a generator script, compute expected outputs with a
+    reference solution (Python) and bulk-insert the new, deduplicated test cases.
+    Both scripts run in the executor sandbox. More than TESTGEN_SYNC_MAX_CASES cases
+    run as a background job: 202 with the job, polled at .../generate/{job_id}.
+    """
+    await require_admin(db, clerk_id)
+    result = await db.execute(select(Problem.id).where(Problem.id == problem_id))
+    if result.scalar() is None:
+        raise HTTPException(status_code=404, detail="Problem not found")
+    if request.count > testgen.MAX_CASES:
+        raise HTTPException(status_code=400, detail=f"At most {testgen.MAX_CASES} test cases per generation run")
+
+    options = dict(
+        generator_code=request.generator_code,
+        reference_code=request.reference_code,
+        count=request.count,
+        seed=request.seed,
+        is_hidden=request.is_hidden,
+        batch_size=request.batch_size,
+    )
+    if request.count > testgen.SYNC_MAX_CASES:
+        await db.close()  # Nothing more to read; the job uses its own session
+        job = testgen.start_job(problem_id, lambda summary: cases_generated(problem_id, summary), **options)
+        return FastJSONResponse(TestCaseGenerationJob(**job).model_dump(mode="json"), status_code=202)
+
+    try:
+        summary = await testgen.generate_test_cases(db, problem_id, **options)
+    except ExecutorUnavailable as e:
+        raise HTTPException(status_code=503, detail=f"Execution engine is temporarily unavailable, please retry. ({str(e)})")
+    except Exception as e:
+        # Generator errors (bad script, timeout) come back as 400 with the reason
+        raise HTTPException(status_code=400, detail=f"Test case generation failed: {type(e).__name__}: {e}")
+    await cases_generated(problem_id, summary)
+    return summary
+
+async def cases_generated(problem_id: int, summary: dict):
+    problem_payloads.clear()
+    if rejudge.REJUDGE_ON_UPDATE and summary["inserted"]:
+        rejudge.schedule(problem_id)
+
+@router.get("/{problem_id}/testcases/generate/{job_id}", response_model=TestCaseGenerationJob)
+async def get_generation_job(problem_id: int, job_id: str, clerk_id: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    """Admin: status (and, once done, the summary) of a background generation run."""
+    await require_admin(db, clerk_id)
+    job = testgen.get_job(job_id)
+    if job is None or job["problem_id"] != problem_id:
+        raise HTTPException(status_code=404, detail="Generation job not found")
+    return job
+
+@router.post("/{problem_id}/rejudge", status_code=202)
+async def rejudge_problem(problem_id: int, clerk_id: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    """Admin: re-check Accepted submissions against test cases they haven't been judged on (in the background)."""
+    await require_admin(db, clerk_id)
+    result = await db.execute(select(Problem.id).where(Problem.id == problem_id))
+    if result.scalar() is None:
+        raise HTTPException(status_code=404, detail="Problem not found")
+    already_running = rejudge.is_running(problem_id)
+    rejudge.schedule(problem_id)
+    return {"problem_id": problem_id, "scheduled": True, "already_running": already_running}
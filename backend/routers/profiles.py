@@ -0,0 +1,60 @@
+import asyncio
+import json
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from backend import profiling
+
+router = APIRouter(
+    prefix="/admin/profiles",
+    tags=["admin"],
+)
+
+def require_token(token: Optional[str]):
+    # Same token that triggers profiling; without PROFILE_TOKEN the endpoints are off
+    if not profiling.PROFILE_TOKEN or token != profiling.PROFILE_TOKEN:
+        raise HTTPException(status_code=403, detail="Profile access requires X-Profile-Token")
+
+def _read_summaries(limit: int) -> list:
+    if not os.path.isdir(profiling.PROFILE_DIR):
+        return []
+    names = sorted((n for n in os.listdir(profiling.PROFILE_DIR) if n.endswith(".json")), reverse=True)[:limit]
+    summaries = []
+    for name in names:
+        try:
+            with open(os.path.join(profiling.PROFILE_DIR, name)) as f:
+                profile = json.load(f)
+        except FileNotFoundError:
+            continue  # Rotated out since the listing
+        profile.pop("stacks", None)
+        summaries.append(profile)
+    return summaries
+
+def _read_profile(path: str) -> Optional[dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+@router.get("")
+async def list_profiles(limit: int = 50, x_profile_token: Optional[str] = Header(None)):
+    """Newest first: id, method, path, status and timings (no stacks)."""
+    require_token(x_profile_token)
+    # Disk reads off the event loop, like the middleware's writes
+    return await asyncio.to_thread(_read_summaries, limit)
+
+@router.get("/{profile_id}")
+async def get_profile(profile_id: str, format: str = "json", x_profile_token: Optional[str] = Header(None)):
+    """One profile; ?format=folded returns just the collapsed stacks for flamegraph tools."""
+    require_token(x_profile_token)
+    path = os.path.join(profiling.PROFILE_DIR, f"{os.path.basename(profile_id)}.json")
+    profile = await asyncio.to_thread(_read_profile, path)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "folded":
+        return PlainTextResponse("".join(f"{stack} {count}\n" for stack, count in profile["stacks"].items()))
+    return profile
@@ -1,166 +1,255 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
-import httpx
-import ast
+from datetime import datetime
+import json
+import logging
 
-from backend.database import get_db
+from backend.database import get_db, get_read_db, SessionLocal, note_write, write_key
 from backend.models.submission import Submission
 from backend.models.problem import Problem
 from backend.models.user import User
 from backend.schemas import SubmissionCreate, SubmissionResponse
-from backend.routers.execution import PISTON_API_URL, get_piston_language_name
+from backend.executor import ExecutorUnavailable
+from backend.judge import build_driver, judge, Verdict
+from backend import percentiles
+from backend import user_stats
+from backend import blobs
+from backend import idempotency
+from backend import contests
+from backend import rejudge
+from backend import logs
 
 router = APIRouter(
     prefix="/submissions",
     tags=["submissions"],
 )
+logger = logging.getLogger(__name__)
+
+async def load_problem(db: AsyncSession, problem_id: int) -> Problem:
+    result = await db.execute(
+        select(Problem).options(selectinload(Problem.test_cases)).where(Problem.id == problem_id)
+    )
+    problem = result.scalars().first()
+    if not problem:
+        raise HTTPException(status_code=404, detail="Problem not found")
+    return problem
+
+async def save_submission(db: AsyncSession, submission: SubmissionCreate, problem: Problem, verdict: Verdict) -> Submission:
+    # 1. Handle User Linking (Sync-on-Action)
+    user_id = None
+    username = None
+    if submission.clerk_id:
+        # Check if user exists
+        result_user = await db.execute(select(User).where(User.clerk_id == submission.clerk_id))
+        db_user = result_user.scalars().first()
+        
+        if not db_user:
+            # Create new user on the fly
+            db_user = User(
+                clerk_id=submission.clerk_id,
+                email=submission.email or "placeholder@example.com", # Fallback to avoid unique constraint if empty
+                username=submission.username or "Anonymous"
+            )
+            db.add(db_user)
+            try:
+                await db.commit()
+                await db.refresh(db_user)
+            except Exception as user_e:
+                await db.rollback()
+                # Try to fetch again in case race condition
+                result_user = await db.execute(select(User).where(User.clerk_id == submission.clerk_id))
+                db_user = result_user.scalars().first()
+        
+        if db_user:
+            user_id = db_user.id
+            username = db_user.username
+
+    # 2. User Stats (before the new row exists, so the first-solve check doesn't see it)
+    if user_id:
+        await user_stats.record_submission(db, user_id, problem, verdict.status)
+
+    # Contest standings (same transaction; the in-memory board moves after the commit)
+    contest_update = None
+    if user_id and submission.contest_id:
+        contest_update = await contests.record_submission(
+            db, submission.contest_id, user_id, username, problem.id, verdict.status
+        )
+
+    # 3. Create Submission Record (code/output go to deduplicated, compressed blobs)
+    code_hash = await blobs.put(db, submission.code)
+    output_hash = await blobs.put(db, verdict.output)
+    new_submission = Submission(
+        problem_id=submission.problem_id,
+        user_id=user_id,
+        code_hash=code_hash,
+        language=submission.language,
+        status=verdict.status,
+        output_hash=output_hash,
+        runtime_ms=verdict.runtime_ms,
+        memory_kb=verdict.memory_kb,
+    )
+    db.add(new_submission)
+
+    # 4. Runtime Distribution (same transaction as the submission)
+    accepted = verdict.status == "Accepted"
+    if accepted:
+        # What it passed, so a later rejudge only runs cases added or changed after this
+        new_submission.judged_set_hash = await rejudge.record_case_set(db, problem.id, problem.test_cases)
+        await percentiles.record_accepted(db, submission.problem_id, submission.language, verdict.runtime_ms, verdict.memory_kb)
+
+    await db.commit()
+    if submission.clerk_id:
+        note_write(write_key("user", submission.clerk_id))
+    await db.refresh(new_submission)
+    if accepted:
+        percentiles.apply_accepted(submission.problem_id, submission.language, verdict.runtime_ms, verdict.memory_kb)
+    if contest_update:
+        contests.apply_update(contest_update)
+    return new_submission
+
+async def to_response(db: AsyncSession, saved: Submission) -> SubmissionResponse:
+    response = SubmissionResponse.model_validate(saved)
+    if saved.status == "Accepted":
+        response.runtime_percentile, response.memory_percentile = await percentiles.submission_percentiles(
+            db, saved.problem_id, saved.language, saved.runtime_ms, saved.memory_kb
+        )
+    return response
 
 @router.post("/", response_model=SubmissionResponse)
-async def submit_solution(submission: SubmissionCreate, db: AsyncSession = Depends(get_db)):
+async def submit_solution(
+    submission: SubmissionCreate,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None),
+):
+    logs.bind(user=submission.clerk_id, problem_id=submission.problem_id, language=submission.language)
+    # A retried POST with the same Idempotency-Key gets the first verdict instead of a second judging
+    return await idempotency.idempotent(
+        idempotency_key, "submit", (submission,), response, lambda: judge_and_save(submission, db)
+    )
+
+async def judge_and_save(submission: SubmissionCreate, db: AsyncSession) -> SubmissionResponse:
     try:
         # 1. Fetch Problem and Test Cases
-        result = await db.execute(
-            select(Problem).options(selectinload(Problem.test_cases)).where(Problem.id == submission.problem_id)
-        )
-        problem = result.scalars().first()
-        if not problem:
-            raise HTTPException(status_code=404, detail="Problem not found")
+        problem = await load_problem(db, submission.problem_id)
 
         # 2. Prepare Driver Code
-        from backend.drivers import get_python_driver, get_java_driver
-        
         language = submission.language.lower()
-        full_code = ""
-
-        if language == "python":
-            full_code = get_python_driver(submission.code)
-        elif language == "java":
-            full_code = get_java_driver(submission.code)
-        else:
-            raise HTTPException(status_code=400, detail="Only Python and Java are supported currently.")
-
-        final_status = "Accepted"
-        final_output = ""
-
-        async with httpx.AsyncClient() as client:
-            for tc in problem.test_cases:
-                payload = {
-                    "language": language,
-                    "version": "*",
-                    "files": [{"content": full_code}],
-                    "stdin": tc.input_data,
-                }
-
-                try:
-                    res = await client.post(PISTON_API_URL, json=payload)
-                    res.raise_for_status()
-                    data = res.json()
-                    
-                    run_stage = data.get("run", {})
-                    compile_stage = data.get("compile", {})
-                    
-                    run_code = run_stage.get("code", 0)
-                    compile_code = compile_stage.get("code", 0)
-                    
-                    # Check for failure exit codes
-                    if compile_code != 0:
-                        final_status = "Compilation Error"
-                        final_output = compile_stage.get("stderr", "") or "Unknown compilation error"
-                        break
-                    
-                    if run_code != 0:
-                        final_status = "Runtime Error"
-                        final_output = run_stage.get("stderr", "") or "Unknown runtime error"
-                        break
-                    
-                    # If success (codes are 0), we ignore stderr (warnings)
-                    stdout = run_stage.get("stdout", "").strip()
-                    
-                    # Compare Output
-                    # Normalize newlines and whitespace
-                    expected = tc.expected_output.strip()
-                    if stdout != expected:
-                        final_status = "Wrong Answer"
-                        final_output = f"Input: {tc.input_data}\nExpected: {expected}\nGot: {stdout}"
-                        break
-                        
-                except Exception as e:
-                    final_status = "Error"
-                    final_output = f"Execution Error: {str(e)}"
-                    break
-
-        # 3. Handle User Linking (Sync-on-Action)
-        user_id = None
-        if submission.clerk_id:
-            # Check if user exists
-            result_user = await db.execute(select(User).where(User.clerk_id == submission.clerk_id))
-            db_user = result_user.scalars().first()
-            
-            if not db_user:
-                # Create new user on the fly
-                db_user = User(
-                    clerk_id=submission.clerk_id,
-                    email=submission.email or "placeholder@example.com", # Fallback to avoid unique constraint if empty
-                    username=submission.username or "Anonymous"
-                )
-                db.add(db_user)
-                try:
-                    await db.commit()
-                    await db.refresh(db_user)
-                except Exception as user_e:
-                    await db.rollback()
-                    # Try to fetch again in case race condition
-                    result_user = await db.execute(select(User).where(User.clerk_id == submission.clerk_id))
-                    db_user = result_user.scalars().first()
-            
-            if db_user:
-                user_id = db_user.id
-
-        # 4. Create Submission Record
-        new_submission = Submission(
-            problem_id=submission.problem_id,
-            user_id=user_id,
-            code=submission.code,
-            language=submission.language,
-            status=final_status,
-            output=final_output
-        )
-        db.add(new_submission)
-        await db.commit()
-        await db.refresh(new_submission)
+        full_code = build_driver(language, submission.code)
+
+        # 3. Judge (stops at the first failing case)
+        verdict = Verdict()
+        try:
+            async for case in judge(language, full_code, problem.test_cases):
+                verdict.add(case)
+        except ExecutorUnavailable as e:
+            # Executor outage / rate limit is not the user's fault - don't record a verdict
+            raise HTTPException(status_code=503, detail=f"Execution engine is temporarily unavailable, please retry. ({str(e)})")
 
-        return new_submission
+        # 4. Link User & Persist
+        saved = await save_submission(db, submission, problem, verdict)
+        logger.info("Submission judged", extra={"status": verdict.status, "runtime_ms": verdict.runtime_ms})
+        return await to_response(db, saved)
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Submission Endpoint Error: {e}")
+        logger.exception("Submission failed")
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/stream")
+async def submit_solution_stream(submission: SubmissionCreate, request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Same judging flow as POST /submissions/, streamed as Server-Sent Events:
+      event: start   {"total": N}
+      event: case    {"index", "total", "status", "time_ms", "memory_kb"}   (one per finished case)
+      event: result  SubmissionResponse                                      (after the record is saved)
+      event: error   {"detail"}                                              (executor unavailable)
+    If the client disconnects, judging stops before the next case and nothing is recorded.
+    """
+    logs.bind(user=submission.clerk_id, problem_id=submission.problem_id, language=submission.language)
+    # Validate up front so bad requests still get a normal 4xx instead of an event stream
+    problem = await load_problem(db, submission.problem_id)
+    language = submission.language.lower()
+    full_code = build_driver(language, submission.code)
+    test_cases = list(problem.test_cases)
+    total = len(test_cases)
+    # Done with the request's session: judging can take a while, and the result is saved with our own
+    await db.close()
+
+    async def events():
+        verdict = Verdict()
+        yield sse_event("start", {"total": total})
+
+        try:
+            async for case in judge(language, full_code, test_cases):
+                # Hidden cases: status and timing only, never the input/expected data
+                yield sse_event("case", {
+                    "index": case.index,
+                    "total": total,
+                    "status": case.status,
+                    "time_ms": case.time_ms,
+                    "memory_kb": case.memory_kb,
+                })
+                verdict.add(case)
+                if case.passed and await request.is_disconnected():
+                    # Nobody is listening - save the executor the remaining cases
+                    return
+        except ExecutorUnavailable as e:
+            yield sse_event("error", {"detail": f"Execution engine is temporarily unavailable, please retry. ({str(e)})"})
+            return
+
+        # Persist with a fresh session (the request's was closed before streaming)
+        try:
+            async with SessionLocal() as session:
+                saved = await save_submission(session, submission, problem, verdict)
+                response = await to_response(session, saved)
+            yield sse_event("result", response.model_dump(mode="json"))
+        except Exception as e:
+            logger.exception("Streamed submission failed")
+            yield sse_event("error", {"detail": f"Internal Server Error: {str(e)}"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.get("/", response_model=List[SubmissionResponse])
 async def get_submissions(
     problem_id: int, 
     clerk_id: Optional[str] = None, 
-    db: AsyncSession = Depends(get_db)
+    before: Optional[datetime] = None,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_read_db)
 ):
     query = select(Submission).where(Submission.problem_id == problem_id)
     
     if clerk_id:
         # Join with User table to filter by clerk_id
         query = query.join(User).where(User.clerk_id == clerk_id)
+
+    # Keyset pagination on the partition key: pass the last row's timestamp to get the next page.
+    # Bounded by time, Postgres only scans the partitions that can hold the page.
+    if before:
+        query = query.where(Submission.timestamp < before)
     
     # Order by newest first
-    query = query.order_by(Submission.timestamp.desc())
+    query = query.order_by(Submission.timestamp.desc()).limit(min(limit, 500))
     
     result = await db.execute(query)
     submissions = result.scalars().all()
     return submissions
 
 @router.get("/solutions/{problem_id}")
-async def get_solutions(problem_id: int, db: AsyncSession = Depends(get_db)):
+async def get_solutions(problem_id: int, db: AsyncSession = Depends(get_read_db)):
     # 1. Fetch Official Solution (Admin, Accepted)
     # We need to import UserRole properly. It's an Enum.
     # Avoiding circular imports or complex enum handling if possible, but let's try direct import.
@@ -216,3 +305,19 @@ async def get_solutions(problem_id: int, db: AsyncSession = Depends(get_db)):
         "official": official_data,
         "community": community_data
     }
+
+@router.get("/distribution/{problem_id}")
+async def get_distribution(problem_id: int, language: str = "python", db: AsyncSession = Depends(get_read_db)):
+    """Runtime and memory histograms of Accepted submissions for one problem and language."""
+    response = {"problem_id": problem_id, "language": language.lower()}
+    for metric, unit in (("runtime", "ms"), ("memory", "kb")):
+        dist = await percentiles.get_distribution(db, problem_id, language, metric)
+        response[metric] = {
+            "unit": unit,
+            "total": dist.tree.total,
+            "p50": dist.quantile(0.5),
+            "p90": dist.quantile(0.9),
+            "p99": dist.quantile(0.99),
+            "buckets": dist.histogram(),
+        }
+    return response
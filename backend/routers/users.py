@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+import json
+
+from backend.database import get_read_db
+from backend.models.user import User
+from backend.models.user_stats import UserStats
+from backend.schemas import UserStatsResponse
+from backend.user_stats import current_streak
+
+router = APIRouter(
+    prefix="/users",
+    tags=["users"],
+)
+
+@router.get("/{clerk_id}/stats", response_model=UserStatsResponse)
+async def get_user_stats(clerk_id: str, db: AsyncSession = Depends(get_read_db)):
+    # Single indexed lookup; counters are maintained when submissions are judged
+    result = await db.execute(
+        select(User.username, UserStats)
+        .join(UserStats, UserStats.user_id == User.id, isouter=True)
+        .where(User.clerk_id == clerk_id)
+    )
+    row = result.first()
+    if not row:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    username, stats = row
+    if stats is None:
+        # Known user who hasn't been judged yet
+        return UserStatsResponse(username=username)
+
+    return UserStatsResponse(
+        username=username,
+        solved_easy=stats.solved_easy,
+        solved_medium=stats.solved_medium,
+        solved_hard=stats.solved_hard,
+        solved_total=stats.solved_total,
+        attempts=stats.attempts,
+        accepted=stats.accepted,
+        acceptance_rate=round(100.0 * stats.accepted / stats.attempts, 2) if stats.attempts else 0.0,
+        concept_counts=json.loads(stats.concept_counts or "{}"),
+        current_streak=current_streak(stats),
+        longest_streak=stats.longest_streak,
+        last_solved_date=stats.last_solved_date,
+    )
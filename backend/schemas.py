@@ -31,15 +31,62 @@ class ProblemBase(BaseModel):
 class ProblemCreate(ProblemBase):
     test_cases: List[TestCaseCreate] = []
 
+class ProblemSummary(ProblemBase):
+    id: int
+    date_posted: date
+
+    class Config:
+        from_attributes = True
+
 class ProblemResponse(ProblemBase):
+    # Full view (admin create/update responses), hidden test cases included
     id: int
     date_posted: date
-    # We might not want to return test cases in the list view, but ok for detail
     test_cases: List[TestCaseResponse] = []
 
     class Config:
         from_attributes = True
 
+class TestCasePreview(BaseModel):
+    id: int
+    input_data: str
+    expected_output: str
+    truncated: bool = False # True when input/expected were cut at the preview size
+
+class ProblemPublicResponse(ProblemBase):
+    # What GET /problems and GET /problems/{slug} return: visible samples only
+    id: int
+    date_posted: date
+    samples: List[TestCasePreview] = []
+    test_case_count: int = 0 # Visible + hidden
+    # Pre-rendered, sanitized HTML (GET /problems/{slug} only; None -> render the markdown client-side)
+    description_html: Optional[str] = None
+    editorial_html: Optional[str] = None
+    render_hash: Optional[str] = None
+
+class TestCaseGenerationRequest(BaseModel):
+    generator_code: str # Python defining generate(rng, index) -> str | tuple of args
+    reference_code: str # Python Solution class, run through the batch driver
+    count: int = 1000
+    seed: int = 0
+    is_hidden: bool = True
+    batch_size: int = 100 # Inputs per executor call
+
+class TestCaseGenerationResponse(BaseModel):
+    generated: int
+    duplicates: int
+    failed: int
+    inserted: int
+    errors: List[str] = []
+
+class TestCaseGenerationJob(BaseModel):
+    # Runs above TESTGEN_SYNC_MAX_CASES: 202 with the job, then GET .../testcases/generate/{job_id}
+    job_id: str
+    problem_id: int
+    status: str # running, done, failed
+    result: Optional[TestCaseGenerationResponse] = None
+    error: Optional[str] = None
+
 class ExecutionRequest(BaseModel):
     source_code: str
     language_id: int # Piston language ID (e.g., 71 for Python, 62 for Java)
@@ -52,6 +99,24 @@ class ExecutionResponse(BaseModel):
     message: Optional[str] = ""
     status: Optional[str] = ""
 
+class RunTestRequest(ExecutionRequest):
+    # When given, run these inputs instead of the problem's public test cases
+    custom_inputs: Optional[List[str]] = None
+
+class CaseRunResult(BaseModel):
+    index: int
+    input: Optional[str] = None # None for hidden fallback cases
+    stdout: str = ""
+    stderr: str = ""
+    expected_output: Optional[str] = None # None for custom inputs and hidden cases
+    passed: Optional[bool] = None # None when there is nothing to compare against
+    status: str
+    time_ms: Optional[float] = None
+
+class RunTestResponse(ExecutionResponse):
+    # Top-level fields mirror the first failing case (or the first case) for older clients
+    cases: List[CaseRunResult] = []
+
 from datetime import datetime
 class SubmissionCreate(BaseModel):
     problem_id: int
@@ -60,6 +125,7 @@ class SubmissionCreate(BaseModel):
     clerk_id: Optional[str] = None
     email: Optional[str] = None
     username: Optional[str] = None
+    contest_id: Optional[int] = None # Counts towards that contest's standings while it is running
 
 class SubmissionResponse(BaseModel):
     id: int
@@ -69,6 +135,61 @@ class SubmissionResponse(BaseModel):
     language: str
     code: str
     username: Optional[str] = None
+    runtime_ms: Optional[float] = None
+    memory_kb: Optional[float] = None
+    # "Faster than X%" / "uses less memory than X%" of Accepted submissions (same problem & language)
+    runtime_percentile: Optional[float] = None
+    memory_percentile: Optional[float] = None
     
     class Config:
         from_attributes = True
+
+class UserStatsResponse(BaseModel):
+    username: Optional[str] = None
+    solved_easy: int = 0
+    solved_medium: int = 0
+    solved_hard: int = 0
+    solved_total: int = 0
+    attempts: int = 0
+    accepted: int = 0
+    acceptance_rate: float = 0.0 # accepted / attempts, in percent
+    concept_counts: dict = {} # concept slug -> distinct problems solved
+    current_streak: int = 0
+    longest_streak: int = 0
+    last_solved_date: Optional[date] = None
+
+class ContestCreate(BaseModel):
+    slug: str
+    title: str
+    description: Optional[str] = None
+    start_time: datetime
+    end_time: datetime
+    penalty_minutes: int = 20
+    problem_ids: List[int] # In display order
+
+class ContestResponse(BaseModel):
+    id: int
+    slug: str
+    title: str
+    description: Optional[str] = None
+    start_time: datetime
+    end_time: datetime
+    penalty_minutes: int
+    problems: List[ProblemSummary] = []
+
+    class Config:
+        from_attributes = True
+
+class ContestStanding(BaseModel):
+    rank: int
+    user_id: int
+    username: Optional[str] = None
+    solved: int
+    penalty: int
+    problems: dict = {} # problem_id -> {"attempts", "solved_at"}
+
+class ContestStandingsResponse(BaseModel):
+    contest_id: int
+    total: int
+    offset: int
+    standings: List[ContestStanding]
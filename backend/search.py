@@ -0,0 +1,174 @@
+import os
+import re
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import func, literal_column
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from backend.models.concept import Concept, problem_concepts
+from backend.models.problem import Problem
+
+# Concept tagging and problem search.
+#
+# Postgres: full-text search over a weighted tsvector of title (A), concepts (B) and
+# description (C). SEARCH_VECTOR_SQL must stay identical to the expression behind the
+# ix_problems_search GIN index (see the add_concept_tags migration) or the index is skipped.
+#
+# Other dialects (SQLite for local/bench runs): an in-memory inverted index with the same
+# field weights, rebuilt on invalidate() (problem create/update) or after INDEX_TTL seconds.
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(problems.title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(problems.concepts, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(problems.description, '')), 'C')"
+)
+
+INDEX_TTL = float(os.getenv("SEARCH_INDEX_TTL", "60"))
+FIELD_WEIGHTS = {"title": 3.0, "concepts": 2.0, "description": 1.0}
+STOPWORDS = {"a", "an", "and", "the", "of", "in", "on", "to", "for", "is", "with", "or", "by", "at", "be", "it"}
+
+
+def parse_concepts(raw: Optional[str]) -> List[str]:
+    """'Arrays, hash map,arrays' -> ['Arrays', 'hash map'] (deduplicated case-insensitively, order kept)."""
+    names, seen = [], set()
+    for part in (raw or "").split(","):
+        name = part.strip()
+        if name and concept_slug(name) not in seen:
+            seen.add(concept_slug(name))
+            names.append(name)
+    return names
+
+
+def concept_slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+async def sync_concepts(db: AsyncSession, problem: Problem, raw: Optional[str]):
+    """Points problem.tags at the Concept rows for `raw`, creating missing concepts. Caller commits."""
+    names = parse_concepts(raw)
+    slugs = [concept_slug(n) for n in names]
+    existing = {}
+    if slugs:
+        # No autoflush: the problem may still be pending and its tags must be loaded (or new) before assignment
+        with db.no_autoflush:
+            result = await db.execute(select(Concept).where(Concept.slug.in_(slugs)))
+        existing = {c.slug: c for c in result.scalars().all()}
+    tags = []
+    for name, slug in zip(names, slugs):
+        concept = existing.get(slug)
+        if concept is None:
+            concept = Concept(name=name, slug=slug)
+            db.add(concept)
+            existing[slug] = concept
+        tags.append(concept)
+    problem.tags = tags
+    invalidate()
+
+
+def _stem(token: str) -> str:
+    # Crude plural folding so "arrays" matches "array" (Postgres gets this from the english config)
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return [_stem(t) for t in re.findall(r"[a-z0-9]+", (text or "").lower()) if t not in STOPWORDS]
+
+
+class InvertedIndex:
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, float]] = defaultdict(dict)  # token -> {problem_id: score}
+        self.built_at = time.monotonic()
+
+    def add(self, problem_id: int, fields: Dict[str, Optional[str]]):
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for token in tokenize(text):
+                bucket = self.postings[token]
+                bucket[problem_id] = bucket.get(problem_id, 0.0) + weight
+
+    def search(self, query: str) -> List[int]:
+        """Problem ids containing every query token, best score first."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # Intersect starting from the rarest token
+        ordered = sorted(tokens, key=lambda t: len(self.postings.get(t, ())))
+        candidates: Set[int] = set(self.postings.get(ordered[0], {}))
+        for token in ordered[1:]:
+            candidates &= self.postings.get(token, {}).keys()
+            if not candidates:
+                return []
+        scores = {pid: sum(self.postings[t][pid] for t in tokens) for pid in candidates}
+        return sorted(candidates, key=lambda pid: (-scores[pid], pid))
+
+
+_index: Optional[InvertedIndex] = None
+
+
+def invalidate():
+    global _index
+    _index = None
+
+
+async def _get_index(db: AsyncSession) -> InvertedIndex:
+    global _index
+    if _index is None or time.monotonic() - _index.built_at > INDEX_TTL:
+        result = await db.execute(select(Problem.id, Problem.title, Problem.description, Problem.concepts))
+        index = InvertedIndex()
+        for pid, title, description, concepts in result.all():
+            index.add(pid, {"title": title, "description": description, "concepts": concepts})
+        _index = index
+    return _index
+
+
+def filter_by_concept(stmt, concept: str):
+    """Restricts a select(Problem ...) to problems tagged with the concept (slug or display name)."""
+    return (
+        stmt.join(problem_concepts, problem_concepts.c.problem_id == Problem.id)
+        .join(Concept, Concept.id == problem_concepts.c.concept_id)
+        .where(Concept.slug == concept_slug(concept))
+    )
+
+
+async def search_problems(db: AsyncSession, q: Optional[str], concept: Optional[str], difficulty: Optional[str],
+                          skip: int, limit: int) -> List[Problem]:
+    stmt = select(Problem)
+    if concept:
+        stmt = filter_by_concept(stmt, concept)
+    if difficulty:
+        stmt = stmt.where(Problem.difficulty == difficulty)
+
+    if not q or not q.strip():
+        result = await db.execute(stmt.order_by(Problem.id).offset(skip).limit(limit))
+        return list(result.scalars().all())
+
+    if db.bind.dialect.name == "postgresql":
+        vector = literal_column(SEARCH_VECTOR_SQL)
+        query = func.websearch_to_tsquery("english", q)
+        stmt = stmt.where(vector.op("@@")(query)).order_by(func.ts_rank(vector, query).desc(), Problem.id)
+        result = await db.execute(stmt.offset(skip).limit(limit))
+        return list(result.scalars().all())
+
+    # Fallback: rank with the in-memory index, then apply the SQL filters to the ranked ids
+    ranked = (await _get_index(db)).search(q)
+    if not ranked:
+        return []
+    result = await db.execute(stmt.where(Problem.id.in_(ranked)))
+    by_id = {p.id: p for p in result.scalars().all()}
+    return [by_id[pid] for pid in ranked if pid in by_id][skip:skip + limit]
+
+
+async def list_concepts(db: AsyncSession) -> List[dict]:
+    stmt = (
+        select(Concept.name, Concept.slug, func.count(problem_concepts.c.problem_id))
+        .join(problem_concepts, problem_concepts.c.concept_id == Concept.id, isouter=True)
+        .group_by(Concept.id, Concept.name, Concept.slug)
+        .order_by(Concept.name)
+    )
+    result = await db.execute(stmt)
+    return [{"name": name, "slug": slug, "problem_count": count} for name, slug, count in result.all()]
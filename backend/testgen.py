@@ -0,0 +1,170 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, List, Optional
+
+# Bulk test case generation: generator script -> inputs, reference solution -> expected outputs.
+#
+# The generator is admin-supplied Python defining
+#
+#     def generate(rng: random.Random, index: int) -> str | tuple
+#
+# returning either the raw input text or a tuple of arguments (one line each).
+# Inputs are produced in the executor sandbox, BATCH_SIZE indexes per run (each index seeded on its
+# own, so runs are reproducible), deduplicated by hash against each other and the problem's
+# existing cases, then the reference solution computes every expected output through the batch
+# Python driver (one executor call per BATCH_SIZE inputs) and the results are bulk-inserted.
+# Neither script ever runs on the API host.
+#
+# Runs of more than SYNC_MAX_CASES cases are background jobs (start_job / get_job) instead of
+# holding the request open; a process keeps its last MAX_JOBS jobs.
+
+MAX_CASES = int(os.getenv("TESTGEN_MAX_CASES", "10000"))
+BATCH_SIZE = int(os.getenv("TESTGEN_BATCH_SIZE", "100"))
+GENERATE_TIMEOUT = float(os.getenv("TESTGEN_GENERATE_TIMEOUT", "120"))
+SYNC_MAX_CASES = int(os.getenv("TESTGEN_SYNC_MAX_CASES", "500"))
+MAX_JOBS = 100
+INSERT_CHUNK = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def input_hash(input_data: str) -> str:
+    return hashlib.sha256(input_data.strip().encode()).hexdigest()
+
+
+async def run_generator_batch(generator_code: str, seed: int, start: int, stop: int) -> List[str]:
+    """Inputs start..stop-1 from the generator, produced in one sandboxed execution."""
+    from backend.drivers import get_python_generator_driver, GENERATOR_RESULT_MARKER
+    from backend.executor import executor
+    from backend import languages
+
+    request = json.dumps({"seed": seed, "start": start, "stop": stop})
+    data = await executor.execute(languages.get("python").payload(get_python_generator_driver(generator_code), request))
+    run_stage = data.get("run", {})
+    stdout = run_stage.get("stdout", "")
+    if GENERATOR_RESULT_MARKER not in stdout:
+        error = run_stage.get("stderr") or run_stage.get("signal") or "Generator produced no inputs"
+        raise ValueError(f"Generator failed on indexes {start}..{stop - 1}: {str(error).strip()[-500:]}")
+    return json.loads(stdout.rsplit(GENERATOR_RESULT_MARKER, 1)[1])
+
+
+async def generate_inputs(generator_code: str, count: int, seed: int = 0, batch_size: int = BATCH_SIZE) -> List[str]:
+    # Batches in parallel (the executor client paces them); cancelling on timeout is safe, nothing runs locally
+    chunks = await asyncio.wait_for(
+        asyncio.gather(*(
+            run_generator_batch(generator_code, seed, start, min(count, start + batch_size))
+            for start in range(0, count, batch_size)
+        )),
+        timeout=GENERATE_TIMEOUT,
+    )
+    return [text for part in chunks for text in part]
+
+
+async def run_reference_batch(reference_code: str, inputs: List[str]) -> List[dict]:
+    """Runs the reference solution over a batch of inputs in one execution; one {"ok", "output"|"error"} per input."""
+    from backend.drivers import get_python_batch_driver, BATCH_RESULT_MARKER
+    from backend.executor import executor
+    from backend import languages
+
+    data = await executor.execute(languages.get("python").payload(get_python_batch_driver(reference_code), json.dumps(inputs)))
+    run_stage = data.get("run", {})
+    stdout = run_stage.get("stdout", "")
+    if BATCH_RESULT_MARKER not in stdout:
+        error = run_stage.get("stderr") or data.get("compile", {}).get("stderr") or "Reference produced no results"
+        return [{"ok": False, "error": error.strip()[-500:]}] * len(inputs)
+    return json.loads(stdout.rsplit(BATCH_RESULT_MARKER, 1)[1])
+
+
+async def generate_test_cases(db, problem_id: int, generator_code: str, reference_code: str,
+                              count: int, seed: int = 0, is_hidden: bool = True,
+                              batch_size: int = BATCH_SIZE) -> dict:
+    from sqlalchemy import insert
+    from sqlalchemy.future import select
+    from backend.models.problem import TestCase
+
+    if count > MAX_CASES:
+        raise ValueError(f"At most {MAX_CASES} test cases per generation run")
+
+    # 1. Inputs (sandboxed generator runs)
+    inputs = await generate_inputs(generator_code, count, seed, batch_size)
+
+    # 2. Deduplicate against each other and against what the problem already has
+    result = await db.execute(select(TestCase.input_data).where(TestCase.problem_id == problem_id))
+    seen = {input_hash(text) for text in result.scalars().all()}
+    await db.rollback()  # Hand the connection back to the pool while the executor runs
+    unique = []
+    for text in inputs:
+        digest = input_hash(text)
+        if digest not in seen:
+            seen.add(digest)
+            unique.append(text)
+
+    # 3. Expected outputs via the reference solution, batches in parallel (the executor client paces them)
+    batches = [unique[i:i + batch_size] for i in range(0, len(unique), batch_size)]
+    batch_results = await asyncio.gather(*(run_reference_batch(reference_code, batch) for batch in batches))
+
+    rows, errors = [], []
+    for batch, results in zip(batches, batch_results):
+        for text, res in zip(batch, results):
+            if res.get("ok"):
+                rows.append({
+                    "problem_id": problem_id,
+                    "input_data": text,
+                    "expected_output": res["output"],
+                    "is_hidden": is_hidden,
+                })
+            elif len(errors) < 5:
+                errors.append(f"Input {text[:100]!r}: {res.get('error')}")
+
+    # 4. Bulk insert
+    for i in range(0, len(rows), INSERT_CHUNK):
+        await db.execute(insert(TestCase), rows[i:i + INSERT_CHUNK])
+    await db.commit()
+
+    return {
+        "generated": len(inputs),
+        "duplicates": len(inputs) - len(unique),
+        "failed": len(unique) - len(rows),
+        "inserted": len(rows),
+        "errors": errors,
+    }
+
+
+_jobs: "OrderedDict[str, dict]" = OrderedDict()
+_tasks: set = set()  # The event loop only keeps weak references to tasks
+
+
+def start_job(problem_id: int, on_done: Callable[[dict], Awaitable[None]], **kwargs) -> dict:
+    """Runs generate_test_cases in the background with its own session; poll it with get_job."""
+    job = {"job_id": uuid.uuid4().hex, "problem_id": problem_id, "status": "running", "result": None, "error": None}
+    _jobs[job["job_id"]] = job
+    while len(_jobs) > MAX_JOBS:
+        _jobs.popitem(last=False)
+    task = asyncio.create_task(_run_job(job, on_done, kwargs))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return job
+
+
+async def _run_job(job: dict, on_done: Callable[[dict], Awaitable[None]], kwargs: dict):
+    from backend.database import SessionLocal
+    from backend import logs
+
+    with logs.context(job="testgen", problem_id=job["problem_id"]):
+        try:
+            async with SessionLocal() as db:
+                job["result"] = await generate_test_cases(db, job["problem_id"], **kwargs)
+            job["status"] = "done"
+            await on_done(job["result"])
+        except Exception as e:
+            job["status"], job["error"] = "failed", f"{type(e).__name__}: {e}"
+            logger.warning("Test case generation job %s failed: %s", job["job_id"], job["error"])
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    return _jobs.get(job_id)
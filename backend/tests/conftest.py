@@ -0,0 +1,32 @@
+import asyncio
+import os
+
+import pytest
+
+# backend.database builds its engines at import time; tests needing a database use the fixture below
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Sessions on a fresh SQLite file with every table created. NullPool: tests run each step in its own asyncio.run."""
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import NullPool
+
+    from backend.database import Base
+    import backend.models.contest  # noqa: F401  Register every table
+    import backend.models.judged_case_set  # noqa: F401
+    import backend.models.runtime_histogram  # noqa: F401
+    import backend.models.submission  # noqa: F401
+    import backend.models.user  # noqa: F401
+    import backend.models.user_stats  # noqa: F401
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}", poolclass=NullPool)
+
+    async def create():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create())
+    return sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
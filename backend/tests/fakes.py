@@ -0,0 +1,19 @@
+from backend.executor import ExecutorUnavailable
+
+# Stand-ins shared by the tests
+
+
+class DoublingExecutor:
+    """Answers like the submitted solution would: stdin * 2. `fail_on` inputs get a wrong answer."""
+
+    def __init__(self, fail_on=(), unavailable=False):
+        self.fail_on, self.unavailable = set(fail_on), unavailable
+        self.inputs = []
+
+    async def execute(self, payload):
+        if self.unavailable:
+            raise ExecutorUnavailable("all endpoints down")
+        value = int(payload["stdin"])
+        self.inputs.append(value)
+        answer = -1 if value in self.fail_on else value * 2
+        return {"run": {"stdout": f"{answer}\n", "stderr": "", "code": 0, "wall_time": 10}}
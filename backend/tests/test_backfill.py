@@ -0,0 +1,95 @@
+import asyncio
+import json
+import os
+
+import pytest
+from sqlalchemy.future import select
+
+from backend import backfill
+from backend.backfill import BackfillOptions
+from backend.models.problem import Problem
+
+
+@pytest.fixture
+def problem_db(session_factory):
+    async def seed():
+        async with session_factory() as db:
+            for pid in range(1, 8):
+                db.add(Problem(id=pid, title=f"problem {pid}", slug=f"p{pid}", description=""))
+            await db.commit()
+    asyncio.run(seed())
+    return session_factory
+
+
+def run(session_factory, options, query=None, fail_after=None, seen=None):
+    async def process(session, rows):
+        if fail_after is not None and rows[0].id > fail_after:
+            raise RuntimeError("interrupted")
+        for problem in rows:
+            if seen is not None:
+                seen.append(problem.id)
+            problem.title = problem.title.upper()
+        return len(rows)
+
+    return asyncio.run(backfill.run_backfill(
+        "upper", query if query is not None else select(Problem), Problem.id, process, options,
+        session_factory=session_factory, log=lambda message: None,
+    ))
+
+
+def titles(session_factory):
+    async def go():
+        async with session_factory() as db:
+            return [p.title for p in (await db.execute(select(Problem).order_by(Problem.id))).scalars()]
+    return asyncio.run(go())
+
+
+@pytest.fixture
+def options(tmp_path):
+    return BackfillOptions(batch_size=3, checkpoint_dir=str(tmp_path / "checkpoints"))
+
+
+def test_an_interrupted_backfill_resumes_after_the_last_committed_chunk(problem_db, options):
+    with pytest.raises(RuntimeError):
+        run(problem_db, options, fail_after=3)
+    assert titles(problem_db)[:4] == ["PROBLEM 1", "PROBLEM 2", "PROBLEM 3", "problem 4"]
+    with open(backfill.checkpoint_path("upper", options)) as f:
+        assert json.load(f)["last_key"] == 3
+
+    seen = []
+    checkpoint = run(problem_db, options, seen=seen)
+    assert seen == [4, 5, 6, 7]
+    assert (checkpoint.processed, checkpoint.changed, checkpoint.last_key, checkpoint.finished) == (7, 7, 7, True)
+    assert all(title.isupper() for title in titles(problem_db))
+
+
+def test_a_finished_backfill_only_reruns_with_restart(problem_db, options):
+    run(problem_db, options)
+    seen = []
+    run(problem_db, options, seen=seen)
+    assert seen == []
+    options.restart = True
+    run(problem_db, options, seen=seen)
+    assert seen == list(range(1, 8))
+
+
+def test_dry_run_writes_nothing(problem_db, options):
+    options.dry_run = True
+    checkpoint = run(problem_db, options)
+    assert checkpoint.processed == 7
+    assert not any(title.isupper() for title in titles(problem_db))
+    assert not os.path.exists(options.checkpoint_dir)
+
+
+def test_filters_and_tuple_rows(problem_db, options):
+    keys = []
+
+    async def process(session, rows):
+        keys.extend(row[0] for row in rows)
+        return 0
+
+    query = select(Problem.id, Problem.title).where(Problem.id % 2 == 1)
+    checkpoint = asyncio.run(backfill.run_backfill("odd", query, Problem.id, process, options,
+                                                   session_factory=problem_db, log=lambda message: None))
+    assert keys == [1, 3, 5, 7]
+    assert (checkpoint.last_key, checkpoint.changed) == (7, 0)
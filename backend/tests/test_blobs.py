@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from backend import blobs
+
+
+@pytest.fixture(params=["zlib", "zstd"])
+def codec(request, monkeypatch):
+    if request.param == "zlib":
+        monkeypatch.setattr(blobs, "zstandard", None)
+    elif blobs.zstandard is None:
+        pytest.skip("zstandard not installed")
+    return request.param
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "x",
+    "class Solution:\n    def twoSum(self, nums, target):\n        return [0, 1]\n" * 50,
+    "ünïcødé ✓ " * 40,
+])
+def test_round_trip(codec, text):
+    row = blobs.blob_row(text)
+    assert row["hash"] == blobs.content_hash(text)
+    assert row["size"] == len(text.encode())
+    assert blobs.decompress(row["codec"], row["data"]) == text
+
+
+def test_repetitive_text_is_compressed(codec):
+    row = blobs.blob_row("print('hello')\n" * 200)
+    assert row["codec"] == codec
+    assert len(row["data"]) < row["size"]
+
+
+def test_small_or_incompressible_values_are_stored_raw(codec):
+    assert blobs.compress(b"short") == ("raw", b"short")
+    noise = random.Random(0).randbytes(4096)
+    assert blobs.compress(noise) == ("raw", noise)
+
+
+def test_unknown_codec_is_rejected():
+    with pytest.raises(ValueError):
+        blobs.decompress("lz4", b"")
+
+
+def test_zstd_blob_without_zstandard_fails_loudly(monkeypatch):
+    monkeypatch.setattr(blobs, "zstandard", None)
+    with pytest.raises(RuntimeError):
+        blobs.decompress("zstd", b"\x28\xb5\x2f\xfd")
@@ -0,0 +1,139 @@
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from backend import contests
+from backend.contests import Leaderboard, OrderStatisticTreap
+from backend.models.contest import Contest
+from backend.models.user import User, UserRole
+from backend.routers import contests as routes
+from backend.schemas import ContestCreate
+
+
+def test_treap_matches_a_sorted_list():
+    rng = random.Random(3)
+    treap, reference = OrderStatisticTreap(), []
+    for _ in range(2000):
+        key = rng.randrange(300)
+        if key in reference:
+            treap.remove(key)
+            reference.remove(key)
+        else:
+            treap.insert(key)
+            reference.append(key)
+            reference.sort()
+    assert len(treap) == len(reference)
+    for index, key in enumerate(reference):
+        assert treap.select(index) == key
+        assert treap.rank(key) == index
+    assert treap.rank(-1) == 0
+    assert treap.rank(10_000) == len(reference)
+    for start in (0, 5, len(reference) - 3, len(reference)):
+        assert treap.slice(start, 7) == reference[start:start + 7]
+
+
+def test_treap_select_out_of_range():
+    treap = OrderStatisticTreap()
+    treap.insert(1)
+    with pytest.raises(IndexError):
+        treap.select(1)
+
+
+def row(user_id, solved, penalty, last_solved_at=None):
+    return {"user_id": user_id, "username": f"u{user_id}", "solved": solved, "penalty": penalty,
+            "last_solved_at": last_solved_at}
+
+
+def test_leaderboard_orders_by_solved_then_penalty():
+    board = Leaderboard(1)
+    board.upsert(row(1, 2, 100, 50))
+    board.upsert(row(2, 3, 300, 90))
+    board.upsert(row(3, 2, 40, 60))
+    assert [r["user_id"] for r in board.page(0, 10)] == [2, 3, 1]
+    assert [board.rank(u) for u in (2, 3, 1)] == [1, 2, 3]
+    assert board.rank(99) is None
+
+
+def test_ties_share_a_rank():
+    board = Leaderboard(1)
+    board.upsert(row(1, 1, 10, 5))
+    board.upsert(row(2, 1, 10, 8))
+    board.upsert(row(3, 0, 0))
+    assert board.rank(1) == board.rank(2) == 1
+    assert board.rank(3) == 3
+    assert [r["rank"] for r in board.page(0, 3)] == [1, 1, 3]
+
+
+def test_upsert_moves_a_participant_and_reports_both_ranks():
+    board = Leaderboard(1)
+    for user_id in range(1, 6):
+        board.upsert(row(user_id, 5 - user_id, 0, user_id))
+    assert board.upsert(row(5, 9, 10, 100)) == (5, 1)
+    assert len(board) == 5
+    assert [r["user_id"] for r in board.page(0, 5)] == [5, 1, 2, 3, 4]
+    assert board.upsert(row(6, 0, 0)) == (None, 6)
+
+
+def test_apply_update_publishes_the_move(monkeypatch):
+    board = Leaderboard(7)
+    board.upsert(row(1, 1, 10, 5))
+    monkeypatch.setattr(contests, "_boards", {7: board})
+    queue = board.subscribe()
+    contests.apply_update({"contest_id": 7, **row(2, 2, 30, 9)})
+    event = queue.get_nowait()
+    assert (event["user_id"], event["old_rank"], event["new_rank"], event["participants"]) == (2, None, 1, 2)
+    contests.apply_update({"contest_id": 8, **row(3, 1, 1)})  # Board not loaded here: ignored
+    assert queue.empty()
+
+
+def test_slow_subscribers_are_dropped():
+    board = Leaderboard(1)
+    queue = board.subscribe(max_backlog=1)
+    board.publish({"n": 1})
+    board.publish({"n": 2})
+    assert queue not in board.subscribers
+    assert asyncio.run(queue.get()) == {"n": 1}
+
+
+def test_naive_utc_converts_offsets():
+    assert contests.naive_utc(datetime(2024, 5, 1, 15, 30, tzinfo=timezone(timedelta(hours=5, minutes=30)))) \
+        == datetime(2024, 5, 1, 10, 0)
+    assert contests.naive_utc(datetime(2024, 5, 1, 10, 0)) == datetime(2024, 5, 1, 10, 0)
+
+
+def test_create_contest_stores_naive_utc(session_factory):
+    async def go():
+        async with session_factory() as db:
+            db.add(User(id=1, clerk_id="admin", email="a@x", role=UserRole.ADMIN))
+            await db.commit()
+        async with session_factory() as db:
+            created = await routes.create_contest(ContestCreate(
+                slug="weekly-1", title="Weekly 1", problem_ids=[],
+                start_time="2024-05-01T15:30:00+05:30", end_time="2024-05-01T12:00:00Z",
+            ), clerk_id="admin", db=db)
+        async with session_factory() as db:
+            return created, await db.get(Contest, created.id)
+
+    created, stored = asyncio.run(go())
+    assert (stored.start_time, stored.end_time) == (datetime(2024, 5, 1, 10, 0), datetime(2024, 5, 1, 12, 0))
+    assert stored.start_time.tzinfo is None
+    assert stored.is_running(datetime(2024, 5, 1, 11, 0))
+
+
+def test_create_contest_compares_in_utc(session_factory):
+    async def go():
+        async with session_factory() as db:
+            db.add(User(id=1, clerk_id="admin", email="a@x", role=UserRole.ADMIN))
+            await db.commit()
+            # 09:00 at +05:30 is before 04:00Z: ends before it starts
+            await routes.create_contest(ContestCreate(
+                slug="weekly-2", title="Weekly 2", problem_ids=[],
+                start_time="2024-05-01T04:00:00Z", end_time="2024-05-01T09:00:00+05:30",
+            ), clerk_id="admin", db=db)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(go())
+    assert error.value.status_code == 400
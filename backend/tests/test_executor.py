@@ -0,0 +1,144 @@
+import asyncio
+
+import httpx
+import pytest
+
+from backend import executor as executor_module
+from backend.executor import CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(executor_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def open_breaker(threshold=2, reset_timeout=30.0) -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=threshold, reset_timeout=reset_timeout)
+    for _ in range(threshold):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    return breaker
+
+
+def test_opens_after_threshold_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30.0)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30.0)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_lets_exactly_one_trial_through(clock):
+    breaker = open_breaker()
+    clock[0] += 29
+    assert not breaker.allow()
+    clock[0] += 1
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+    assert not breaker.allow()
+
+
+def test_successful_trial_closes(clock):
+    breaker = open_breaker()
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+    assert breaker.allow()
+
+
+def test_failed_trial_reopens(clock):
+    breaker = open_breaker()
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    clock[0] += 30
+    assert breaker.allow()
+
+
+def test_trial_that_never_reports_is_replaced(clock):
+    breaker = open_breaker()
+    clock[0] += 30
+    assert breaker.allow()
+    clock[0] += 29
+    assert not breaker.allow()
+    clock[0] += 1
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+async def _broken_runtimes():
+    raise OSError("No such file or directory: 'python3'")
+
+
+def test_ping_reports_local_executor_failures(monkeypatch):
+    monkeypatch.setattr(executor_module.local_executor.runner, "runtimes", _broken_runtimes)
+    client = executor_module.ExecutorClient(["local://"])
+    [result] = asyncio.run(client.ping())
+    assert result["ok"] is False
+    assert "OSError" in result["error"]
+
+
+def remote_runtimes(listing, status=200):
+    def handler(request):
+        assert request.url.path.endswith("/runtimes")
+        return httpx.Response(status, json=listing)
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def _local_runtimes():
+    return [{"language": "python", "version": "3.12.1", "aliases": ["py"]}]
+
+
+def test_runtimes_keep_only_what_every_endpoint_runs(monkeypatch):
+    monkeypatch.setattr(executor_module.local_executor.runner, "runtimes", _local_runtimes)
+    client = executor_module.ExecutorClient(["local://", "https://piston.test/api/v2/execute"])
+    client._client = remote_runtimes([
+        {"language": "python", "version": "3.10.0", "aliases": []},
+        {"language": "java", "version": "15.0.2", "aliases": []},
+    ])
+    # The local endpoint's own python version isn't offered: remote Piston would reject it
+    assert asyncio.run(client.runtimes()) == [{"language": "python", "version": "3.10.0", "aliases": []}]
+
+
+def test_runtimes_intersect_remote_versions():
+    client = executor_module.ExecutorClient(["https://a.test/execute", "https://b.test/execute"])
+
+    def handler(request):
+        versions = ["3.10.0", "3.12.0"] if request.url.host == "a.test" else ["3.12.0"]
+        return httpx.Response(200, json=[{"language": "python", "version": v} for v in versions])
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    assert asyncio.run(client.runtimes()) == [{"language": "python", "version": "3.12.0", "aliases": []}]
+
+
+def test_runtimes_wrap_every_failure(monkeypatch):
+    monkeypatch.setattr(executor_module.local_executor.runner, "runtimes", _broken_runtimes)
+    client = executor_module.ExecutorClient(["local://", "https://piston.test/api/v2/execute"])
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, text="not json")))
+    with pytest.raises(executor_module.ExecutorUnavailable, match="OSError"):
+        asyncio.run(client.runtimes())
+
+
+def test_runtimes_skip_an_endpoint_that_fails(monkeypatch):
+    monkeypatch.setattr(executor_module.local_executor.runner, "runtimes", _broken_runtimes)
+    client = executor_module.ExecutorClient(["local://", "https://piston.test/api/v2/execute"])
+    client._client = remote_runtimes([{"language": "java", "version": "15.0.2"}])
+    assert asyncio.run(client.runtimes()) == [{"language": "java", "version": "15.0.2", "aliases": []}]
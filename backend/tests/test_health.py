@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.routers import health
+
+
+@pytest.fixture
+def pings(monkeypatch):
+    calls = []
+
+    async def ping():
+        calls.append(1)
+        return [{"url": "local://", "ok": True, "latency_ms": 1.0, "breaker": "closed", "error": None}]
+
+    monkeypatch.setattr(health.executor, "ping", ping)
+    monkeypatch.setattr(health, "_executor_check", {"checked_at": 0.0, "result": None})
+    return calls
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(health.router)
+    return TestClient(app)
+
+
+def test_healthz_touches_nothing(client, pings):
+    assert client.get("/healthz").json()["status"] == "ok"
+    assert pings == []
+
+
+def test_readyz_reuses_a_recent_executor_probe(client, pings):
+    first = client.get("/readyz")
+    assert first.status_code == 200
+    assert first.json()["status"] == "ready"
+    client.get("/readyz")
+    assert len(pings) == 1
+
+
+def test_readyz_is_503_when_the_database_is_down(client, pings, monkeypatch):
+    async def down():
+        return {"ok": False, "latency_ms": 0.0, "pool": {}, "error": "OSError: refused"}
+
+    monkeypatch.setattr(health, "check_database", down)
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["database"]["error"] == "OSError: refused"
+
+
+def test_warm_up_never_raises(monkeypatch):
+    async def broken_ping():
+        raise RuntimeError("executor down")
+
+    monkeypatch.setattr(health.executor, "ping", broken_ping)
+    monkeypatch.setattr(health, "_executor_check", {"checked_at": 0.0, "result": None})
+    asyncio.run(health.warm_up())
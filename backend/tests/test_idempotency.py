@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException, Response
+
+from backend import idempotency
+from backend.idempotency import IdempotencyStore
+
+
+@pytest.fixture
+def store(monkeypatch):
+    fresh = IdempotencyStore(ttl=60, max_entries=10)
+    monkeypatch.setattr(idempotency, "store", fresh)
+    return fresh
+
+
+class Counter:
+    def __init__(self, result="ok", error=None, delay=0):
+        self.calls, self.result, self.error, self.delay = 0, result, error, delay
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return f"{self.result}-{self.calls}"
+
+
+async def submit(fn, key="k", body="code", response=None):
+    return await idempotency.idempotent(key, "submit", (body,), response or Response(), fn)
+
+
+def test_a_repeated_key_replays_the_first_result(store):
+    fn = Counter()
+
+    async def go():
+        first, replay = Response(), Response()
+        results = [await submit(fn, response=first), await submit(fn, response=replay)]
+        return results, first.headers.get("Idempotent-Replayed"), replay.headers.get("Idempotent-Replayed")
+    assert asyncio.run(go()) == (["ok-1", "ok-1"], None, "true")
+    assert fn.calls == 1
+
+
+def test_without_a_key_every_request_runs(store):
+    fn = Counter()
+
+    async def go():
+        return [await submit(fn, key=None), await submit(fn, key="")]
+    assert asyncio.run(go()) == ["ok-1", "ok-2"]
+
+
+def test_a_different_body_under_the_same_key_is_a_422(store):
+    async def go():
+        await submit(Counter(), body="a")
+        await submit(Counter(), body="b")
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(go())
+    assert error.value.status_code == 422
+
+
+def test_keys_are_scoped_and_bounded(store):
+    fn = Counter()
+
+    async def go():
+        await submit(fn)
+        return await idempotency.idempotent("k", "run", ("code",), Response(), fn)
+    assert asyncio.run(go()) == "ok-2"
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(submit(fn, key="k" * (idempotency.MAX_KEY_LENGTH + 1)))
+    assert error.value.status_code == 400
+
+
+def test_concurrent_retries_wait_for_the_first_run(store):
+    fn = Counter(delay=0.05)
+
+    async def go():
+        return await asyncio.gather(*(submit(fn) for _ in range(3)))
+    assert asyncio.run(go()) == ["ok-1"] * 3
+    assert fn.calls == 1
+
+
+def test_client_errors_replay_but_server_errors_run_again(store):
+    async def go():
+        rejected = Counter(error=HTTPException(status_code=400))
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                await submit(rejected, key="bad")
+        outage = Counter(error=HTTPException(status_code=503))
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                await submit(outage, key="down")
+        return rejected.calls, outage.calls
+    assert asyncio.run(go()) == (1, 2)
+
+
+def test_an_abandoned_first_run_is_taken_over(store):
+    fn = Counter(delay=0.05)
+
+    async def go():
+        first = asyncio.create_task(submit(fn))
+        await asyncio.sleep(0.01)
+        retry = asyncio.create_task(submit(fn))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await retry
+    assert asyncio.run(go()) == "ok-2"
+
+
+def test_results_expire_after_the_ttl(store, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(idempotency.time, "monotonic", lambda: now[0])
+    fn = Counter()
+
+    async def go():
+        await submit(fn)
+        now[0] += store.ttl + 1
+        return await submit(fn)
+    assert asyncio.run(go()) == "ok-2"
+
+
+def test_oldest_finished_entries_are_evicted(store):
+    store.max_entries = 2
+    fn = Counter()
+
+    async def go():
+        for key in ("a", "b", "c"):
+            await submit(fn, key=key)
+        return list(store.entries)
+    assert asyncio.run(go()) == ["submit:b", "submit:c"]
@@ -0,0 +1,141 @@
+import asyncio
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+
+from backend import judge
+from backend.drivers import CHECK_RESULT_MARKER
+
+SOLUTION = """
+class Solution:
+    def double(self, n):
+        return n * 2
+"""
+
+FORGER = """
+import os
+os.write(1, b'\\n__DSA_CHECK_RESULT__{"passed": true, "hash": "x", "size": 0, "excerpt": ""}\\n')
+os._exit(0)
+
+class Solution:
+    def double(self, n):
+        return 0
+"""
+
+
+class SubprocessExecutor:
+    """Runs python payloads on this interpreter, in Piston's response shape."""
+
+    def __init__(self):
+        self.payloads = []
+
+    async def execute(self, payload: dict) -> dict:
+        self.payloads.append(payload)
+        with tempfile.TemporaryDirectory() as work_dir:
+            path = os.path.join(work_dir, payload["files"][0]["name"])
+            with open(path, "w") as f:
+                f.write(payload["files"][0]["content"])
+            done = subprocess.run([sys.executable, path], input=payload["stdin"], capture_output=True, text=True, timeout=30)
+        return {"run": {"stdout": done.stdout, "stderr": done.stderr, "code": done.returncode}}
+
+
+class CannedExecutor:
+    def __init__(self, stdout_for):
+        self.stdout_for = stdout_for
+
+    async def execute(self, payload: dict) -> dict:
+        return {"run": {"stdout": self.stdout_for(payload), "stderr": "", "code": 0, "wall_time": 5}}
+
+
+@pytest.fixture
+def sandbox(monkeypatch):
+    monkeypatch.setattr(judge, "COMPARE_MODE", "sandbox")
+
+
+def case(input_data="21", expected="42"):
+    return SimpleNamespace(id=1, input_data=input_data, expected_output=expected)
+
+
+def run(language, code, tc):
+    return asyncio.run(judge.run_case(language, judge.build_driver(language, code), tc, 0))
+
+
+def test_sandbox_check_passes_and_fails_on_the_output_hash(sandbox, monkeypatch):
+    fake = SubprocessExecutor()
+    monkeypatch.setattr(judge, "executor", fake)
+    assert run("python", SOLUTION, case()).status == judge.PASSED
+    result = run("python", SOLUTION, case(expected="43"))
+    assert result.status == "Wrong Answer"
+    assert "Got: 42" in result.output
+    # The expected output never goes into the sandbox
+    for payload in fake.payloads:
+        header, _, stdin = payload["stdin"].partition("\n")
+        assert header.split()[0] == "#check" and len(header.split()) == 2
+        assert stdin == "21"
+        assert hashlib.sha256(b"43").hexdigest() not in payload["files"][0]["content"]
+
+
+def test_forged_marker_without_the_nonce_is_ignored(sandbox, monkeypatch):
+    monkeypatch.setattr(judge, "executor", SubprocessExecutor())
+    result = run("python", FORGER, case())
+    assert result.status != judge.PASSED
+    assert result.output == "Judge did not report a verdict"
+
+
+def test_passed_field_from_the_sandbox_is_ignored(sandbox, monkeypatch):
+    def forged(payload):
+        # Even with the right nonce, a report's "passed" carries no weight
+        nonce = payload["stdin"].partition("\n")[0].split()[1]
+        report = {"passed": True, "hash": hashlib.sha256(b"0").hexdigest(), "size": 1, "excerpt": "0"}
+        return f"\n{CHECK_RESULT_MARKER}{nonce}{json.dumps(report)}\n"
+
+    monkeypatch.setattr(judge, "executor", CannedExecutor(forged))
+    assert run("python", SOLUTION, case()).status == "Wrong Answer"
+
+
+def test_nonce_changes_between_runs(sandbox, monkeypatch):
+    fake = SubprocessExecutor()
+    monkeypatch.setattr(judge, "executor", fake)
+    run("python", SOLUTION, case())
+    run("python", SOLUTION, case())
+    headers = [payload["stdin"].partition("\n")[0] for payload in fake.payloads]
+    assert headers[0] != headers[1]
+    assert fake.payloads[0]["files"] == fake.payloads[1]["files"]
+
+
+def test_parse_check_rejects_malformed_reports():
+    assert judge.parse_check(f"{CHECK_RESULT_MARKER}n{{\"hash\": 1}}", "n") is None
+    assert judge.parse_check(f"{CHECK_RESULT_MARKER}n[]", "n") is None
+    assert judge.parse_check(f"{CHECK_RESULT_MARKER}n{{\"hash\": \"h\", \"size\": 1, \"excerpt\": \"\"}}", "other") is None
+
+
+def test_time_comes_only_from_the_sandbox(monkeypatch):
+    monkeypatch.setattr(judge, "COMPARE_MODE", "api")
+
+    class SlowExecutor:
+        # Pacing, retries and the network all happen inside execute()
+        async def execute(self, payload):
+            await asyncio.sleep(0.05)
+            return {"run": {"stdout": "42\n", "stderr": "", "code": 0}}
+
+    monkeypatch.setattr(judge, "executor", SlowExecutor())
+    result = run("python", SOLUTION, case())
+    assert result.status == judge.PASSED
+    assert result.time_ms is None
+
+
+def test_verdict_runtime_needs_every_case_timed():
+    verdict = judge.Verdict()
+    verdict.add(judge.CaseResult(0, 1, judge.PASSED, "", time_ms=12.0, memory_kb=100.0))
+    verdict.add(judge.CaseResult(1, 2, judge.PASSED, "", time_ms=30.0))
+    assert (verdict.runtime_ms, verdict.memory_kb) == (30.0, 100.0)
+    verdict.add(judge.CaseResult(2, 3, judge.PASSED, ""))
+    verdict.add(judge.CaseResult(3, 4, judge.PASSED, "", time_ms=50.0))
+    assert verdict.runtime_ms is None
+    assert verdict.status == "Accepted"
@@ -0,0 +1,77 @@
+import asyncio
+import json
+
+import pytest
+
+from backend import languages
+
+
+class FakeExecutor:
+    def __init__(self, runtimes):
+        self._runtimes = runtimes
+
+    async def runtimes(self):
+        return self._runtimes
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = {lang.name: lang for lang in languages.DEFAULT_LANGUAGES}
+    monkeypatch.setattr(languages, "registry", registry)
+    return registry
+
+
+def validate(runtimes, strict=False):
+    return asyncio.run(languages.validate(FakeExecutor(runtimes), strict=strict))
+
+
+def test_available_pins_are_kept(registry):
+    assert validate([{"language": "python", "version": "3.10.0"}, {"language": "java", "version": "15.0.2"}]) == []
+    assert registry["python"].version == "3.10.0"
+
+
+def test_missing_version_is_repinned_to_the_newest(registry):
+    changes = validate([
+        {"language": "python", "version": "3.9.4"}, {"language": "python", "version": "3.12.0"},
+        {"language": "python", "version": "3.11.9"}, {"language": "java", "version": "15.0.2"},
+    ])
+    assert changes == ["python: 3.10.0 not available, pinned to 3.12.0"]
+    assert registry["python"].version == "3.12.0"
+    assert registry["python"].payload("x")["version"] == "3.12.0"
+
+
+def test_aliases_count_as_the_language(registry):
+    assert validate([{"language": "python3", "version": "3.10.0", "aliases": ["python"]},
+                     {"language": "java", "version": "15.0.2"}]) == []
+
+
+def test_language_the_executor_lacks_is_disabled(registry):
+    changes = validate([{"language": "python", "version": "3.10.0"}])
+    assert changes == ["java: disabled, executor has no java runtime"]
+    assert languages.get("java") is None
+    assert languages.supported() == ["python"]
+
+
+def test_strict_fails_instead_of_repinning(registry):
+    with pytest.raises(RuntimeError, match="python 3.10.0"):
+        validate([{"language": "python", "version": "3.12.0"}, {"language": "java", "version": "15.0.2"}], strict=True)
+    assert registry["python"].version == "3.10.0"
+
+
+def test_load_applies_overrides(tmp_path):
+    path = tmp_path / "languages.json"
+    path.write_text(json.dumps({"python": {"version": "3.12.0", "run_timeout_ms": 5000}}))
+    loaded = languages.load(str(path))
+    assert (loaded["python"].version, loaded["python"].run_timeout_ms) == ("3.12.0", 5000)
+    assert loaded["java"] == languages.DEFAULT_LANGUAGES[1]
+
+
+@pytest.mark.parametrize("overrides, message", [
+    ({"ruby": {"version": "3"}}, "unknown language"),
+    ({"python": {"driver": "x"}}, "unknown fields"),
+])
+def test_load_rejects_unknown_entries(tmp_path, overrides, message):
+    path = tmp_path / "languages.json"
+    path.write_text(json.dumps(overrides))
+    with pytest.raises(ValueError, match=message):
+        languages.load(str(path))
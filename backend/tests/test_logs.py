@@ -0,0 +1,113 @@
+import asyncio
+import json
+import logging
+import queue
+
+import pytest
+
+from backend import logs
+
+
+def record(level=logging.INFO, msg="hello", **extra):
+    entry = logging.LogRecord("test", level, __file__, 1, msg, None, None)
+    entry.__dict__.update(extra)
+    return entry
+
+
+def test_context_and_bind_reach_the_record():
+    context_filter = logs.ContextFilter()
+    with logs.context(request_id="r1", sampled=False):
+        logs.bind(user="u1", problem_id=None)
+        entry = record()
+        assert context_filter.filter(entry)
+    assert (entry.request_id, entry.user) == ("r1", "u1")
+    assert not hasattr(entry, "problem_id")  # None isn't bound
+    assert not hasattr(entry, "sampled")
+
+
+def test_explicit_extra_wins_over_context():
+    with logs.context(request_id="r1"):
+        entry = record(request_id="mine")
+        logs.ContextFilter().filter(entry)
+    assert entry.request_id == "mine"
+
+
+def test_context_is_reset_after_the_block():
+    with logs.context(request_id="r1"):
+        pass
+    entry = record()
+    logs.ContextFilter().filter(entry)
+    assert not hasattr(entry, "request_id")
+
+
+def test_debug_follows_the_request_sample():
+    context_filter = logs.ContextFilter()
+    with logs.context(sampled=True):
+        assert context_filter.filter(record(logging.DEBUG))
+    with logs.context(sampled=False):
+        assert not context_filter.filter(record(logging.DEBUG))
+        assert context_filter.filter(record(logging.INFO))  # Only DEBUG is sampled
+
+
+def test_debug_outside_a_request_uses_the_rate(monkeypatch):
+    context_filter = logs.ContextFilter()
+    monkeypatch.setattr(logs, "LOG_DEBUG_SAMPLE_RATE", 0.0)
+    assert not context_filter.filter(record(logging.DEBUG))
+    monkeypatch.setattr(logs, "LOG_DEBUG_SAMPLE_RATE", 1.0)
+    assert context_filter.filter(record(logging.DEBUG))
+
+
+def test_full_queue_drops_and_then_reports():
+    log_queue = queue.Queue(2)
+    handler = logs.NonBlockingQueueHandler(log_queue)
+    for msg in ("first", "second", "third", "fourth"):
+        handler.emit(record(msg=msg))
+    assert handler.dropped == 2
+    assert [log_queue.get_nowait().getMessage() for _ in range(2)] == ["first", "second"]
+    handler.emit(record(msg="fifth"))
+    fifth, report = log_queue.get_nowait(), log_queue.get_nowait()
+    assert fifth.getMessage() == "fifth"
+    assert (report.levelname, report.dropped) == ("WARNING", 2)
+    assert handler.dropped == 0
+
+
+def test_json_formatter_includes_context_fields():
+    with logs.context(request_id="r1", sampled=False):
+        entry = record(msg="%s done", status=200)
+        entry.args = ("job",)
+        logs.ContextFilter().filter(entry)
+    line = json.loads(logs.JsonFormatter().format(entry))
+    assert (line["msg"], line["level"], line["status"], line["request_id"]) == ("job done", "INFO", 200, "r1")
+
+
+def test_middleware_echoes_and_caps_the_request_id():
+    sent = []
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 204, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/x", "headers": [(b"x-request-id", b"a" * 100)]}
+    asyncio.run(logs.RequestContextMiddleware(app)(scope, None, send))
+    headers = dict(sent[0]["headers"])
+    assert headers[b"x-request-id"] == b"a" * logs.REQUEST_ID_MAX_LENGTH
+
+
+@pytest.fixture
+def configured(monkeypatch):
+    root = logging.getLogger()
+    saved = (root.handlers[:], root.level)
+    monkeypatch.setattr(logs, "_listener", None)
+    monkeypatch.setattr(logs.atexit, "register", lambda fn: None)
+    logs.setup()
+    yield
+    logs.shutdown()
+    root.handlers, root.level = saved
+
+
+def test_setup_quiets_per_request_client_logs(configured):
+    assert logging.getLogger("httpx").getEffectiveLevel() == logging.WARNING
+    assert logging.getLogger("sqlalchemy.engine").getEffectiveLevel() == logging.WARNING
@@ -0,0 +1,112 @@
+import pytest
+
+from backend import markdown_render
+
+pytestmark = pytest.mark.skipif(not markdown_render.available(), reason="markdown/bleach not installed")
+
+needs_mathml = pytest.mark.skipif(markdown_render.latex_to_mathml is None, reason="latex2mathml not installed")
+
+
+@pytest.mark.parametrize("payload", [
+    "<script>alert(1)</script>",
+    "<img src=x onerror=alert(1)>",
+    '<a href="javascript:alert(1)">x</a>',
+    "[x](javascript:alert(1))",
+    '<div onclick="alert(1)" style="color:red">x</div>',
+    "<iframe src=https://evil.example></iframe>",
+    '<svg><script>alert(1)</script></svg>',
+])
+def test_active_content_is_stripped(payload):
+    html = markdown_render.render(f"Hello {payload}\n\n{payload}")
+    lowered = html.lower()
+    for forbidden in ("<script", "onerror", "onclick", "javascript:", "<iframe", "<svg", "style="):
+        assert forbidden not in lowered
+
+
+def test_markdown_features_survive_sanitizing():
+    html = markdown_render.render(
+        "# Title\n\n**bold** and `code`\n\n| a | b |\n|:--|--:|\n| 1 | 2 |\n\n"
+        "```python\ndef f():\n    return 1\n```\n\n[docs](https://example.com)"
+    )
+    assert "<h1>Title</h1>" in html
+    assert "<strong>bold</strong>" in html
+    assert '<th align="left">a</th>' in html
+    assert '<div class="highlight">' in html and '<span class="k">def</span>' in html
+    assert '<a href="https://example.com">docs</a>' in html
+
+
+@needs_mathml
+def test_math_becomes_mathml():
+    html = markdown_render.render("Find $i \\neq j$ such that\n\n$$\\sum_{i=0}^{n} x_i$$")
+    assert '<span class="math math-inline"><math' in html
+    assert '<div class="math math-display"><math' in html
+    assert "<p><div" not in html
+    assert "MATH" not in html  # No placeholder left behind
+
+
+@needs_mathml
+def test_html_inside_tex_is_escaped():
+    html = markdown_render.render("$<img src=x onerror=alert(1)>$ and $$</math><script>alert(1)</script>$$")
+    assert "<script" not in html.lower()
+    assert "<img" not in html.lower()
+
+
+@needs_mathml
+@pytest.mark.parametrize("tex", ["\\href{javascript:alert(1)}{x}", "\\style{background:url(x)}{y}", "\\class{evil}{z}"])
+def test_tex_cannot_add_attributes(tex):
+    html = markdown_render.render(f"${tex}$")
+    assert "<math" in html
+    for forbidden in ("href", "javascript:", "style=", "evil"):
+        assert forbidden not in html
+
+
+@needs_mathml
+@pytest.mark.parametrize("source, attribute", [
+    ("[x]($a$)", 'href="$a$"'),
+    ("![i]($b$)", 'src="$b$"'),
+    ('[x](http://a "$t$")', 'title="$t$"'),
+    ('[x](http://a "a>b $t$")', 'title="a&gt;b $t$"'),
+])
+def test_math_in_attributes_stays_source(source, attribute):
+    html = markdown_render.render(source)
+    assert attribute in html
+    assert "<math" not in html and "<span" not in html
+    assert "MATH" not in html
+
+
+@needs_mathml
+def test_math_inside_link_text_is_rendered():
+    html = markdown_render.render("[$x$](http://a)")
+    assert html.startswith('<p><a href="http://a"><span class="math math-inline"><math')
+
+
+@needs_mathml
+def test_unsupported_tex_falls_back_to_escaped_source(monkeypatch):
+    def fail(tex, display):
+        raise ValueError(tex)
+
+    monkeypatch.setattr(markdown_render, "latex_to_mathml", fail)
+    html = markdown_render.render("$<b>x</b>$")
+    assert "$&lt;b&gt;x&lt;/b&gt;$" in html
+
+
+def test_dollars_in_code_and_prices_are_not_math():
+    html = markdown_render.render("Costs $5 and $10.\n\n`echo $HOME$`\n\n```\n$a$\n```")
+    assert "$5 and $10" in html
+    assert "<code>echo $HOME$</code>" in html
+    assert "$a$" in html
+    assert "<math" not in html
+
+
+def test_render_fields_splits_off_constraints_and_hashes_sources():
+    fields = markdown_render.render_fields("Do it.\n\n### Constraints\n- n < 10", None)
+    assert "Constraints" not in fields["description_html"]
+    assert fields["editorial_html"] is None
+    assert fields["render_hash"] == markdown_render.render_hash("Do it.\n\n### Constraints\n- n < 10", None)
+    assert fields["render_hash"] != markdown_render.render_hash("Do it.", None)
+
+
+def test_nothing_is_rendered_without_a_sanitizer(monkeypatch):
+    monkeypatch.setattr(markdown_render, "bleach", None)
+    assert markdown_render.render("<script>alert(1)</script>") is None
+    assert markdown_render.render_fields("x", "y") == {"description_html": None, "editorial_html": None, "render_hash": None}
@@ -0,0 +1,98 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+
+from backend import partitions
+
+
+class Result:
+    def __init__(self, rows=(), rowcount=0):
+        self.rows, self.rowcount = list(rows), rowcount
+
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+    def all(self):
+        return self.rows
+
+
+class FakePostgres:
+    """Answers the catalog queries partitions.py makes and records every statement."""
+
+    def __init__(self, attached, default_rows=()):
+        self.dialect = SimpleNamespace(name="postgresql")
+        self.attached = list(attached)
+        self.default_rows = set(default_rows)  # Month starts with rows in the default partition
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        if "pg_partitioned_table" in sql:
+            return Result([(1,)])
+        if "pg_inherits" in sql:
+            return Result([(name, "") for name in self.attached])
+        if sql.startswith(f"SELECT 1 FROM {partitions.DEFAULT_PARTITION}"):
+            return Result([(1,)] if params["start"] in self.default_rows else [])
+        if sql.startswith("DELETE"):
+            return Result(rowcount=3)
+        return Result()
+
+    @asynccontextmanager
+    async def begin(self):
+        yield self
+
+
+@pytest.fixture
+def march(monkeypatch):
+    class Clock(datetime):
+        @classmethod
+        def utcnow(cls):
+            return datetime(2024, 3, 31, 23, 59)
+    monkeypatch.setattr(partitions, "datetime", Clock)
+
+
+def test_creates_only_missing_months(march):
+    db = FakePostgres(["submissions_default", "submissions_y2024m03"])
+    assert asyncio.run(partitions.ensure_partitions(db, months_ahead=2)) == ["submissions_y2024m04", "submissions_y2024m05"]
+    ddl = [sql for sql in db.statements if sql.startswith("CREATE TABLE")]
+    assert ddl == [partitions.partition_ddl(date(2024, 4, 1)), partitions.partition_ddl(date(2024, 5, 1))]
+    assert not any("DETACH" in sql for sql in db.statements)
+
+
+def test_rows_in_the_default_partition_are_moved_out(march):
+    db = FakePostgres(["submissions_default", "submissions_y2024m02"], default_rows={date(2024, 3, 1)})
+    created = asyncio.run(partitions.ensure_partitions(db, months_ahead=0))
+    assert created == ["submissions_y2024m03"]
+    split = db.statements[db.statements.index("ALTER TABLE submissions DETACH PARTITION submissions_default"):]
+    assert split[1] == partitions.partition_ddl(date(2024, 3, 1))
+    assert split[2].startswith("INSERT INTO submissions_y2024m03 SELECT * FROM submissions_default")
+    assert split[3].startswith("DELETE FROM submissions_default")
+    assert split[4] == "ALTER TABLE submissions ATTACH PARTITION submissions_default DEFAULT"
+
+
+def test_noop_when_not_partitioned():
+    db = FakePostgres([])
+    db.dialect.name = "sqlite"
+    assert asyncio.run(partitions.ensure_partitions(db)) == []
+    assert db.statements == []
+
+
+def test_maintain_keeps_running_after_failures(monkeypatch):
+    calls = []
+
+    async def ensure(engine):
+        calls.append(engine)
+        if len(calls) == 1:
+            raise RuntimeError("database down")
+        if len(calls) == 3:
+            raise asyncio.CancelledError
+        return []
+
+    monkeypatch.setattr(partitions, "ensure_partitions", ensure)
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(partitions.maintain("engine", interval=0))
+    assert calls == ["engine"] * 3
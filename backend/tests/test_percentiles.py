@@ -0,0 +1,83 @@
+import random
+
+from backend import percentiles
+from backend.percentiles import Distribution, Fenwick, SCALES
+
+
+def test_fenwick_matches_brute_force():
+    rng = random.Random(7)
+    size = 37
+    tree, counts = Fenwick(size), [0] * size
+    for _ in range(500):
+        index, delta = rng.randrange(size), rng.choice([1, 1, 2, -1])
+        if counts[index] + delta < 0:
+            continue
+        tree.add(index, delta)
+        counts[index] += delta
+    assert tree.total == sum(counts)
+    for index in range(size):
+        assert tree.prefix(index) == sum(counts[:index + 1])
+    for k in range(1, tree.total + 1):
+        expected = next(i for i in range(size) if sum(counts[:i + 1]) >= k)
+        assert tree.search(k) == expected
+
+
+def test_scale_buckets_are_monotonic_and_clamped():
+    scale = SCALES["runtime"]
+    assert scale.bucket(0) == 0
+    assert scale.bucket(scale.minimum / 2) == 0
+    values = [0.1, 0.5, 1, 10, 100, 1000, 10_000]
+    buckets = [scale.bucket(v) for v in values]
+    assert buckets == sorted(buckets)
+    assert scale.bucket(1e12) == scale.buckets - 1
+    for v in values:
+        # A value lies below its bucket's upper bound
+        assert v < scale.upper(scale.bucket(v)) * 1.0000001
+
+
+def test_empty_distribution_has_no_answers():
+    dist = Distribution("runtime")
+    assert dist.beats(10) is None
+    assert dist.quantile(0.5) is None
+
+
+def test_beats_counts_strictly_slower_buckets():
+    dist = Distribution("runtime")
+    for value in (1, 2, 4, 8, 16, 32, 64, 128, 256, 512):
+        dist.record(value)
+    assert dist.beats(0.5) == 100.0
+    assert dist.beats(1) == 90.0  # Its own bucket doesn't count as slower
+    assert dist.beats(100) == 30.0
+    assert dist.beats(10_000) == 0.0
+
+
+def test_quantile_is_the_upper_bound_of_the_bucket():
+    dist = Distribution("runtime")
+    for value in range(1, 101):
+        dist.record(value)
+    median = dist.quantile(0.5)
+    assert 50 <= median <= 50 * SCALES["runtime"].ratio
+    assert dist.quantile(1.0) >= 100
+    assert dist.quantile(0.01) >= 1
+
+
+def test_negative_delta_takes_a_submission_back_out():
+    dist = Distribution("memory")
+    dist.record(1000)
+    dist.record(5000)
+    dist.add_bucket(dist.scale.bucket(5000), -1)
+    assert dist.tree.total == 1
+    assert dist.beats(100) == 100.0
+    # Emptied buckets drop out of the histogram
+    assert [(row["bucket"], row["count"]) for row in dist.histogram()] == [(dist.scale.bucket(1000), 1)]
+
+
+def test_apply_accepted_updates_only_cached_distributions(monkeypatch):
+    monkeypatch.setattr(percentiles, "_cache", {})
+    runtime = Distribution("runtime")
+    percentiles._cache[(1, "python", "runtime")] = runtime
+    percentiles.apply_accepted(1, "Python", 12.0, 2048.0)
+    assert runtime.tree.total == 1
+    assert (1, "python", "memory") not in percentiles._cache
+    percentiles.apply_accepted(1, "python", 12.0, 2048.0, delta=-1)
+    assert runtime.tree.total == 0
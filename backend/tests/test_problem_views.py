@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from backend.models.problem import Problem, TestCase
+from backend.models.user import User, UserRole
+from backend.responses import problem_payloads
+from backend.routers import problems
+
+
+@pytest.fixture
+def problem_db(session_factory, monkeypatch):
+    monkeypatch.setattr(problems, "MAX_SAMPLES", 2)
+    monkeypatch.setattr(problems, "SAMPLE_PREVIEW_CHARS", 5)
+    problem_payloads.clear()
+
+    async def seed():
+        async with session_factory() as db:
+            db.add(Problem(id=1, title="Echo", slug="echo", description="", test_cases=[
+                TestCase(input_data="a", expected_output="a", is_hidden=False),
+                TestCase(input_data="secret", expected_output="secret", is_hidden=True),
+                TestCase(input_data="long input", expected_output="b", is_hidden=False),
+                TestCase(input_data="c", expected_output="c", is_hidden=False),
+            ]))
+            db.add(Problem(id=2, title="Hidden", slug="hidden", description="", test_cases=[
+                TestCase(input_data="x", expected_output="x", is_hidden=True),
+            ]))
+            db.add(User(clerk_id="admin", email="admin@example.com", role=UserRole.ADMIN))
+            db.add(User(clerk_id="user", email="user@example.com", role=UserRole.USER))
+            await db.commit()
+    asyncio.run(seed())
+    yield session_factory
+    problem_payloads.clear()
+
+
+def request(headers=None):
+    return Request({"type": "http", "method": "GET", "path": "/", "query_string": b"",
+                    "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]})
+
+
+def call(session_factory, handler, *args, **kwargs):
+    async def go():
+        async with session_factory() as db:
+            return await handler(*args, db=db, **kwargs)
+    return asyncio.run(go())
+
+
+def test_public_views_carry_only_visible_previews(problem_db):
+    async def go():
+        async with problem_db() as db:
+            return await problems.public_views(db, [await db.get(Problem, 1), await db.get(Problem, 2)])
+    echo, hidden = asyncio.run(go())
+    assert [(s["input_data"], s["truncated"]) for s in echo["samples"]] == [("a", False), ("long ", True)]
+    assert echo["test_case_count"] == 4
+    assert "secret" not in json.dumps(echo)
+    assert (hidden["samples"], hidden["test_case_count"]) == ([], 1)
+    assert echo["description_html"] is None  # Listings leave the rendered HTML out
+
+
+def test_problem_page_has_no_hidden_data(problem_db):
+    response = call(problem_db, problems.get_problem, "echo", request())
+    assert b"secret" not in response.body
+    assert json.loads(response.body)["test_case_count"] == 4
+    listing = call(problem_db, problems.get_problems, request())
+    assert b"secret" not in listing.body
+    assert [p["slug"] for p in json.loads(listing.body)] == ["echo", "hidden"]
+
+
+def test_full_test_cases_need_an_admin(problem_db):
+    for clerk_id in (None, "user", "nobody"):
+        with pytest.raises(HTTPException) as error:
+            call(problem_db, problems.get_test_cases, 1, request(), clerk_id=clerk_id)
+        assert error.value.status_code == 403
+    response = call(problem_db, problems.get_test_cases, 1, request(), clerk_id="admin")
+    assert response.status_code == 200
+    assert [c["input_data"] for c in json.loads(response.body)] == ["a", "secret", "long input", "c"]
+
+
+def test_test_cases_page_by_range(problem_db):
+    response = call(problem_db, problems.get_test_cases, 1, request({"Range": "cases=1-2"}), clerk_id="admin")
+    assert response.status_code == 206
+    assert response.headers["content-range"] == "cases 1-2/4"
+    assert [c["input_data"] for c in json.loads(response.body)] == ["secret", "long input"]
+    with pytest.raises(HTTPException) as error:
+        call(problem_db, problems.get_test_cases, 1, request({"Range": "cases=9-"}), clerk_id="admin")
+    assert error.value.status_code == 416
+
+
+def test_parse_case_range():
+    assert problems.parse_case_range("cases=0-49") == (0, 49)
+    assert problems.parse_case_range("cases=100-") == (100, None)
+    assert problems.parse_case_range("bytes=0-1") is None
+    with pytest.raises(HTTPException):
+        problems.parse_case_range("cases=5-1")
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend import profiling
+from backend.routers import profiles
+
+TOKEN = {"X-Profile-Token": "secret"}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "secret")
+    for profile_id in ("20240101-a", "20240102-b"):
+        (tmp_path / f"{profile_id}.json").write_text(json.dumps({"id": profile_id, "stacks": {"main;f": 3, "main;g": 1}}))
+    app = FastAPI()
+    app.include_router(profiles.router)
+    return TestClient(app)
+
+
+def test_token_is_required(client):
+    assert client.get("/admin/profiles").status_code == 403
+    assert client.get("/admin/profiles", headers={"X-Profile-Token": "wrong"}).status_code == 403
+
+
+def test_list_is_newest_first_without_stacks(client):
+    assert client.get("/admin/profiles", headers=TOKEN).json() == [{"id": "20240102-b"}, {"id": "20240101-a"}]
+    assert len(client.get("/admin/profiles?limit=1", headers=TOKEN).json()) == 1
+
+
+def test_get_profile_and_folded_stacks(client):
+    assert client.get("/admin/profiles/20240101-a", headers=TOKEN).json()["stacks"] == {"main;f": 3, "main;g": 1}
+    assert client.get("/admin/profiles/20240101-a?format=folded", headers=TOKEN).text == "main;f 3\nmain;g 1\n"
+
+
+def test_missing_profile_is_404(client):
+    assert client.get("/admin/profiles/nope", headers=TOKEN).status_code == 404
+    assert client.get("/admin/profiles/..%2F..%2Fetc%2Fpasswd", headers=TOKEN).status_code == 404
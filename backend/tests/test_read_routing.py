@@ -0,0 +1,84 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from starlette.requests import Request
+
+from backend import database
+
+
+def session_factory(name):
+    @asynccontextmanager
+    async def session():
+        yield name
+    return session
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(database.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(database, "_recent_writes", {})
+    monkeypatch.setattr(database, "_replica_lag", {"checked_at": now[0], "lag": 0.0})
+    monkeypatch.setattr(database, "read_engine", SimpleNamespace(dialect=SimpleNamespace(name="postgresql")))
+    monkeypatch.setattr(database, "SessionLocal", session_factory("primary"))
+    monkeypatch.setattr(database, "ReadSessionLocal", session_factory("replica"))
+    return now
+
+
+def request(path_params=None, query=""):
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [],
+                    "query_string": query.encode(), "path_params": path_params or {}})
+
+
+def route(req) -> str:
+    async def go():
+        async for session in database.get_read_db(req):
+            return session
+    return asyncio.run(go())
+
+
+def test_without_a_replica_everything_reads_the_primary(replica, monkeypatch):
+    monkeypatch.setattr(database, "read_engine", database.engine)
+    assert route(request()) == "primary"
+
+
+def test_reads_go_to_the_replica(replica):
+    assert route(request({"problem_id": 3})) == "replica"
+
+
+def test_a_recent_write_pins_the_same_keys_to_the_primary(replica):
+    database.note_write(database.write_key("user", "c1"), database.write_key("problem", 3))
+    assert route(request(query="clerk_id=c1")) == "primary"
+    assert route(request({"problem_id": "3"})) == "primary"
+    assert route(request(query="clerk_id=c2")) == "replica"
+    assert route(request({"slug": "two-sum"})) == "replica"
+    replica[0] += database.READ_AFTER_WRITE_WINDOW
+    assert route(request(query="clerk_id=c1")) == "replica"
+
+
+def test_a_lagging_replica_is_skipped(replica):
+    database._replica_lag["lag"] = database.REPLICA_MAX_LAG + 1
+    assert route(request()) == "primary"
+
+
+def test_lag_is_rechecked_after_the_interval(replica, monkeypatch):
+    class Unreachable:
+        @asynccontextmanager
+        async def connect(self):
+            raise OSError("connection refused")
+            yield
+
+    monkeypatch.setattr(database, "read_engine", Unreachable())
+    assert asyncio.run(database.replica_lag()) == 0.0  # Checked just now: cached
+    replica[0] += database.REPLICA_LAG_CHECK_INTERVAL + 1
+    assert asyncio.run(database.replica_lag()) == float("inf")
+
+
+def test_old_writes_are_pruned(replica):
+    for i in range(10001):
+        database.note_write(f"user:{i}")
+    replica[0] += database.READ_AFTER_WRITE_WINDOW + 1
+    database.note_write("user:new")
+    assert list(database._recent_writes) == ["user:new"]
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+from sqlalchemy.future import select
+
+from backend import judge, percentiles, rejudge
+from backend.backfill import BackfillOptions
+from backend.executor import ExecutorUnavailable
+from backend.models.problem import Problem, TestCase
+from backend.models.submission import Submission
+from backend.models.user import User
+from backend.tests.fakes import DoublingExecutor
+
+CODE = "class Solution:\n    def double(self, n):\n        return n * 2\n"
+
+
+@pytest.fixture
+def problem_db(session_factory, monkeypatch):
+    monkeypatch.setattr(percentiles, "_cache", {})
+    monkeypatch.setattr(judge, "COMPARE_MODE", "api")
+
+    async def seed():
+        async with session_factory() as db:
+            db.add(User(id=1, clerk_id="c1", email="c1@example.com"))
+            db.add(Problem(id=1, title="Double", slug="double", description="", test_cases=[
+                TestCase(input_data=str(n), expected_output=str(n * 2)) for n in (1, 2)
+            ]))
+            await db.flush()
+            cases = (await db.execute(select(TestCase))).scalars().all()
+            judged = await rejudge.record_case_set(db, 1, cases)
+            db.add_all([
+                Submission(id=1, problem_id=1, user_id=1, code_text=CODE, language="python", status="Accepted",
+                           runtime_ms=10, judged_set_hash=judged),
+                # Accepted before case sets were recorded: every case runs
+                Submission(id=2, problem_id=1, code_text=CODE, language="python", status="Accepted", runtime_ms=10),
+                Submission(id=3, problem_id=1, code_text=CODE, language="python", status="Wrong Answer"),
+            ])
+            await db.commit()
+    asyncio.run(seed())
+    return session_factory
+
+
+def replace_cases(session_factory, inputs):
+    # Like update_problem: every row is re-created
+    async def go():
+        async with session_factory() as db:
+            for tc in (await db.execute(select(TestCase))).scalars().all():
+                await db.delete(tc)
+            db.add_all(TestCase(problem_id=1, input_data=str(n), expected_output=str(n * 2)) for n in inputs)
+            await db.commit()
+    asyncio.run(go())
+
+
+def run(session_factory, executor, monkeypatch, tmp_path):
+    monkeypatch.setattr(judge, "executor", executor)
+    options = BackfillOptions(checkpoint_dir=str(tmp_path / "checkpoints"))
+    return asyncio.run(rejudge.rejudge_problem(1, options, session_factory=session_factory, log=lambda message: None))
+
+
+def submissions(session_factory):
+    async def go():
+        async with session_factory() as db:
+            rows = (await db.execute(select(Submission).order_by(Submission.id))).scalars().all()
+            return [(s.status, s.output, s.judged_set_hash) for s in rows]
+    return asyncio.run(go())
+
+
+def test_only_new_cases_run(problem_db, monkeypatch, tmp_path):
+    replace_cases(problem_db, (1, 2, 3))
+    executor = DoublingExecutor()
+    checkpoint = run(problem_db, executor, monkeypatch, tmp_path)
+    assert sorted(executor.inputs) == [1, 2, 3, 3]  # Submission 1: case 3; submission 2: all three
+    assert (checkpoint.processed, checkpoint.changed) == (2, 0)
+    (first, _, set_1), (second, _, set_2), (third, _, set_3) = submissions(problem_db)
+    assert (first, second, third) == ("Accepted", "Accepted", "Wrong Answer")
+    assert set_1 == set_2 is not None and set_3 is None
+
+    executor = DoublingExecutor()
+    # Without the finished checkpoint too: the query skips submissions already on the current set
+    assert run(problem_db, executor, monkeypatch, tmp_path / "fresh").processed == 0
+    assert executor.inputs == []
+
+
+def test_unchanged_or_removed_cases_cost_nothing(problem_db, monkeypatch, tmp_path):
+    replace_cases(problem_db, (2,))
+    executor = DoublingExecutor()
+    run(problem_db, executor, monkeypatch, tmp_path)
+    assert executor.inputs == [2]  # Submission 2 only: it has no recorded set
+    assert [status for status, _, _ in submissions(problem_db)] == ["Accepted", "Accepted", "Wrong Answer"]
+
+
+def test_failing_a_new_case_takes_the_verdict(problem_db, monkeypatch, tmp_path):
+    replace_cases(problem_db, (1, 2, 3))
+    checkpoint = run(problem_db, DoublingExecutor(fail_on={3}), monkeypatch, tmp_path)
+    assert checkpoint.changed == 2
+    (first, output, _), (second, _, _), _ = submissions(problem_db)
+    assert (first, second) == ("Wrong Answer", "Wrong Answer")
+    assert output.startswith(rejudge.REJUDGED_PREFIX)
+
+
+def test_an_outage_commits_nothing(problem_db, monkeypatch, tmp_path):
+    replace_cases(problem_db, (1, 2, 3))
+    before = submissions(problem_db)
+    with pytest.raises(ExecutorUnavailable):
+        run(problem_db, DoublingExecutor(unavailable=True), monkeypatch, tmp_path)
+    assert submissions(problem_db) == before
@@ -0,0 +1,121 @@
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend import responses
+from backend.responses import CompressionMiddleware, EncodedPayload, PayloadCache
+
+BIG = {"items": [{"id": i, "title": f"problem {i}"} for i in range(200)]}
+
+
+@pytest.fixture
+def client():
+    app = FastAPI(default_response_class=responses.FastJSONResponse)
+    app.add_middleware(CompressionMiddleware)
+
+    @app.get("/big")
+    def big():
+        return BIG
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/events")
+    def events():
+        async def stream():
+            for i in range(3):
+                yield f"data: {'x' * 2000}{i}\n\n"
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.get("/encoded")
+    def encoded():
+        return Response(gzip.compress(b"x" * 5000), headers={"Content-Encoding": "gzip"})
+
+    return TestClient(app)
+
+
+def test_large_responses_are_gzipped(client):
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(json.dumps(BIG))
+    assert response.json() == BIG
+
+
+def test_small_or_unaccepted_responses_are_left_alone(client):
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "identity"}).headers
+
+
+def test_event_streams_and_encoded_bodies_pass_through(client):
+    response = client.get("/events", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.text.count("data: ") == 3
+    response = client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+    assert response.content == b"x" * 5000  # Compressed exactly once
+
+
+def test_brotli_is_preferred_only_when_available(monkeypatch):
+    monkeypatch.setattr(responses, "brotli", None)
+    assert responses.choose_encoding("br, gzip;q=0.8") == "gzip"
+    monkeypatch.setattr(responses, "brotli", object())
+    assert responses.choose_encoding("gzip, BR") == "br"
+    assert responses.choose_encoding("deflate") is None
+    assert responses.choose_encoding("") is None
+
+
+def test_payload_etag_and_304():
+    payload = EncodedPayload(responses.dumps(BIG))
+    first = payload.response("gzip")
+    assert first.status_code == 200
+    assert first.headers["etag"].startswith('W/"')
+    assert first.headers["cache-control"] == responses.PAYLOAD_CACHE_CONTROL
+    assert json.loads(gzip.decompress(first.body)) == BIG
+
+    strong = payload.etag.removeprefix("W/")
+    for if_none_match in (payload.etag, strong, f'"other", {strong}', "*"):
+        not_modified = payload.response("gzip", if_none_match)
+        assert not_modified.status_code == 304
+        assert not_modified.body == b""
+        assert not_modified.headers["etag"] == payload.etag
+    assert payload.response("gzip", '"other"').status_code == 200
+
+
+def test_payload_variants_are_compressed_once(monkeypatch):
+    payload = EncodedPayload(responses.dumps(BIG))
+    calls = []
+    real = responses.compress
+    monkeypatch.setattr(responses, "compress", lambda body, encoding: calls.append(encoding) or real(body, encoding))
+    payload.response("gzip")
+    payload.response("gzip")
+    assert payload.response("").body == payload.body
+    assert calls == ["gzip"]
+
+
+def test_small_payloads_are_not_compressed():
+    payload = EncodedPayload(responses.dumps({"ok": True}))
+    assert "content-encoding" not in payload.response("gzip").headers
+
+
+def test_etag_follows_the_content():
+    assert EncodedPayload(b"{}").etag == EncodedPayload(b"{}").etag
+    assert EncodedPayload(b"{}").etag != EncodedPayload(b"[]").etag
+
+
+def test_payload_cache_lru_and_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(responses.time, "monotonic", lambda: now[0])
+    cache = PayloadCache(max_entries=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a").body == b"1"
+    cache.put("c", 3)  # Evicts b, the least recently used
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    now[0] += 61
+    assert cache.get("a") is None
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from backend import judge
+from backend.models.problem import Problem, TestCase
+from backend.routers import execution
+from backend.schemas import RunTestRequest
+from backend.tests.fakes import DoublingExecutor
+
+CODE = "class Solution:\n    def double(self, n):\n        return n * 2\n"
+
+
+class SlowFirstExecutor(DoublingExecutor):
+    """Earlier inputs take longer, so cases finish in reverse order. Tracks how many ran at once."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.running = self.peak = 0
+
+    async def execute(self, payload):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(0.05 / int(payload["stdin"]))
+            return await super().execute(payload)
+        finally:
+            self.running -= 1
+
+
+@pytest.fixture
+def problem_db(session_factory, monkeypatch):
+    monkeypatch.setattr(judge, "COMPARE_MODE", "api")
+
+    async def seed():
+        async with session_factory() as db:
+            db.add(Problem(id=1, title="Double", slug="double", description="", test_cases=[
+                TestCase(input_data=str(n), expected_output=str(n * 2), is_hidden=n == 5) for n in (1, 2, 3, 4, 5)
+            ]))
+            db.add(Problem(id=2, title="Hidden", slug="hidden", description="", test_cases=[
+                TestCase(input_data="7", expected_output="14", is_hidden=True),
+            ]))
+            await db.commit()
+    asyncio.run(seed())
+    return session_factory
+
+
+def run_tests(session_factory, executor, monkeypatch, problem_id=1, **request):
+    monkeypatch.setattr(judge, "executor", executor)
+
+    async def go():
+        async with session_factory() as db:
+            return await execution.run_tests(RunTestRequest(source_code=CODE, language_id=71, **request), problem_id, db)
+    return asyncio.run(go())
+
+
+def test_public_cases_run_at_once_and_keep_their_order(problem_db, monkeypatch):
+    executor = SlowFirstExecutor()
+    response = run_tests(problem_db, executor, monkeypatch)
+    assert executor.inputs == [4, 3, 2, 1]  # Finished in reverse order
+    assert executor.peak == 4
+    assert [(c.index, c.input, c.passed) for c in response.cases] == [(0, "1", True), (1, "2", True), (2, "3", True), (3, "4", True)]
+    assert (response.status, response.message) == ("Success", "4/4 cases passed")
+
+
+def test_headline_is_the_first_failing_case_in_input_order(problem_db, monkeypatch):
+    response = run_tests(problem_db, SlowFirstExecutor(fail_on={2, 4}), monkeypatch)
+    assert [c.status for c in response.cases] == ["Passed", "Wrong Answer", "Passed", "Wrong Answer"]
+    assert response.stdout == response.cases[1].stdout == "-1"
+    assert response.message == "2/4 cases passed"
+
+
+def test_custom_inputs_report_stdout_only(problem_db, monkeypatch):
+    response = run_tests(problem_db, SlowFirstExecutor(), monkeypatch, custom_inputs=["3", "1"])
+    assert [(c.input, c.stdout, c.passed, c.expected_output) for c in response.cases] == [("3", "6", None, None), ("1", "2", None, None)]
+    assert response.message == "0/0 cases passed"
+
+
+def test_custom_inputs_are_capped(problem_db, monkeypatch):
+    with pytest.raises(HTTPException) as error:
+        run_tests(problem_db, SlowFirstExecutor(), monkeypatch, custom_inputs=["1"] * (execution.MAX_RUN_CASES + 1))
+    assert error.value.status_code == 400
+
+
+def test_hidden_fallback_case_is_not_revealed(problem_db, monkeypatch):
+    [case] = run_tests(problem_db, SlowFirstExecutor(), monkeypatch, problem_id=2).cases
+    assert (case.input, case.expected_output, case.passed) == (None, None, True)
+
+
+def test_executor_outage_is_a_503(problem_db, monkeypatch):
+    with pytest.raises(HTTPException) as error:
+        run_tests(problem_db, SlowFirstExecutor(unavailable=True), monkeypatch)
+    assert error.value.status_code == 503
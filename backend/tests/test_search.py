@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from backend import search
+from backend.models.problem import Problem
+from backend.search import InvertedIndex
+
+
+def test_parse_concepts_dedupes_and_keeps_order():
+    assert search.parse_concepts("Arrays, hash map,arrays, ,Hash-Map") == ["Arrays", "hash map"]
+    assert search.parse_concepts(None) == []
+    assert search.concept_slug("  Two Pointers & Sliding Window ") == "two-pointers-sliding-window"
+
+
+def test_tokenize_folds_plurals_and_drops_stopwords():
+    assert search.tokenize("The Sum of Arrays, in Glass") == ["sum", "array", "glass"]
+
+
+def index(*problems):
+    built = InvertedIndex()
+    for pid, title, concepts, description in problems:
+        built.add(pid, {"title": title, "concepts": concepts, "description": description})
+    return built
+
+
+def test_title_outranks_concepts_outranks_description():
+    built = index(
+        (1, "Merge intervals", "Sorting", "Given a graph of intervals"),
+        (2, "Course schedule", "Graph", "Prerequisites"),
+        (3, "Clone graph", "DFS", "Copy it"),
+    )
+    assert built.search("graph") == [3, 2, 1]
+
+
+def test_every_query_token_must_match():
+    built = index(
+        (1, "Two sum", "Arrays", "Find two numbers"),
+        (2, "Three sum", "Arrays", "Find three numbers"),
+    )
+    assert built.search("two sums") == [1]
+    assert built.search("sum") == [1, 2]  # Equal scores: by id
+    assert built.search("four sum") == []
+    assert built.search("the of") == []
+
+
+def test_repeated_tokens_add_up():
+    built = index((1, "Path", "", "path path path"), (2, "Path sum", "", ""))
+    assert built.search("path") == [1, 2]
+
+
+@pytest.fixture
+def problems_db(session_factory, monkeypatch):
+    monkeypatch.setattr(search, "_index", None)
+
+    async def seed():
+        # One transaction per problem, like create_problem
+        for pid, title, difficulty, concepts in (
+            (1, "Two Sum", "Easy", "Arrays, Hash Table"),
+            (2, "Course Schedule", "Medium", "Graphs"),
+            (3, "Array Partition", "Easy", "Arrays, Sorting"),
+            (4, "Word Ladder", "Hard", "Graphs, BFS"),
+        ):
+            async with session_factory() as db:
+                problem = Problem(id=pid, title=title, slug=title.lower().replace(" ", "-"), description="",
+                                  difficulty=difficulty, concepts=concepts)
+                db.add(problem)
+                await search.sync_concepts(db, problem, concepts)
+                await db.commit()
+    asyncio.run(seed())
+    return session_factory
+
+
+def find(session_factory, q=None, concept=None, difficulty=None, skip=0, limit=20):
+    async def go():
+        async with session_factory() as db:
+            return [p.id for p in await search.search_problems(db, q, concept, difficulty, skip, limit)]
+    return asyncio.run(go())
+
+
+def test_search_ranks_and_filters(problems_db):
+    assert find(problems_db, "array") == [3, 1]  # Title match first
+    assert find(problems_db, "array", difficulty="Easy", limit=1) == [3]
+    assert find(problems_db, "array", skip=1) == [1]
+    assert find(problems_db, "graph", concept="bfs") == [4]
+    assert find(problems_db, concept="Hash Table") == [1]
+    assert find(problems_db, "nothing here") == []
+
+
+def test_concepts_are_shared_and_counted(problems_db):
+    async def go():
+        async with problems_db() as db:
+            return await search.list_concepts(db)
+    counts = {c["slug"]: c["problem_count"] for c in asyncio.run(go())}
+    assert counts == {"arrays": 2, "bfs": 1, "graphs": 2, "hash-table": 1, "sorting": 1}
+
+
+def test_index_is_rebuilt_after_invalidate(problems_db):
+    assert find(problems_db, "ladder") == [4]
+
+    async def rename():
+        async with problems_db() as db:
+            problem = await db.get(Problem, 4)
+            problem.title = "Word Search"
+            await db.commit()
+    asyncio.run(rename())
+    assert find(problems_db, "ladder") == [4]  # Cached until invalidated (or INDEX_TTL)
+    search.invalidate()
+    assert find(problems_db, "ladder") == []
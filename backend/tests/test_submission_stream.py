@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy.future import select
+
+from backend import judge, percentiles
+from backend.models.problem import Problem, TestCase
+from backend.models.submission import Submission
+from backend.routers import submissions
+from backend.schemas import SubmissionCreate
+from backend.tests.fakes import DoublingExecutor
+
+CODE = "class Solution:\n    def double(self, n):\n        return n * 2\n"
+
+
+class FakeRequest:
+    def __init__(self, disconnect_after=None):
+        self.checks, self.disconnect_after = 0, disconnect_after
+
+    async def is_disconnected(self):
+        self.checks += 1
+        return self.disconnect_after is not None and self.checks >= self.disconnect_after
+
+
+@pytest.fixture
+def problem_db(session_factory, monkeypatch):
+    monkeypatch.setattr(submissions, "SessionLocal", session_factory)
+    monkeypatch.setattr(percentiles, "_cache", {})
+    monkeypatch.setattr(judge, "COMPARE_MODE", "api")
+
+    async def seed():
+        async with session_factory() as db:
+            db.add(Problem(id=1, title="Double", slug="double", description="", test_cases=[
+                TestCase(input_data=str(n), expected_output=str(n * 2), is_hidden=n > 1) for n in (1, 2, 3)
+            ]))
+            await db.commit()
+    asyncio.run(seed())
+    return session_factory
+
+
+def stream(session_factory, executor, request, monkeypatch):
+    monkeypatch.setattr(judge, "executor", executor)
+
+    async def go():
+        async with session_factory() as db:
+            response = await submissions.submit_solution_stream(
+                SubmissionCreate(problem_id=1, code=CODE, language="python"), request, db
+            )
+            return [chunk async for chunk in response.body_iterator]
+    return asyncio.run(go())
+
+
+def parse(chunks):
+    events = []
+    for chunk in chunks:
+        event, data = chunk.strip().split("\n")
+        events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+def saved(session_factory):
+    async def go():
+        async with session_factory() as db:
+            return (await db.execute(select(Submission))).scalars().all()
+    return asyncio.run(go())
+
+
+def test_events_arrive_in_order_and_the_result_is_saved(problem_db, monkeypatch):
+    events = parse(stream(problem_db, DoublingExecutor(), FakeRequest(), monkeypatch))
+    assert [name for name, _ in events] == ["start", "case", "case", "case", "result"]
+    assert events[0][1] == {"total": 3}
+    assert [data["index"] for name, data in events if name == "case"] == [0, 1, 2]
+    assert all(data["status"] == "Passed" and data["time_ms"] == 10 for name, data in events if name == "case")
+    # Hidden cases: no input or expected data in the events
+    assert all(set(data) == {"index", "total", "status", "time_ms", "memory_kb"} for name, data in events if name == "case")
+    assert events[-1][1]["status"] == "Accepted"
+    assert [s.status for s in saved(problem_db)] == ["Accepted"]
+
+
+def test_stream_stops_at_the_first_failure(problem_db, monkeypatch):
+    executor = DoublingExecutor(fail_on={2})
+    events = parse(stream(problem_db, executor, FakeRequest(), monkeypatch))
+    assert [name for name, _ in events] == ["start", "case", "case", "result"]
+    assert events[2][1]["status"] == "Wrong Answer"
+    assert events[-1][1]["status"] == "Wrong Answer"
+    assert executor.inputs == [1, 2]
+
+
+def test_disconnect_stops_judging_and_records_nothing(problem_db, monkeypatch):
+    executor = DoublingExecutor()
+    events = parse(stream(problem_db, executor, FakeRequest(disconnect_after=1), monkeypatch))
+    assert [name for name, _ in events] == ["start", "case"]
+    assert executor.inputs == [1]
+    assert saved(problem_db) == []
+
+
+def test_executor_outage_is_an_error_event_not_a_verdict(problem_db, monkeypatch):
+    events = parse(stream(problem_db, DoublingExecutor(unavailable=True), FakeRequest(), monkeypatch))
+    assert [name for name, _ in events] == ["start", "error"]
+    assert "temporarily unavailable" in events[1][1]["detail"]
+    assert saved(problem_db) == []
@@ -0,0 +1,46 @@
+import asyncio
+import gc
+
+from backend import testgen
+
+
+def test_running_jobs_are_kept_alive_until_done(monkeypatch):
+    async def scenario():
+        gate = asyncio.Event()
+        finished = []
+
+        async def run_job(job, on_done, kwargs):
+            await gate.wait()
+            finished.append(job["job_id"])
+
+        monkeypatch.setattr(testgen, "_run_job", run_job)
+        job = testgen.start_job(7, on_done=None)
+        assert testgen.get_job(job["job_id"]) is job
+        assert len(testgen._tasks) == 1
+        await asyncio.sleep(0)
+        gc.collect()  # Would collect a task nothing else refers to
+        gate.set()
+        for _ in range(3):
+            await asyncio.sleep(0)
+        return job, finished
+
+    job, finished = asyncio.run(scenario())
+    assert finished == [job["job_id"]]
+    assert not testgen._tasks
+
+
+def test_job_list_is_capped(monkeypatch):
+    async def run_job(job, on_done, kwargs):
+        return None
+
+    async def scenario():
+        monkeypatch.setattr(testgen, "_run_job", run_job)
+        monkeypatch.setattr(testgen, "_jobs", testgen.OrderedDict())
+        jobs = [testgen.start_job(1, on_done=None) for _ in range(testgen.MAX_JOBS + 5)]
+        await asyncio.sleep(0)
+        return jobs
+
+    jobs = asyncio.run(scenario())
+    assert testgen.get_job(jobs[0]["job_id"]) is None
+    assert testgen.get_job(jobs[-1]["job_id"]) is jobs[-1]
+    assert len(testgen._jobs) == testgen.MAX_JOBS
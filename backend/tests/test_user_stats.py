@@ -0,0 +1,116 @@
+import asyncio
+import json
+from datetime import date, datetime
+
+from sqlalchemy.future import select
+
+from backend import user_stats
+from backend.models.problem import Problem
+from backend.models.submission import Submission
+from backend.models.user import User
+from backend.models.user_stats import UserStats
+
+DAY = date(2024, 3, 10)
+
+
+def problem(id=1, difficulty="Medium", concepts="Arrays, Hash Table"):
+    return Problem(id=id, title=f"p{id}", slug=f"p{id}", description="", difficulty=difficulty, concepts=concepts)
+
+
+def test_apply_submission_counts_first_solves_only():
+    stats = user_stats.new_stats(1)
+    p = problem()
+    user_stats.apply_submission(stats, p, "Wrong Answer", False, DAY)
+    user_stats.apply_submission(stats, p, "Accepted", True, DAY)
+    user_stats.apply_submission(stats, p, "Accepted", False, DAY)
+    assert (stats.attempts, stats.accepted) == (3, 2)
+    assert (stats.solved_total, stats.solved_medium, stats.solved_easy) == (1, 1, 0)
+    assert json.loads(stats.concept_counts) == {"arrays": 1, "hash-table": 1}
+
+
+def test_wrong_answers_dont_touch_the_streak():
+    stats = user_stats.new_stats(1)
+    user_stats.apply_submission(stats, problem(), "Wrong Answer", False, DAY)
+    assert stats.current_streak == 0 and stats.last_solved_date is None
+
+
+def test_streak_rolls_over_consecutive_days_and_resets_after_a_gap():
+    stats = user_stats.new_stats(1)
+    for day in (10, 11, 11, 12):
+        user_stats.apply_submission(stats, problem(), "Accepted", False, date(2024, 3, day))
+    assert (stats.current_streak, stats.longest_streak) == (3, 3)
+    user_stats.apply_submission(stats, problem(), "Accepted", False, date(2024, 3, 14))
+    assert (stats.current_streak, stats.longest_streak) == (1, 3)
+    # Across a month boundary
+    user_stats.apply_submission(stats, problem(), "Accepted", False, date(2024, 3, 31))
+    user_stats.apply_submission(stats, problem(), "Accepted", False, date(2024, 4, 1))
+    assert stats.current_streak == 2
+
+
+def test_current_streak_expires_after_a_missed_day():
+    stats = user_stats.new_stats(1)
+    user_stats.apply_submission(stats, problem(), "Accepted", False, DAY)
+    assert user_stats.current_streak(stats, today=date(2024, 3, 11)) == 1
+    assert user_stats.current_streak(stats, today=date(2024, 3, 12)) == 0
+
+
+def seed(session_factory, history):
+    async def go():
+        async with session_factory() as db:
+            db.add_all([User(id=1, clerk_id="c1", email="a@x"), User(id=2, clerk_id="c2", email="b@x"),
+                        problem(1, "Easy", "Arrays"), problem(2, "Hard", "Graphs")])
+            await db.flush()
+            for user_id, problem_id, status, day in history:
+                db.add(Submission(user_id=user_id, problem_id=problem_id, status=status, language="python",
+                                  timestamp=datetime(2024, 3, day, 12)))
+            await db.commit()
+    asyncio.run(go())
+
+
+def load_stats(session_factory):
+    async def go():
+        async with session_factory() as db:
+            result = await db.execute(select(UserStats).order_by(UserStats.user_id))
+            return {stats.user_id: stats for stats in result.scalars().all()}
+    return asyncio.run(go())
+
+
+def test_rebuild_users_replays_history(session_factory):
+    seed(session_factory, [
+        (1, 1, "Wrong Answer", 1), (1, 1, "Accepted", 1), (1, 1, "Accepted", 2),
+        (1, 2, "Accepted", 3), (2, 2, "Runtime Error", 5),
+    ])
+
+    async def rebuild():
+        async with session_factory() as db:
+            # A stale row is replaced, not added to
+            db.add(UserStats(user_id=1, solved_total=99))
+            await db.commit()
+        async with session_factory() as db:
+            await user_stats.rebuild_users(db, [1, 2])
+            await db.commit()
+    asyncio.run(rebuild())
+
+    stats = load_stats(session_factory)
+    one, two = stats[1], stats[2]
+    assert (one.attempts, one.accepted, one.solved_total) == (4, 3, 2)
+    assert (one.solved_easy, one.solved_hard) == (1, 1)
+    assert json.loads(one.concept_counts) == {"arrays": 1, "graphs": 1}
+    assert (one.current_streak, one.longest_streak, one.last_solved_date) == (3, 3, date(2024, 3, 3))
+    assert (two.attempts, two.accepted, two.solved_total) == (1, 0, 0)
+
+
+def test_record_submission_counts_a_problem_once(session_factory):
+    seed(session_factory, [])
+
+    async def submit():
+        async with session_factory() as db:
+            p = await db.get(Problem, 1)
+            await user_stats.record_submission(db, 1, p, "Accepted", datetime(2024, 3, 1))
+            db.add(Submission(user_id=1, problem_id=1, status="Accepted", language="python"))
+            await db.commit()
+
+    asyncio.run(submit())
+    asyncio.run(submit())
+    stats = load_stats(session_factory)[1]
+    assert (stats.attempts, stats.accepted, stats.solved_total, stats.solved_easy) == (2, 2, 1, 1)
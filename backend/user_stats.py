@@ -0,0 +1,146 @@
+import json
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from backend.database import dialect_insert
+from backend.models.problem import Problem
+from backend.models.submission import Submission
+from backend.models.user_stats import UserStats
+from backend.search import parse_concepts, concept_slug
+
+# Incrementally maintained user statistics.
+#
+# record_submission() runs inside the transaction that saves a judged submission, so
+# user_stats never drifts from submissions. rebuild() replays history through the
+# same apply_submission() to recompute everything (e.g. after a rejudge or a bug fix).
+
+DIFFICULTY_FIELDS = {"easy": "solved_easy", "medium": "solved_medium", "hard": "solved_hard"}
+
+
+def new_stats(user_id: int) -> UserStats:
+    return UserStats(
+        user_id=user_id, solved_easy=0, solved_medium=0, solved_hard=0, solved_total=0,
+        attempts=0, accepted=0, concept_counts="{}", current_streak=0, longest_streak=0,
+    )
+
+
+def apply_submission(stats: UserStats, problem: Problem, status: str, first_solve: bool, day: date):
+    stats.attempts += 1
+    if status != "Accepted":
+        return
+    stats.accepted += 1
+
+    # Daily streak: consecutive days with at least one Accepted submission
+    if stats.last_solved_date != day:
+        if stats.last_solved_date == day - timedelta(days=1):
+            stats.current_streak += 1
+        else:
+            stats.current_streak = 1
+        stats.last_solved_date = day
+        stats.longest_streak = max(stats.longest_streak, stats.current_streak)
+
+    if not first_solve:
+        return
+    stats.solved_total += 1
+    field = DIFFICULTY_FIELDS.get((problem.difficulty or "").lower())
+    if field:
+        setattr(stats, field, getattr(stats, field) + 1)
+    counts = json.loads(stats.concept_counts or "{}")
+    for name in parse_concepts(problem.concepts):
+        slug = concept_slug(name)
+        counts[slug] = counts.get(slug, 0) + 1
+    stats.concept_counts = json.dumps(counts, sort_keys=True)
+
+
+async def _locked_stats(db: AsyncSession, user_id: int) -> UserStats:
+    # Get-or-create, then lock the row so concurrent submissions by the same user serialize
+    insert = dialect_insert(db)
+    # Column defaults fill in the zeroed counters
+    await db.execute(insert(UserStats).values(user_id=user_id).on_conflict_do_nothing(index_elements=["user_id"]))
+    result = await db.execute(
+        select(UserStats).where(UserStats.user_id == user_id).with_for_update().execution_options(populate_existing=True)
+    )
+    return result.scalars().one()
+
+
+async def record_submission(db: AsyncSession, user_id: int, problem: Problem, status: str,
+                            when: Optional[datetime] = None):
+    """Call BEFORE adding the new Submission (so the first-solve check doesn't see it). Caller commits."""
+    # Lock before looking for an earlier Accepted: a concurrent submission by the same user (a client
+    # retry) waits here until the other commits, and the query below then sees its row
+    stats = await _locked_stats(db, user_id)
+    first_solve = False
+    if status == "Accepted":
+        result = await db.execute(
+            select(Submission.id).where(
+                Submission.user_id == user_id,
+                Submission.problem_id == problem.id,
+                Submission.status == "Accepted",
+            ).limit(1)
+        )
+        first_solve = result.first() is None
+
+    apply_submission(stats, problem, status, first_solve, (when or datetime.utcnow()).date())
+
+
+def current_streak(stats: UserStats, today: Optional[date] = None) -> int:
+    # A streak is only alive if the user solved something today or yesterday
+    today = today or datetime.utcnow().date()
+    if stats.last_solved_date is None or stats.last_solved_date < today - timedelta(days=1):
+        return 0
+    return stats.current_streak
+
+
+async def rebuild_users(db: AsyncSession, user_ids: List[int]):
+    """Recomputes the given users' stats from their full history, in the caller's transaction."""
+    # Lock first so a submission landing meanwhile waits instead of being overwritten
+    existing = await db.execute(select(UserStats).where(UserStats.user_id.in_(user_ids)).with_for_update())
+    existing = existing.scalars().all()
+    history = await db.execute(
+        select(Submission.user_id, Submission.status, Submission.timestamp, Problem)
+        .join(Problem, Problem.id == Submission.problem_id)
+        .where(Submission.user_id.in_(user_ids))
+        .order_by(Submission.user_id, Submission.timestamp, Submission.id)
+    )
+    stats_by_user = {uid: new_stats(uid) for uid in user_ids}
+    solved = set()
+    for user_id, status, timestamp, problem in history.all():
+        first_solve = status == "Accepted" and (user_id, problem.id) not in solved
+        if first_solve:
+            solved.add((user_id, problem.id))
+        apply_submission(stats_by_user[user_id], problem, status, first_solve,
+                         (timestamp or datetime.utcnow()).date())
+
+    for row in existing:
+        await db.delete(row)
+    await db.flush()
+    db.add_all(stats_by_user.values())
+
+
+async def rebuild(session_factory, batch_size: int = 200, log=print):
+    """
+    Recomputes user_stats from submission history, `batch_size` users per transaction
+    (keyset pagination over user ids, one history query per batch).
+    """
+    from backend.models.user import User
+
+    last_user_id = 0
+    total = 0
+    while True:
+        async with session_factory() as db:
+            result = await db.execute(
+                select(User.id).where(User.id > last_user_id).order_by(User.id).limit(batch_size)
+            )
+            user_ids = list(result.scalars().all())
+            if not user_ids:
+                break
+            await rebuild_users(db, user_ids)
+            await db.commit()
+
+        last_user_id = user_ids[-1]
+        total += len(user_ids)
+        log(f"Rebuilt stats for {total} users (up to user id {last_user_id})")
+    return total
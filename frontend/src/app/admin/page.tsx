@@ -70,7 +70,7 @@ export default function AdminDashboard() {
         );
     }
 
-    const handleEditClick = (problem: any) => {
+    const handleEditClick = async (problem: any) => {
         setEditingId(problem.id);
         setFormData({
             title: problem.title,
@@ -83,14 +83,28 @@ export default function AdminDashboard() {
             editorial: problem.editorial || "",
             concepts: problem.concepts || "",
         });
-        // Transform test cases if needed (ensure fields align)
-        setTestCases(problem.test_cases.map((tc: any) => ({
-            input_data: tc.input_data,
-            expected_output: tc.expected_output,
-            is_hidden: tc.is_hidden
-        })));
         window.scrollTo({ top: 0, behavior: 'smooth' });
-        setMessage(`Editing ${problem.title}...`);
+        setMessage(`Loading test cases for ${problem.title}...`);
+
+        // Full test cases (hidden included) aren't part of the public problem payload; fetch them for editing
+        try {
+            const cases: any[] = [];
+            while (true) {
+                const res = await fetch(`/api/problems/${problem.id}/testcases?clerk_id=${user?.id}&offset=${cases.length}&limit=500`);
+                if (!res.ok) throw new Error("Failed to load test cases");
+                const page = await res.json();
+                cases.push(...page);
+                if (page.length < 500) break;
+            }
+            setTestCases(cases.map((tc: any) => ({
+                input_data: tc.input_data,
+                expected_output: tc.expected_output,
+                is_hidden: tc.is_hidden
+            })));
+            setMessage(`Editing ${problem.title}...`);
+        } catch (err: any) {
+            setMessage(`Error: ${err.message}`);
+        }
     };
 
     const handleCancelEdit = () => {
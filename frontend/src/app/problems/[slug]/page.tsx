@@ -19,9 +19,10 @@ import ReactMarkdown from 'react-markdown';
 import remarkGfm from 'remark-gfm';
 
 interface TestCase {
+    id: number;
     input_data: string;
     expected_output: string;
-    is_hidden: boolean;
+    truncated: boolean;
 }
 
 interface Problem {
@@ -33,7 +34,11 @@ interface Problem {
     output_format: string;
     constraints: string;
     editorial?: string;
-    test_cases: TestCase[];
+    samples: TestCase[];
+    test_case_count: number;
+    // Sanitized HTML rendered by the backend; null until it has been rendered
+    description_html?: string | null;
+    editorial_html?: string | null;
 }
 
 export default function ProblemDetail() {
@@ -173,7 +178,19 @@ class Solution:
             }
 
             const data = await res.json();
-            if (data.stderr) {
+            if (data.cases && data.cases.length > 1) {
+                // One block per public test case, run concurrently by the backend
+                const lines = data.cases.map((c: any) => {
+                    const icon = c.passed === true ? "✅" : c.passed === false ? "❌" : "•";
+                    let block = `${icon} Case ${c.index + 1} (${c.status})`;
+                    if (c.input !== null) block += `\nInput: ${c.input}`;
+                    if (c.stderr) block += `\nError: ${c.stderr}`;
+                    else block += `\nOutput: ${c.stdout || "No output"}`;
+                    if (c.passed === false && c.expected_output !== null) block += `\nExpected: ${c.expected_output}`;
+                    return block;
+                });
+                setOutput(`${data.message}\n\n${lines.join("\n\n")}`);
+            } else if (data.stderr) {
                 setOutput(`Error:\n${data.stderr}`);
             } else {
                 setOutput(data.stdout || "No output");
@@ -210,6 +227,8 @@ class Solution:
                 method: "POST",
                 headers: {
                     "Content-Type": "application/json",
+                    // One key per click: a retried request replays the first verdict instead of judging again
+                    "Idempotency-Key": crypto.randomUUID(),
                 },
                 body: JSON.stringify(payload),
             });
@@ -295,11 +314,18 @@ class Solution:
                                     </span>
                                 </div>
 
-                                <div className="prose prose-invert prose-sm max-w-none mb-8 text-gray-300">
-                                    <ReactMarkdown remarkPlugins={[remarkGfm]}>
-                                        {problem.description.split("### Constraints")[0]}
-                                    </ReactMarkdown>
-                                </div>
+                                {problem.description_html ? (
+                                    <div
+                                        className="prose prose-invert prose-sm max-w-none mb-8 text-gray-300"
+                                        dangerouslySetInnerHTML={{ __html: problem.description_html }}
+                                    />
+                                ) : (
+                                    <div className="prose prose-invert prose-sm max-w-none mb-8 text-gray-300">
+                                        <ReactMarkdown remarkPlugins={[remarkGfm]}>
+                                            {problem.description.split("### Constraints")[0]}
+                                        </ReactMarkdown>
+                                    </div>
+                                )}
 
                                 {/* Constraints - Custom styled to match LeetCode */}
                                 {problem.constraints && (
@@ -361,7 +387,12 @@ class Solution:
                         {activeTab === "solutions" && (
                             <div className="space-y-8">
                                 {/* Editorial Text */}
-                                {problem.editorial && (
+                                {problem.editorial_html ? (
+                                    <div
+                                        className="prose prose-invert prose-sm max-w-none text-gray-300"
+                                        dangerouslySetInnerHTML={{ __html: problem.editorial_html }}
+                                    />
+                                ) : problem.editorial && (
                                     <div className="prose prose-invert prose-sm max-w-none text-gray-300">
                                         <ReactMarkdown remarkPlugins={[remarkGfm]}>
                                             {problem.editorial}
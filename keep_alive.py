@@ -1,25 +1,108 @@
-import requests
-import time
+import argparse
+import asyncio
 import datetime
+import os
+import statistics
+import time
+from collections import deque
+
+import httpx
 
-URL = "https://dsawithpv.onrender.com/"
+# Async multi-target prober.
+# Hits every target concurrently each interval, keeps a latency history per target
+# and flags cold starts (a response much slower than that target's usual latency).
+#
+#   python keep_alive.py                                  # default targets, every 5 minutes
+#   python keep_alive.py --once                           # single round, exit 1 if any target is down
+#   python keep_alive.py https://host/healthz https://host/readyz --interval 60
+
+DEFAULT_TARGETS = [
+    "https://dsawithpv.onrender.com/healthz",
+    "https://dsawithpv.onrender.com/readyz",
+]
 INTERVAL = 300  # 5 minutes in seconds
+HISTORY = 50  # Samples kept per target
+COLD_START_FACTOR = 5.0  # Slower than 5x the median...
+COLD_START_MIN_S = 3.0  # ...and at least this slow counts as a cold start
+
+
+class Target:
+    def __init__(self, url: str):
+        self.url = url
+        self.latencies = deque(maxlen=HISTORY)
+        self.failures = 0
+        self.cold_starts = 0
+
+    def is_cold_start(self, latency: float) -> bool:
+        if latency < COLD_START_MIN_S:
+            return False
+        if len(self.latencies) < 3:
+            # No baseline yet - an absolute threshold is all we have
+            return True
+        return latency > COLD_START_FACTOR * statistics.median(self.latencies)
+
+    def summary(self) -> str:
+        if not self.latencies:
+            return "no successful samples"
+        ordered = sorted(self.latencies)
+        p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+        return (f"median {statistics.median(ordered):.2f}s, p95 {p95:.2f}s, "
+                f"{self.failures} failures, {self.cold_starts} cold starts")
+
+
+async def probe(client: httpx.AsyncClient, target: Target) -> bool:
+    start = time.perf_counter()
+    try:
+        response = await client.get(target.url)
+        latency = time.perf_counter() - start
+    except httpx.HTTPError as e:
+        target.failures += 1
+        print(f"❌ {target.url}: {type(e).__name__} {e}")
+        return False
+
+    cold = target.is_cold_start(latency)
+    if cold:
+        target.cold_starts += 1
+    # Only successful responses count towards the baseline
+    if response.status_code < 400:
+        target.latencies.append(latency)
+    else:
+        target.failures += 1
+
+    icon = "✅" if response.status_code < 400 else "⚠️"
+    note = " (cold start)" if cold else ""
+    print(f"{icon} {target.url}: {response.status_code} in {latency:.2f}s{note}")
+    return response.status_code < 400
+
+
+async def run(targets, interval: float, once: bool, timeout: float) -> bool:
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        while True:
+            print(f"[{datetime.datetime.now()}] Probing {len(targets)} target(s)...")
+            results = await asyncio.gather(*(probe(client, t) for t in targets))
+            for target in targets:
+                print(f"   {target.url}: {target.summary()}")
+            if once:
+                return all(results)
+            await asyncio.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Probe backend health endpoints concurrently.")
+    parser.add_argument("targets", nargs="*", help="URLs to probe (default: PROBE_TARGETS env or the Render backend)")
+    parser.add_argument("--interval", type=float, default=INTERVAL)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout; cold starts can take a while")
+    parser.add_argument("--once", action="store_true", help="Probe once and exit non-zero if any target failed")
+    args = parser.parse_args()
+
+    urls = args.targets or [u.strip() for u in os.getenv("PROBE_TARGETS", "").split(",") if u.strip()] or DEFAULT_TARGETS
+    targets = [Target(url) for url in urls]
+
+    print("🚀 Prober Started")
+    ok = asyncio.run(run(targets, args.interval, args.once, args.timeout))
+    if not ok:
+        raise SystemExit(1)
 
-def ping_server():
-    while True:
-        try:
-            print(f"[{datetime.datetime.now()}] Pinging {URL}...")
-            response = requests.get(URL)
-            if response.status_code == 200:
-                print(f"✅ Success! Status Code: {response.status_code}")
-            else:
-                print(f"⚠️ Warning! Status Code: {response.status_code}")
-        except Exception as e:
-            print(f"❌ Error pinging server: {e}")
-        
-        print(f"Serving sleeping for {INTERVAL/60} minutes...")
-        time.sleep(INTERVAL)
 
 if __name__ == "__main__":
-    print("🚀 Keep-Alive Script Started")
-    ping_server()
+    main()